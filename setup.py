@@ -64,8 +64,6 @@ setup(
 
         # Specify the Python versions you support here. In particular, ensure
         # that you indicate whether you support Python 2, Python 3 or both.
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9'
     ],
@@ -86,7 +84,9 @@ setup(
         'openpyxl>=2.5,<4',
         'colour>=0.1.5,<0.2',
         'jsonschema',
-        'pandas<2',
-        "xlrd>=1.0.0,<1.3.0 ; python_version<='3.6'"
-    ]
+        'pandas>=1.5,<2'
+    ],
+    extras_require={
+        'xlsxwriter': ['xlsxwriter']
+    }
 )
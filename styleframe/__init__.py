@@ -3,7 +3,10 @@ import sys
 from .container import Container
 from .series import Series
 from .style_frame import StyleFrame
-from .styler import Styler
+from .styler import Styler, FrozenStyler
+from .style_cache import StyleCache
+from .style_template import StyleTemplate
+from .sheet_layout import SheetLayout
 from .command_line.commandline import CommandLineInterface
 from .version import _version_, _versions_, _openpyxl_version_, _pandas_version_, _python_version_
 
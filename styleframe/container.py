@@ -1,9 +1,11 @@
 import datetime as dt
 import pandas as pd
 
+from copy import deepcopy
+
 from . import utils
 
-from styleframe.styler import Styler
+from styleframe.styler import Styler, FrozenStyler
 
 try:
     pd_timestamp = pd.Timestamp
@@ -11,24 +13,61 @@ except AttributeError:
     pd_timestamp = pd.tslib.Timestamp
 
 
+def get_default_number_format(value) -> str:
+    if isinstance(value, pd_timestamp):
+        return utils.number_formats.default_date_time_format
+    elif isinstance(value, dt.date):
+        return utils.number_formats.default_date_format
+    elif isinstance(value, dt.time):
+        return utils.number_formats.default_time_format
+    return utils.number_formats.general
+
+
 class Container:
     """
     A container class used to store value and style pairs.
     Value can be any datatype, and style is a Styler object
     """
+
+    __slots__ = ('value', '_style')
+
     def __init__(self, value, styler=None):
         self.value = value
         if styler is None:
-            if isinstance(self.value, pd_timestamp):
-                self.style = Styler(number_format=utils.number_formats.default_date_time_format)
-            elif isinstance(self.value, dt.date):
-                self.style = Styler(number_format=utils.number_formats.default_date_format)
-            elif isinstance(self.value, dt.time):
-                self.style = Styler(number_format=utils.number_formats.default_time_format)
-            else:
-                self.style = Styler()
+            self._style = Styler.intern(number_format=get_default_number_format(value))
         else:
-            self.style = styler
+            self._style = styler
+
+    @property
+    def style(self):
+        # cells share their styles as immutable FrozenStyler objects. a cell gets its own mutable copy of its style
+        # the first time it is accessed, so modifying the style in place does not modify the style of other cells
+        style = self._style
+        if isinstance(style, FrozenStyler):
+            style = self._style = Styler._from_key(style._key())
+        return style
+
+    @style.setter
+    def style(self, styler):
+        self._style = styler
+
+    def _get_shared_style(self):
+        """
+        :return: The cell's style in a form that can be shared with other cells
+
+        :meta private:
+        """
+
+        style = self._style
+        if isinstance(style, Styler) and not isinstance(style, FrozenStyler):
+            return style.interned()
+        return style
+
+    def __copy__(self):
+        return Container(self.value, self._get_shared_style())
+
+    def __deepcopy__(self, memo):
+        return Container(deepcopy(self.value, memo), deepcopy(self._style, memo))
 
     def __hash__(self):
         return hash(self.value)
@@ -0,0 +1,320 @@
+"""
+The ``styleframe`` engine (see :meth:`.StyleFrame.ExcelWriter`).
+
+The cells of the sheets StyleFrame objects are exported to are serialized straight to their worksheets' XML, instead
+of being created as openpyxl cells first. The XML of every cell is equivalent to the XML openpyxl writes for the same
+value and style. The rest of the workbook (the stylesheet, the sheets' settings, comments etc) is written by openpyxl.
+"""
+
+import datetime as dt
+import mmap
+import re
+import shutil
+import tempfile
+import zipfile
+from collections import deque
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE, NUMERIC_TYPES
+from openpyxl.comments.comment_sheet import CommentRecord
+from openpyxl.compat import safe_string
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.datetime import to_excel, to_ISO8601
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.worksheet.dimensions import SheetDimension
+from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.writer.excel import ExcelWriter as OpenpyxlExcelWriter
+from pandas.io.excel._openpyxl import OpenpyxlWriter
+
+_inf = float('inf')
+
+_empty_sheet_data = re.compile(rb'<sheetData\s*/>|<sheetData></sheetData>')
+
+_attribute_entities = {'"': '&quot;', '\n': '&#10;', '\r': '&#13;', '\t': '&#09;'}
+
+
+def get_written_value(value, na_rep: str = ''):
+    """Returns the value pandas writes to a cell for value (see pandas' ``ExcelFormatter._format_value`` and
+    ``ExcelWriter._value_with_fmt``). Every write path that does not go through pandas (streaming, the ``styleframe``
+    and ``xlsxwriter`` engines, layouts and :meth:`.StyleFrame.write_to_template`) converts the values with it, so
+    they write the same values :meth:`.StyleFrame.to_excel` does.
+
+    :meta private:
+    """
+
+    value_type = type(value)
+    if value_type is str or value_type is int or value_type is bool:
+        return value
+    if value_type is float:
+        if value != value:
+            return na_rep
+        if value == _inf or value == -_inf:
+            return 'inf' if value > 0 else '-inf'
+        return value
+
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return na_rep
+    if pd.api.types.is_float(value) and abs(value) == _inf:
+        return 'inf' if value > 0 else '-inf'
+    if getattr(value, 'tzinfo', None) is not None:
+        raise ValueError('Excel does not support datetimes with timezones. Please ensure that datetimes are timezone '
+                         'unaware before writing to Excel.')
+    if pd.api.types.is_integer(value):
+        return int(value)
+    if pd.api.types.is_float(value):
+        return float(value)
+    if pd.api.types.is_bool(value):
+        return bool(value)
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value
+    if isinstance(value, dt.timedelta):
+        return value.total_seconds() / 86400
+    return str(value)
+
+
+class SheetData:
+    """
+    The serialized cells of a sheet. The rows are written to a temporary file as they are serialized, and are copied
+    to the worksheet's XML when the workbook is saved.
+
+    :param sheet: The sheet the cells belong to.
+    :type sheet: :class:`openpyxl.worksheet.worksheet.Worksheet`
+
+    :meta private:
+    """
+
+    def __init__(self, sheet: Worksheet):
+        self.sheet = sheet
+        self.workbook = sheet.parent
+        self.comments = []
+        self._file = tempfile.TemporaryFile()
+        self._column_letters = ['']
+        self._min_row = self._min_column = self._max_row = self._max_column = None
+        self._last_row = 0
+        self._empty_rows = None
+
+    @property
+    def dimension(self) -> str:
+        if self._min_row is None:
+            return 'A1:A1'
+        return '{}{}:{}{}'.format(get_column_letter(self._min_column), self._min_row,
+                                  get_column_letter(self._max_column), self._max_row)
+
+    def get_style_attribute(self, style_array: StyleArray) -> str:
+        """Returns the style id attribute of the cells that have the given style, registering it with the workbook
+        as openpyxl does when it writes a styled cell.
+        """
+
+        if not any(style_array):
+            return ''
+        return ' s="{}"'.format(self.workbook._cell_styles.add(style_array))
+
+    def write_row(self, row_index: int, first_column: int, values: list, style_attributes: List[str],
+                  comments: Optional[list] = None) -> None:
+        """Serializes a row of cells. Rows must be written in ascending order.
+
+        :param int row_index: The row's index (one-based).
+        :param int first_column: The column of the first cell (one-based).
+        :param list values: The cells' values, as returned by :func:`get_written_value`.
+        :param style_attributes: The cells' style attributes, as returned by :meth:`get_style_attribute`.
+        :param comments: The cells' comments (openpyxl comments or ``None``), if any of the cells has a comment.
+        """
+
+        last_column = first_column + len(values) - 1
+        while len(self._column_letters) <= last_column:
+            self._column_letters.append(get_column_letter(len(self._column_letters)))
+        self._write_row_dimensions_before(row_index)
+
+        row = str(row_index)
+        cells = [self._get_row_start_tag(row_index)]
+        for column_index, value, style_attribute in zip(range(first_column, last_column + 1), values,
+                                                        style_attributes):
+            coordinate = self._column_letters[column_index] + row
+            comment = comments[column_index - first_column] if comments else None
+            if comment is not None:
+                self.comments.append(self._get_comment_record(coordinate, comment))
+            elif value is None and not style_attribute:
+                continue
+            cells.append(self._get_cell_xml(coordinate, value, style_attribute))
+        cells.append('</row>')
+        self._file.write(''.join(cells).encode())
+
+        if self._min_row is None:
+            self._min_row, self._min_column, self._max_column = row_index, first_column, last_column
+        else:
+            self._min_column = min(self._min_column, first_column)
+            self._max_column = max(self._max_column, last_column)
+        self._max_row = self._last_row = row_index
+
+    def copy_to(self, part) -> None:
+        """Writes the serialized rows to the worksheet's XML part, followed by the rows that only have dimensions.
+
+        :meta private:
+        """
+
+        self._write_row_dimensions_before(None)
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, part)
+        self._file.close()
+
+    def _write_row_dimensions_before(self, row_index: Optional[int]) -> None:
+        # as openpyxl does, rows that have dimensions (a height, for example) are written even if they have no cells
+        if self._empty_rows is None or row_index is None:
+            self._empty_rows = deque(sorted(row for row in self.sheet.row_dimensions if row > self._last_row))
+        while self._empty_rows and self._empty_rows[0] <= self._last_row:
+            self._empty_rows.popleft()
+        while self._empty_rows and (row_index is None or self._empty_rows[0] < row_index):
+            self._last_row = self._empty_rows.popleft()
+            self._file.write((self._get_row_start_tag(self._last_row) + '</row>').encode())
+
+    def _get_row_start_tag(self, row_index: int) -> str:
+        attributes = ''
+        if row_index in self.sheet.row_dimensions:
+            attributes = ''.join(' {}="{}"'.format(key, escape(value, _attribute_entities))
+                                 for key, value in self.sheet.row_dimensions[row_index])
+        return '<row r="{}"{}>'.format(row_index, attributes)
+
+    def _get_cell_xml(self, coordinate: str, value, style_attribute: str) -> str:
+        # mirrors openpyxl's cell._writer.etree_write_cell (and the data types Cell._bind_value infers)
+        value_type = type(value)
+        if value_type is float or value_type is int:
+            if value != value or value == _inf or value == -_inf:
+                return '<c r="{}"{} t="n"><v /></c>'.format(coordinate, style_attribute)
+            return '<c r="%s"%s t="n"><v>%.16g</v></c>' % (coordinate, style_attribute, value)
+        if value_type is str:
+            value = value[:32767]
+            if ILLEGAL_CHARACTERS_RE.search(value):
+                raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+            if not value:
+                return '<c r="{}"{} t="inlineStr" />'.format(coordinate, style_attribute)
+            if len(value) > 1 and value.startswith('='):
+                return '<c r="{}"{}><f>{}</f><v /></c>'.format(coordinate, style_attribute, escape(value[1:]))
+            if value in ERROR_CODES:
+                return '<c r="{}"{} t="e"><v>{}</v></c>'.format(coordinate, style_attribute, escape(value))
+            stripped = value.strip()
+            space = ' xml:space="preserve"' if stripped and stripped != value else ''
+            return '<c r="{}"{} t="inlineStr"><is><t{}>{}</t></is></c>'.format(coordinate, style_attribute, space,
+                                                                              escape(value))
+        if value_type is bool:
+            return '<c r="{}"{} t="b"><v>{}</v></c>'.format(coordinate, style_attribute, int(value))
+        if value is None:
+            return '<c r="{}"{} t="n" />'.format(coordinate, style_attribute)
+        if isinstance(value, (dt.datetime, dt.date, dt.time, dt.timedelta)):
+            if getattr(value, 'tzinfo', None) is not None:
+                raise TypeError("Excel does not support timezones in datetimes. "
+                                "The tzinfo in the datetime/time object must be set to None.")
+            if self.workbook.iso_dates and not isinstance(value, dt.timedelta):
+                return '<c r="{}"{} t="d"><v>{}</v></c>'.format(coordinate, style_attribute, to_ISO8601(value))
+            return '<c r="%s"%s t="n"><v>%.16g</v></c>' % (coordinate, style_attribute,
+                                                           to_excel(value, self.workbook.epoch))
+        if isinstance(value, NUMERIC_TYPES):
+            text = safe_string(value)
+            if not text:
+                return '<c r="{}"{} t="n"><v /></c>'.format(coordinate, style_attribute)
+            return '<c r="{}"{} t="n"><v>{}</v></c>'.format(coordinate, style_attribute, text)
+        raise ValueError("Cannot convert {0!r} to Excel".format(value))
+
+    @staticmethod
+    def _get_comment_record(coordinate: str, comment) -> CommentRecord:
+        comment_record = CommentRecord(ref=coordinate, author=comment.author)
+        comment_record.text.t = comment.content
+        comment_record.height = comment.height
+        comment_record.width = comment.width
+        return comment_record
+
+
+class _SheetDataWorksheetWriter(WorksheetWriter):
+    """Writes a worksheet whose cells were serialized to a :class:`SheetData`. An empty sheetData element is written
+    in place of the cells, and is replaced by the serialized rows when the worksheet is written to the archive.
+    """
+
+    def __init__(self, ws: Worksheet, sheet_data: SheetData):
+        super().__init__(ws)
+        self._sheet_data = sheet_data
+
+    def write_dimensions(self):
+        self.xf.send(SheetDimension(self._sheet_data.dimension).to_tree())
+
+    def write_rows(self):
+        xf = self.xf.send(True)
+        with xf.element('sheetData'):
+            pass
+        self.xf.send(None)
+        # the comments are written after the worksheet, as openpyxl writes the comments of the cells it writes
+        self.ws._comments.extend(self._sheet_data.comments)
+
+
+class WorkbookWriter(OpenpyxlExcelWriter):
+    """Writes a workbook in which some worksheets were already rendered to XML (see
+    :meth:`.StyleFrame.write_workbook`) or had their cells serialized to a :class:`SheetData`.
+
+    :meta private:
+    """
+
+    def __init__(self, workbook: Workbook, archive: zipfile.ZipFile,
+                 rendered_sheets: Optional[Dict[Worksheet, bytes]] = None,
+                 sheets_data: Optional[Dict[Worksheet, SheetData]] = None):
+        super().__init__(workbook, archive)
+        self._rendered_sheets = rendered_sheets or {}
+        self._sheets_data = sheets_data or {}
+
+    def write_worksheet(self, ws):
+        sheet_xml = self._rendered_sheets.get(ws)
+        if sheet_xml is not None:
+            # a rendered sheet has no drawings, comments or other parts that are related to it
+            ws._drawing = SpreadsheetDrawing()
+            self._archive.writestr(ws.path[1:], sheet_xml)
+            self.manifest.append(ws)
+            return
+
+        sheet_data = self._sheets_data.get(ws)
+        if sheet_data is None:
+            super().write_worksheet(ws)
+            return
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        writer = _SheetDataWorksheetWriter(ws, sheet_data)
+        writer.write()
+        ws._rels = writer._rels
+        head, tail = _empty_sheet_data.split(writer.read(), maxsplit=1)
+        with self._archive.open(ws.path[1:], 'w', force_zip64=True) as part:
+            part.write(head + b'<sheetData>')
+            sheet_data.copy_to(part)
+            part.write(b'</sheetData>' + tail)
+        self.manifest.append(ws)
+        writer.cleanup()
+
+
+class NativeExcelWriter(OpenpyxlWriter):
+    """
+    .. versionadded:: 4.2
+
+    A :class:`pandas.ExcelWriter` for the ``styleframe`` engine. Create it with
+    ``StyleFrame.ExcelWriter(path, engine='styleframe')``.
+
+    .. note:: The cells of a sheet are serialized when :meth:`.StyleFrame.to_excel` is called. Cells that are added to
+        the sheet with openpyxl afterwards are not written, and rows' heights must be set before :meth:`.StyleFrame.to_excel`
+        is called. Any other setting of the sheet (columns' widths, for example) can be modified until the writer is saved.
+    """
+
+    _engine = 'styleframe'
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.sheets_data = {}
+
+    def _save(self) -> None:
+        with zipfile.ZipFile(self._handles.handle, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            WorkbookWriter(self.book, archive, sheets_data=self.sheets_data).save()
+        self.sheets_data = {}
+        if 'r+' in self._mode and not isinstance(self._handles.handle, mmap.mmap):
+            # truncate file to the written content
+            self._handles.handle.truncate()
@@ -10,8 +10,7 @@ class Series(pd.Series):
         # enabling the styler accessor (for now only usable using .loc), for example:
         #         sf.loc[sf['col_name'].style.bg_color == utils.colors.yellow]
         #         sf.loc[~sf['col_name'].style.bold]
-        for attr in Styler().__dict__:
-            # a dirty hack to avoid hard-coding all of Styler's attributes
+        for attr in Styler._fields:
             setattr(self, attr, pd.Series(getattr(i, attr) for i in self if isinstance(i, Styler)))
 
     def isnull(self):
@@ -34,5 +33,8 @@ class Series(pd.Series):
 
     @style.setter
     def style(self, value):
+        # the cells share the style, so it is interned and every cell gets its own copy when it is modified
+        if isinstance(value, Styler):
+            value = value.interned()
         for v in self:
             v.style = value
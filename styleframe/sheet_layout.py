@@ -0,0 +1,427 @@
+import pathlib
+from copy import copy
+from functools import partial
+from types import MappingProxyType
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter, range_boundaries
+
+from styleframe.native_writer import SheetData, get_written_value
+from styleframe.style_cache import StyleCache
+from styleframe.style_frame import StyleFrame
+from styleframe.style_table import StyleTable
+from styleframe.styler import Styler
+from styleframe.xlsxwriter_writer import XlsxWriterSheetData
+
+
+class _SheetRows:
+    """Creates the cells of rows in an openpyxl sheet."""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+
+    def write_row(self, row_index: int, first_column: int, values: tuple, style_arrays: list,
+                  comments: Optional[tuple] = None) -> None:
+        for column_index, value, style_array in zip(range(first_column, first_column + len(values)), values,
+                                                    style_arrays):
+            comment = comments[column_index - first_column] if comments else None
+            if value is None and style_array is None and comment is None:
+                continue
+            current_cell = self.sheet.cell(row=row_index, column=column_index, value=value)
+            if style_array is not None:
+                current_cell._style = copy(style_array)
+            if comment is not None:
+                # a comment can be bound to a single cell, and the layout can be written more than once
+                current_cell.comment = copy(comment)
+
+
+class _WriteOnlySheetRows:
+    """Appends rows of cells to a write-only openpyxl sheet."""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self._next_row_index = 1
+
+    def write_row(self, row_index: int, first_column: int, values: tuple, style_arrays: list,
+                  comments: Optional[tuple] = None) -> None:
+        for _ in range(self._next_row_index, row_index):
+            self.sheet.append([])
+        row = [None] * (first_column - 1)
+        for value, style_array, comment in zip(values, style_arrays, comments or [None] * len(values)):
+            if value is None and style_array is None and comment is None:
+                row.append(None)
+                continue
+            streamed_cell = WriteOnlyCell(self.sheet, value=value)
+            if style_array is not None:
+                streamed_cell._style = copy(style_array)
+            if comment is not None:
+                streamed_cell.comment = copy(comment)
+            row.append(streamed_cell)
+        self.sheet.append(row)
+        self._next_row_index = row_index + 1
+
+
+class SheetLayout:
+    """
+    .. versionadded:: 4.2
+
+    A compiled, immutable plan of a sheet, created by :meth:`.StyleFrame.compile_layout`. The values written to the
+    cells, the styles and comments of the cells and the sheet's settings (columns widths, hidden columns, rows
+    heights, filters, frozen panes, protection and conditional formatting) are all resolved when the layout is
+    compiled. The layout can then be written any number of times, to writers of any engine, without modifying the
+    StyleFrame and without resolving anything again, or rendered with the values of other DataFrames that have the
+    same columns (see :meth:`render`).
+
+    .. note:: The layout is a snapshot: changes made to the StyleFrame after the layout was compiled do not affect it.
+    """
+
+    __slots__ = ('_first_row', '_first_column', '_header', '_index', '_na_rep', '_columns_values', '_values',
+                 '_style_ids', '_styles', '_comments', '_columns', '_rows_height', '_auto_filter', '_freeze_panes',
+                 '_right_to_left', '_protection', '_conditional_formats', '_rows_period')
+
+    def __init__(self, sf: StyleFrame, header: bool = True, index: bool = False, startrow: int = 0,
+                 startcol: int = 0, na_rep: str = '', allow_protection: bool = False, right_to_left: bool = False,
+                 columns_to_hide: Union[None, str, list, tuple, set] = None,
+                 row_to_add_filters: Optional[int] = None, columns_and_rows_to_freeze: Optional[str] = None,
+                 best_fit: Union[None, str, list, tuple, set] = None):
+        data_df = sf.data_df
+        columns_width = dict(sf._columns_width)
+        if best_fit:
+            if not isinstance(best_fit, (list, set, tuple)):
+                best_fit = [best_fit]
+            columns_width.update(sf._get_best_fit_columns_width(best_fit))
+
+        # the sheet's settings are resolved exactly as to_excel applies them, to a sheet that is never saved
+        settings_sheet = Workbook().active
+        max_row = startrow + len(data_df) + (1 if header else 0)
+        max_column = startcol + len(data_df.columns) + (1 if index else 0)
+        sf._apply_sheet_settings(settings_sheet, columns_width, startrow=startrow,
+                                 startcol=startcol + (1 if index else 0), max_row=max_row, max_column=max_column,
+                                 allow_protection=allow_protection, right_to_left=right_to_left,
+                                 columns_to_hide=columns_to_hide, row_to_add_filters=row_to_add_filters,
+                                 columns_and_rows_to_freeze=columns_and_rows_to_freeze)
+
+        style_table = StyleTable()
+        rows_values, style_ids, rows_comments = self._resolve_cells(sf, style_table, header, index, na_rep, best_fit)
+        # the styles are ordered by the first cell that uses them, which is the order in which openpyxl registers
+        # the styles of the cells it writes with the workbook
+        unique_ids, first_indexes = np.unique(style_ids, return_index=True)
+        styles_order = unique_ids[np.argsort(first_indexes)]
+        new_ids = np.empty(len(style_table), dtype=np.int32)
+        new_ids[styles_order] = np.arange(len(styles_order), dtype=np.int32)
+        style_ids = new_ids[style_ids]
+        style_ids.setflags(write=False)
+
+        # the layout is immutable, so its attributes are set bypassing __setattr__
+        set_attribute = partial(object.__setattr__, self)
+        set_attribute('_first_row', startrow + 1)
+        set_attribute('_first_column', startcol + 1)
+        set_attribute('_header', bool(header))
+        set_attribute('_index', bool(index))
+        set_attribute('_na_rep', na_rep)
+        set_attribute('_columns_values', tuple(column.value for column in data_df.columns))
+        set_attribute('_values', tuple(rows_values))
+        set_attribute('_style_ids', style_ids)
+        set_attribute('_styles', tuple(style_table[style_id] for style_id in styles_order))
+        set_attribute('_comments', MappingProxyType({row_offset: tuple(comments)
+                                                     for row_offset, comments in rows_comments.items()}))
+        set_attribute('_rows_period', self._get_rows_period(style_ids, rows_comments, 1 if header else 0,
+                                                            sf._alternate_rows_period))
+        set_attribute('_columns', tuple((column_letter, column_dimension.width, column_dimension.hidden)
+                                        for column_letter, column_dimension
+                                        in settings_sheet.column_dimensions.items()))
+        set_attribute('_rows_height', tuple((row_index, row_dimension.height)
+                                            for row_index, row_dimension in settings_sheet.row_dimensions.items()
+                                            if row_dimension.height is not None))
+        set_attribute('_auto_filter', settings_sheet.auto_filter.ref)
+        set_attribute('_freeze_panes', settings_sheet.freeze_panes)
+        set_attribute('_right_to_left', bool(right_to_left))
+        set_attribute('_protection', bool(allow_protection))
+        # the ranges of the conditional formats span the rows of the data, so only their columns are kept
+        set_attribute('_conditional_formats', tuple(
+            (range_boundaries(str(conditional_formatting.sqref))[0::2], copy(rule))
+            for conditional_formatting in settings_sheet.conditional_formatting
+            for rule in conditional_formatting.rules))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+    def __repr__(self) -> str:
+        return '{}(shape={})'.format(type(self).__name__, self.shape)
+
+    @property
+    def shape(self) -> tuple:
+        """The number of rows and columns of cells the layout writes, including the headers and the index."""
+
+        return self._style_ids.shape
+
+    def write(self, excel_writer: Union[str, pd.ExcelWriter, pathlib.Path] = 'output.xlsx',
+              sheet_name: str = 'Sheet1', style_cache: Optional[StyleCache] = None) -> pd.ExcelWriter:
+        """Writes the layout to a new sheet.
+
+        :param excel_writer: File path or existing ExcelWriter of any of the engines :meth:`.StyleFrame.ExcelWriter`
+            supports. The workbook of an openpyxl writer may be write-only.
+        :type excel_writer: str or :class:`pandas.ExcelWriter` or :class:`pathlib.Path`
+        :param str sheet_name: Name of the sheet the layout will be written to. The sheet must not exist.
+        :param style_cache: The cache of the styles registered with an openpyxl workbook.
+            If ``None``, the workbook's own cache (see :meth:`.StyleCache.for_workbook`) is used.
+        :type style_cache: None or :class:`.StyleCache`
+
+        :rtype: :class:`pandas.ExcelWriter`
+        """
+
+        return self._write(excel_writer, sheet_name, style_cache, self._values, self._style_ids, self._comments)
+
+    def render(self, df: pd.DataFrame, excel_writer: Union[str, pd.ExcelWriter, pathlib.Path] = 'output.xlsx',
+               sheet_name: str = 'Sheet1', style_cache: Optional[StyleCache] = None) -> pd.ExcelWriter:
+        """Writes the layout to a new sheet with the values of another DataFrame that has the same columns, for
+        example a fresh run of the same report. The layout's headers, styles, comments and sheet settings are
+        reused as they are, so only the DataFrame's values are converted and written.
+
+        The cells of the DataFrame's n-th row get the styles of the n-th row the layout was compiled with. The
+        DataFrame may have more rows than the layout only if the styles and comments of the layout's rows repeat,
+        either because all the rows are styled alike or because they were styled by
+        :meth:`.StyleFrame.style_alternate_rows` (and not styled differently afterwards). The extra rows then
+        continue the repetition, for example the alternation of an odd number of rows. The conditional formatting
+        spans all the DataFrame's rows.
+
+        .. note:: The styles are not resolved again from the new values, so a cell gets the style (for example, the
+            date format or the hyperlink style) of the layout's cell in its position.
+
+        :param df: The data to write. Must have the same columns as the StyleFrame the layout was compiled from.
+        :type df: :class:`pandas.DataFrame`
+        :param excel_writer: File path or existing ExcelWriter (see :meth:`write`)
+        :type excel_writer: str or :class:`pandas.ExcelWriter` or :class:`pathlib.Path`
+        :param str sheet_name: Name of the sheet the layout will be written to. The sheet must not exist.
+        :param style_cache: The cache of the styles registered with an openpyxl workbook (see :meth:`write`)
+        :type style_cache: None or :class:`.StyleCache`
+
+        :rtype: :class:`pandas.ExcelWriter`
+        :raises ValueError: If the DataFrame has more rows than the layout and the styles of the layout's rows do
+            not repeat
+        """
+
+        if tuple(df.columns) != self._columns_values:
+            raise ValueError('df must have the same columns as the layout: {}'.format(list(self._columns_values)))
+        num_of_header_rows = 1 if self._header else 0
+        num_of_layout_rows = len(self._values) - num_of_header_rows
+        if len(df) > 0 and num_of_layout_rows == 0:
+            raise ValueError('the layout has no rows to take the styles of the rows of df from')
+        if len(df) > num_of_layout_rows and self._rows_period is None:
+            raise ValueError('df has {} rows but the layout has {} and the styles of its rows do not repeat'
+                             .format(len(df), num_of_layout_rows))
+
+        columns_values = [[get_written_value(value, self._na_rep) for value in df.index]] if self._index else []
+        columns_values.extend([get_written_value(value, self._na_rep) for value in df.iloc[:, col_index].tolist()]
+                              for col_index in range(len(df.columns)))
+        rows_values = list(self._values[:num_of_header_rows])
+        rows_values.extend(zip(*columns_values) if columns_values else [()] * len(df))
+
+        # every row of df takes the styles (and comments) of a row of the layout
+        data_rows = np.arange(len(df))
+        if self._rows_period is not None:
+            data_rows %= self._rows_period
+        layout_rows = np.concatenate([np.arange(num_of_header_rows), num_of_header_rows + data_rows])
+        rows_comments = {row_offset: self._comments[layout_row]
+                         for row_offset, layout_row in enumerate(layout_rows.tolist())
+                         if layout_row in self._comments}
+        return self._write(excel_writer, sheet_name, style_cache, rows_values, self._style_ids[layout_rows],
+                           rows_comments)
+
+    def _write(self, excel_writer, sheet_name: str, style_cache: Optional[StyleCache], rows_values,
+               style_ids: np.ndarray, rows_comments) -> pd.ExcelWriter:
+        if isinstance(excel_writer, (str, pathlib.Path)):
+            excel_writer = StyleFrame.ExcelWriter(excel_writer)
+        if excel_writer.engine not in ('openpyxl', 'styleframe', 'xlsxwriter'):
+            raise TypeError('styleframe supports only openpyxl and xlsxwriter, attempted to use {}'
+                            .format(excel_writer.engine))
+        workbook = excel_writer.book
+
+        num_of_data_rows = len(rows_values) - (1 if self._header else 0)
+        if excel_writer.engine == 'xlsxwriter':
+            if workbook.get_worksheet_by_name(sheet_name) is not None:
+                raise ValueError('sheet {} already exists'.format(sheet_name))
+            sheet_rows = XlsxWriterSheetData(excel_writer.book.add_worksheet(sheet_name), workbook)
+            excel_writer.sheets[sheet_name] = sheet_rows.worksheet
+            settings_sheet = Workbook().active
+            self._apply_settings(settings_sheet, num_of_data_rows)
+            sheet_rows.apply_sheet_settings(settings_sheet)
+            get_cell_format = sheet_rows.get_cell_format
+        else:
+            if sheet_name in workbook.sheetnames:
+                raise ValueError('sheet {} already exists'.format(sheet_name))
+            if style_cache is None:
+                style_cache = StyleCache.for_workbook(workbook)
+            sheet = workbook.create_sheet(sheet_name)
+            excel_writer.sheets[sheet_name] = sheet
+            # a streamed sheet can not be modified once its rows were written
+            self._apply_settings(sheet, num_of_data_rows)
+
+            def get_style_array(style):
+                return None if style is None else StyleFrame._get_style_array(style, workbook, style_cache)
+
+            if excel_writer.engine == 'styleframe':
+                if workbook.write_only:
+                    raise ValueError('the styleframe engine does not support write-only workbooks')
+                sheet_rows = excel_writer.sheets_data[sheet] = SheetData(sheet)
+
+                def get_cell_format(style):
+                    return '' if style is None else sheet_rows.get_style_attribute(get_style_array(style))
+            else:
+                sheet_rows = _WriteOnlySheetRows(sheet) if workbook.write_only else _SheetRows(sheet)
+                get_cell_format = get_style_array
+
+        # the styles are registered in the order in which the cells that use them are written
+        cell_formats = [get_cell_format(style) for style in self._styles]
+        for row_offset, (values, row_style_ids) in enumerate(zip(rows_values, style_ids.tolist())):
+            sheet_rows.write_row(self._first_row + row_offset, self._first_column, values,
+                                 [cell_formats[style_id] for style_id in row_style_ids], rows_comments.get(row_offset))
+        return excel_writer
+
+    def _apply_settings(self, sheet, num_of_data_rows: int) -> None:
+        for column_letter, width, hidden in self._columns:
+            sheet.column_dimensions[column_letter].width = width
+            sheet.column_dimensions[column_letter].hidden = hidden
+        for row_index, height in self._rows_height:
+            sheet.row_dimensions[row_index].height = height
+        if self._auto_filter:
+            sheet.auto_filter.ref = self._auto_filter
+        if self._freeze_panes:
+            sheet.freeze_panes = self._freeze_panes
+        sheet.sheet_view.rightToLeft = self._right_to_left
+        if self._protection:
+            sheet.protection.autoFilter = False
+            sheet.protection.enable()
+        for (min_column, max_column), rule in self._conditional_formats:
+            range_string = '{}{}:{}{}'.format(get_column_letter(min_column), self._first_row,
+                                              get_column_letter(max_column), self._first_row + num_of_data_rows)
+            # adding a rule to a sheet sets its priority
+            sheet.conditional_formatting.add(range_string, copy(rule))
+
+    @staticmethod
+    def _get_rows_period(style_ids: np.ndarray, rows_comments: dict, first_data_row: int,
+                         alternate_rows_period: Optional[int]) -> Optional[int]:
+        """
+        :return: The number of data rows after which the styles and comments of the data rows repeat: the period of
+            the StyleFrame's alternating rows, or 1 if all the rows are alike. ``None`` if the rows do not repeat
+            with either.
+        """
+
+        rows = [(style_ids[row_offset].tobytes(),
+                 tuple(None if comment is None else (comment.text, comment.author)
+                       for comment in rows_comments.get(row_offset, ())))
+                for row_offset in range(first_data_row, len(style_ids))]
+        for period in (alternate_rows_period, 1):
+            if period and all(row == rows[row_offset % period] for row_offset, row in enumerate(rows)):
+                return period
+        return None
+
+    @staticmethod
+    def _resolve_cells(sf: StyleFrame, style_table: StyleTable, header: bool, index: bool, na_rep,
+                       best_fit) -> Tuple[list, np.ndarray, dict]:
+        """Resolves the values, styles and comments of the cells, with the values and styles
+        :meth:`.StyleFrame.to_excel` gives the openpyxl cells it creates. The cells are resolved column by column,
+        a block of rows at a time.
+
+        :return: The values of every row, the ids of the cells' styles in style_table and the comments of the rows
+            that have comments
+        """
+
+        data_df = sf.data_df
+        derived_styles = {}
+        num_of_columns = len(data_df.columns) + (1 if index else 0)
+        rows_values = []
+        style_ids = np.empty((len(data_df) + (1 if header else 0), num_of_columns), dtype=np.int32)
+        rows_comments = {}
+
+        def add_rows(columns_values, columns_styles, columns_comments, num_of_rows):
+            first_row_offset = len(rows_values)
+            for col_offset, (styles, comments) in enumerate(zip(columns_styles, columns_comments)):
+                style_ids[first_row_offset:first_row_offset + num_of_rows, col_offset] = style_table.ids(
+                    styles, count=num_of_rows)
+                if any(comment is not None for comment in comments):
+                    for row_offset, comment in enumerate(comments, first_row_offset):
+                        if comment is not None:
+                            rows_comments.setdefault(row_offset, [None] * num_of_columns)[col_offset] = comment
+            rows_values.extend(zip(*columns_values) if columns_values else [()] * num_of_rows)
+
+        if header:
+            # the default headers style is used without being applied to the StyleFrame
+            if sf._has_custom_headers_style:
+                index_header_style = sf._index_header_style
+                headers_styles = [column._style for column in data_df.columns]
+            else:
+                index_header_style = Styler.default_header_style().interned()
+                headers_styles = [index_header_style] * len(data_df.columns)
+            values, styles, comments = [], [], []
+            if index:
+                index_name = data_df.index.name
+                values.append(get_written_value(index_name, na_rep) if index_name else None)
+                styles.append(index_header_style if index_name else None)
+                comments.append(None)
+            headers_date_time_kinds = sf._get_date_time_kinds([column.value for column in data_df.columns])
+            for column, header_style, date_time_kind in zip(data_df.columns, headers_styles, headers_date_time_kinds):
+                values.append(get_written_value(column.value, na_rep))
+                styles.append(sf._get_style_to_apply(derived_styles, header_style, date_time_kind))
+                comments.append(sf._get_comment(header_style))
+            add_rows([[value] for value in values], [[style] for style in styles],
+                     [[comment] for comment in comments], 1)
+
+        # the styles (and comments) of the cells depend only on their containers' styles, their date/time kind and
+        # whether they are hyperlinks, so they are resolved once for every such combination
+        resolved_styles = {}
+
+        def resolve_index_style(index_style, date_time_kind):
+            key = (id(index_style), date_time_kind)
+            try:
+                return resolved_styles[key]
+            except KeyError:
+                resolved = resolved_styles[key] = (sf._get_style_to_apply(derived_styles, index_style,
+                                                                          date_time_kind),
+                                                   sf._get_comment(index_style))
+                return resolved
+
+        def resolve_cell_style(container, value, date_time_kind, column):
+            container_style = getattr(container, '_style', None)
+            key = (id(container_style), date_time_kind, isinstance(value, str) and '=HYPERLINK' in value,
+                   id(column) if best_fit else None)
+            try:
+                return resolved_styles[key]
+            except KeyError:
+                resolved = resolved_styles[key] = sf._get_cell_style_to_apply(derived_styles, container, value,
+                                                                              date_time_kind, column, best_fit)
+                return resolved
+
+        for block_start in range(0, len(data_df), sf._sheet_data_block_size):
+            block = slice(block_start, block_start + sf._sheet_data_block_size)
+            columns_values, columns_styles, columns_comments = [], [], []
+            if index:
+                index_values = [index_value.value for index_value in data_df.index[block]]
+                resolved = [resolve_index_style(index_value._style, date_time_kind)
+                            for index_value, date_time_kind in zip(data_df.index[block],
+                                                                   sf._get_date_time_kinds(index_values))]
+                columns_values.append([get_written_value(value, na_rep) for value in index_values])
+                columns_styles.append([style for style, _ in resolved])
+                columns_comments.append([comment for _, comment in resolved])
+            for col_index, column in enumerate(data_df.columns):
+                containers = data_df.iloc[block, col_index].tolist()
+                raw_values = [getattr(container, 'value', container) for container in containers]
+                values = [get_written_value(value, na_rep) for value in raw_values]
+                resolved = [resolve_cell_style(container, value, date_time_kind, column)
+                            for container, value, date_time_kind in zip(containers, values,
+                                                                        sf._get_date_time_kinds(raw_values))]
+                columns_values.append(values)
+                columns_styles.append([style for style, _ in resolved])
+                columns_comments.append([comment for _, comment in resolved])
+
+            add_rows(columns_values, columns_styles, columns_comments, len(data_df.index[block]))
+
+        return rows_values, style_ids, rows_comments
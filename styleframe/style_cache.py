@@ -0,0 +1,97 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock, RLock
+from typing import Any, Hashable, Optional
+from weakref import WeakKeyDictionary
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class StyleCache:
+    """
+    .. versionadded:: 4.2
+
+    A thread-safe, size-limited cache with least-recently-used eviction.
+    Used to cache the openpyxl styles that are created for :class:`.Styler` objects, both globally (``Styler.cache``)
+    and per workbook (see :meth:`for_workbook`).
+
+    :param maxsize: The maximal number of entries in the cache. If ``None`` the cache is unbounded.
+    :type maxsize: None or int
+    """
+
+    DEFAULT_MAXSIZE = 4096
+
+    _workbook_caches = WeakKeyDictionary()
+    _workbook_caches_lock = Lock()
+
+    def __init__(self, maxsize: Optional[int] = DEFAULT_MAXSIZE):
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError('maxsize must be a positive integer or None')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = RLock()
+
+    @classmethod
+    def for_workbook(cls, workbook) -> 'StyleCache':
+        """
+        :param workbook: The workbook the cache is scoped to
+        :type workbook: :class:`openpyxl.workbook.workbook.Workbook`
+        :return: The cache of the given workbook, which is created the first time it is requested and is discarded
+            together with the workbook
+        :rtype: :class:`StyleCache`
+        """
+
+        with cls._workbook_caches_lock:
+            try:
+                return cls._workbook_caches[workbook]
+            except KeyError:
+                cache = cls._workbook_caches[workbook] = cls()
+                return cache
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __getitem__(self, key: Hashable):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.hits += 1
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def clear(self) -> None:
+        """Removes all entries from the cache and resets its counters."""
+
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        :return: The cache's statistics, in the same form as :func:`functools.lru_cache`'s ``cache_info``
+        :rtype: CacheInfo
+        """
+
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
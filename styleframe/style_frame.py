@@ -1,24 +1,46 @@
 import datetime as dt
+import hashlib
+import operator
+import os
 import pathlib
+import pickle
+import re
+import tempfile
+import zipfile
 
 from collections import OrderedDict
 from collections.abc import Iterable
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy, deepcopy
 from functools import partial
-from typing import Union, Optional, List, Dict, Tuple, Set
+from io import BytesIO
+from itertools import chain, count, islice, repeat
+from threading import Lock
+from types import SimpleNamespace
+from typing import Any, Union, Optional, List, Dict, Tuple, Set, Callable
 
 import numpy as np
 import pandas as pd
 
 from openpyxl import load_workbook, Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.read_only import ReadOnlyCell, EMPTY_CELL
 from openpyxl.cell.cell import get_column_letter, Cell
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
 from openpyxl.utils import cell
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+from openpyxl.worksheet._writer import WorksheetWriter
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.xml.functions import fromstring, QName
 
 from styleframe.container import Container
+from styleframe.native_writer import NativeExcelWriter, WorkbookWriter, get_written_value
 from styleframe.series import Series
-from styleframe.styler import Styler, ColorScaleConditionalFormatRule
+from styleframe.style_cache import StyleCache
+from styleframe.style_table import StyleTable
+from styleframe.styler import Styler, FrozenStyler, ColorScaleConditionalFormatRule
+from styleframe.version import _version_
 from . import utils
 
 try:
@@ -26,6 +48,15 @@ try:
 except AttributeError:
     pd_timestamp = pd.tslib.Timestamp
 
+_named_styles_lock = Lock()
+
+# the style id attributes of the cells, rows and columns of a worksheet's XML
+_style_id_attribute = re.compile(rb'(<(?:c|row|col)\b[^>]* (?:s|style)=")(\d+)"')
+
+# the workbook's collections a cell's style array points into
+_style_collections = (('_fonts', 'fontId'), ('_fills', 'fillId'), ('_borders', 'borderId'),
+                      ('_alignments', 'alignmentId'), ('_protections', 'protectionId'))
+
 
 class StyleFrame:
     """
@@ -42,11 +73,31 @@ class StyleFrame:
     P_FACTOR: Union[int, float] = 1.3
     A_FACTOR: Union[int, float] = 13
 
+    # the number of rows a layout resolves at a time (see compile_layout)
+    _sheet_data_block_size = 10000
+
+    _date_time_kinds_by_type = {pd_timestamp: 'date_time', dt.datetime: 'date_time', dt.date: 'date', dt.time: 'time'}
+    _date_time_kinds_by_inferred_dtype = {'datetime64': 'date_time', 'datetime': 'date_time', 'date': 'date',
+                                          'time': 'time'}
+    _default_number_formats_by_date_time_kind = {'date_time': utils.number_formats.date_time,
+                                                 'date': utils.number_formats.date,
+                                                 'time': utils.number_formats.time_24_hours}
+
     def __init__(self, obj, styler_obj: Optional[Styler] = None, columns: Optional[List[str]] = None):
         from_another_styleframe = False
         from_pandas_dataframe = False
         if styler_obj and not isinstance(styler_obj, Styler):
             raise TypeError('styler_obj must be {}, got {} instead.'.format(Styler.__name__, type(styler_obj).__name__))
+
+        # all the cells share the same interned style objects, so memory scales with the number of unique styles
+        # and not with the number of cells
+        shared_styler_obj = styler_obj.interned() if styler_obj is not None else None
+
+        def to_container(value):
+            if isinstance(value, Container):
+                return value
+            return Container(value, shared_styler_obj)
+
         if isinstance(obj, (pd.DataFrame, np.ndarray)):
             from_pandas_dataframe = True
             if isinstance(obj, np.ndarray):
@@ -56,38 +107,103 @@ class StyleFrame:
             if obj.empty:
                 self.data_df = deepcopy(obj)
             else:
-                self.data_df = obj.applymap(lambda x: Container(x, deepcopy(styler_obj)) if not isinstance(x, Container) else x)
+                self.data_df = obj.applymap(to_container)
         elif isinstance(obj, pd.Series):
-            self.data_df = obj.apply(lambda x: Container(x, deepcopy(styler_obj)) if not isinstance(x, Container) else x)
+            self.data_df = obj.apply(to_container)
         elif isinstance(obj, (dict, list)):
-            self.data_df = pd.DataFrame(obj).applymap(lambda x: Container(x, deepcopy(styler_obj)) if not isinstance(x, Container) else x)
+            self.data_df = pd.DataFrame(obj).applymap(to_container)
         elif isinstance(obj, StyleFrame):
-            self.data_df = deepcopy(obj.data_df)
+            # copy-on-write: the cells' containers, and their styles, are shared with obj until one of the frames
+            # is about to modify them or hand them out (see _copy_containers_on_write), so copying a StyleFrame does
+            # not copy its cells. the columns and index are small, so their containers are copied right away
+            self.data_df = obj.data_df.copy()
+            self.data_df.columns = [copy(col) for col in obj.data_df.columns]
+            self.data_df.index = [copy(index) for index in obj.data_df.index]
+            self.data_df.index.name = obj.data_df.index.name
+            obj._shares_containers = True
             from_another_styleframe = True
         else:
             raise TypeError("{} __init__ doesn't support {}".format(type(self).__name__, type(obj).__name__))
-        self.data_df.columns = [Container(col, deepcopy(styler_obj)) if not isinstance(col, Container) else deepcopy(col)
-                                for col in self.data_df.columns]
-        self.data_df.index = [Container(index, deepcopy(styler_obj)) if not isinstance(index, Container) else deepcopy(index)
-                              for index in self.data_df.index]
+        if not from_another_styleframe:
+            self.data_df.columns = [to_container(col) if not isinstance(col, Container) else deepcopy(col)
+                                    for col in self.data_df.columns]
+            self.data_df.index = [to_container(index) if not isinstance(index, Container) else deepcopy(index)
+                                  for index in self.data_df.index]
+        self._shares_containers = from_another_styleframe
 
         if from_pandas_dataframe:
             self.data_df.index.name = obj.index.name
 
-        self._columns_width = obj._columns_width if from_another_styleframe else OrderedDict()
-        self._rows_height = obj._rows_height if from_another_styleframe else OrderedDict()
+        self._columns_width = OrderedDict(obj._columns_width) if from_another_styleframe else OrderedDict()
+        self._rows_height = OrderedDict(obj._rows_height) if from_another_styleframe else OrderedDict()
         self._has_custom_headers_style = obj._has_custom_headers_style if from_another_styleframe else False
         self._cond_formatting: List[ColorScaleConditionalFormatRule] = []
         self._default_style = styler_obj or Styler()
         self._index_header_style = obj._index_header_style if from_another_styleframe else self._default_style
+        self._alternate_rows_period = obj._alternate_rows_period if from_another_styleframe else None
+
+        self._known_attrs = {}
+        self._update_known_attrs()
 
-        self._known_attrs = {'at': self.data_df.at,
-                             'loc': self.data_df.loc,
-                             'iloc': self.data_df.iloc,
-                             'applymap': self.data_df.applymap,
-                             'groupby': self.data_df.groupby,
-                             'index': self.data_df.index,
-                             'fillna': self.data_df.fillna}
+    def _update_known_attrs(self) -> None:
+        self._known_attrs.update({'at': self.data_df.at,
+                                  'loc': self.data_df.loc,
+                                  'iloc': self.data_df.iloc,
+                                  'applymap': self.data_df.applymap,
+                                  'groupby': self.data_df.groupby,
+                                  'index': self.data_df.index,
+                                  'fillna': self.data_df.fillna})
+
+    def _copy_containers_on_write(self) -> None:
+        """Gives the StyleFrame its own cells' containers, if they are shared with another StyleFrame, before they
+        are modified or handed out (by ``__getitem__``, ``loc``, ``at`` and the like). The interned styles
+        themselves are still shared, since a container copies its style before it can be modified in place.
+
+        :meta private:
+        """
+
+        if not self._shares_containers:
+            return
+        self.data_df = self.data_df.applymap(copy)
+        self._update_known_attrs()
+        self._shares_containers = False
+
+    def __getstate__(self) -> dict:
+        # pickled in the columnar form (see _to_style_matrix), so every distinct style is pickled once
+        values, style_ids, style_table = self._to_style_matrix()
+        columns_style_ids = style_table.ids(col._style for col in self.data_df.columns)
+        index_style_ids = style_table.ids(index._style for index in self.data_df.index)
+        return {'values': values,
+                'style_ids': style_ids,
+                'styles': list(style_table),
+                'columns_style_ids': columns_style_ids,
+                'index_style_ids': index_style_ids,
+                'columns_width': self._columns_width,
+                'rows_height': self._rows_height,
+                'has_custom_headers_style': self._has_custom_headers_style,
+                'cond_formatting': self._cond_formatting,
+                'default_style': self._default_style,
+                'index_header_style': self._index_header_style,
+                'alternate_rows_period': self._alternate_rows_period}
+
+    def __setstate__(self, state: dict) -> None:
+        # the styles are interned since equal styles of the cells, columns and index are unpickled as one object
+        style_table = StyleTable(style.interned() if isinstance(style, Styler) else style
+                                 for style in state['styles'])
+        sf = self._from_style_matrix(state['values'], state['style_ids'], style_table)
+        for col, style in zip(sf.data_df.columns, style_table.take(state['columns_style_ids'])):
+            col.style = style
+        for index, style in zip(sf.data_df.index, style_table.take(state['index_style_ids'])):
+            index.style = style
+        self.__dict__.update(sf.__dict__)
+        self._columns_width = state['columns_width']
+        self._rows_height = state['rows_height']
+        self._has_custom_headers_style = state['has_custom_headers_style']
+        self._cond_formatting = state['cond_formatting']
+        self._default_style = state['default_style']
+        self._index_header_style = state['index_header_style']
+        # StyleFrames pickled by older versions do not have the period of their alternating rows
+        self._alternate_rows_period = state.get('alternate_rows_period')
 
     def __str__(self):
         return str(self.data_df)
@@ -98,6 +214,7 @@ class StyleFrame:
     def __getitem__(self, item):
         if isinstance(item, pd.Series):
             return self.data_df.__getitem__(item).index
+        self._copy_containers_on_write()
         if isinstance(item, list):
             return StyleFrame(self.data_df.__getitem__(item))
         return Series(self.data_df.__getitem__(item))
@@ -113,11 +230,14 @@ class StyleFrame:
 
     def __getattr__(self, attr):
         if attr in self.data_df.columns:
+            self._copy_containers_on_write()
             return self.data_df[attr]
-        try:
-            return self._known_attrs[attr]
-        except KeyError:
+        if attr not in self._known_attrs:
             raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, attr))
+        if attr != 'index':
+            # loc, at, applymap and the like hand out the cells' containers
+            self._copy_containers_on_write()
+        return self._known_attrs[attr]
 
     @property
     def columns(self) -> List[Container]:
@@ -128,7 +248,10 @@ class StyleFrame:
         self.data_df.columns = [col if isinstance(col, Container) else Container(value=col)
                                 for col in columns]
 
-    def _get_column_as_letter(self, sheet: Worksheet, column_to_convert, startcol: int = 0) -> str:
+    def _get_column_as_letter(self, sheet: Worksheet, column_to_convert, startcol: int = 0,
+                              max_column: Optional[int] = None) -> str:
+        if max_column is None:
+            max_column = sheet.max_column
         col = column_to_convert.value if isinstance(column_to_convert, Container) else column_to_convert
         if not isinstance(col, (int, str)):
             raise TypeError("column must be an index, column letter or column name")
@@ -142,16 +265,40 @@ class StyleFrame:
             column_as_letter = cell.get_column_letter(startcol + col)
 
         # assuming we got column letter
-        elif isinstance(col, str) and col <= get_column_letter(sheet.max_column):
+        elif isinstance(col, str) and col <= get_column_letter(max_column):
             column_as_letter = col
 
-        if column_as_letter is None or cell.column_index_from_string(column_as_letter) > sheet.max_column:
+        if column_as_letter is None or cell.column_index_from_string(column_as_letter) > max_column:
             raise IndexError("column: %s is out of columns range." % column_to_convert)
         return column_as_letter
 
+    @staticmethod
+    def _get_read_cache_file(cache_dir: Union[str, pathlib.Path], path, read_args: tuple) -> Optional[pathlib.Path]:
+        """
+        Returns the file in cache_dir that the result of reading path with read_args is cached in, or None if
+        the result can not be cached
+
+        :meta private:
+        """
+
+        if not isinstance(path, (str, os.PathLike)):
+            return None
+        try:
+            # arguments that can not be pickled (such as lambdas) can not be reliably identified
+            read_args_hash = hashlib.sha256(pickle.dumps((_version_, read_args), protocol=4)).hexdigest()
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return None
+        content_hash = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(partial(f.read, 1024 * 1024), b''):
+                content_hash.update(chunk)
+        return pathlib.Path(cache_dir) / '{}-{}.pickle'.format(content_hash.hexdigest(), read_args_hash[:16])
+
     @classmethod
-    def read_excel(cls, path: str, sheet_name: Union[str, int] = 0, read_style: bool = False,
-                   use_openpyxl_styles: bool = False, read_comments: bool = False, **kwargs) -> 'StyleFrame':
+    def read_excel(cls, path: str, sheet_name: Union[str, int, List[Union[str, int]], None] = 0,
+                   read_style: bool = False, use_openpyxl_styles: bool = False, read_comments: bool = False,
+                   read_only: bool = False, cache_dir: Union[str, pathlib.Path, None] = None,
+                   **kwargs) -> Union['StyleFrame', Dict[Union[str, int], 'StyleFrame']]:
         """
         Creates a StyleFrame object from an existing Excel.
 
@@ -160,7 +307,12 @@ class StyleFrame:
         :param str path: The path to the Excel file to read.
         :param sheet_name: The sheet name to read. If an integer is provided then it be used as a zero-based
                 sheet index. Default is 0.
-        :type sheet_name: str or int
+                A list of sheet names and/or indexes, or ``None`` for all the sheets, reads several sheets and returns
+                a dict of StyleFrame objects keyed like :func:`pandas.read_excel`'s. The workbook is loaded only once
+                for all of them.
+
+                .. versionchanged:: 4.2
+        :type sheet_name: str or int or list or None
         :param bool read_style: If ``True`` the sheet's style will be loaded to the returned StyleFrame object.
         :param bool use_openpyxl_styles: If ``True`` (and `read_style` is also ``True``) then the styles in the returned
             StyleFrame object will be Openpyxl's style objects. If ``False``, the styles will be :class:`.Styler` objects.
@@ -173,9 +325,25 @@ class StyleFrame:
 
         :param bool read_comments: If ``True`` (and `read_style` is also ``True``) cells' comments will be loaded to the returned StyleFrame object. Note
                 that reading comments without reading styles is currently not supported.
-
-        :return: StyleFrame object
-        :rtype: :class:`StyleFrame`
+        :param bool read_only: If ``True`` (and `read_style` is also ``True``) the workbook is opened in openpyxl's
+            read-only mode and the styles are read while streaming the sheet's rows in order, so the sheet is never
+            held in memory as a whole. Columns' widths and rows' heights are not read in this mode, and it can not
+            be used together with ``read_comments``.
+            The styles are read from the cells that pandas reads the values from (taking ``usecols``, ``skiprows``
+            and ``nrows`` into account), and in this mode only the range of these cells is loaded.
+
+            .. versionadded:: 4.2
+        :param cache_dir: If provided, the returned StyleFrame object (or objects) is cached in this directory,
+            keyed by the contents of the file and the arguments it is read with. Reading the same file again with
+            the same arguments loads the cached result instead of parsing the file.
+            The cache is stored with :mod:`pickle`, so only directories that are trusted should be used.
+            Reading with ``use_openpyxl_styles=True``, or with arguments that can not be pickled, is not cached.
+
+            .. versionadded:: 4.2
+        :type cache_dir: None or str or :class:`pathlib.Path`
+
+        :return: StyleFrame object, or a dict of StyleFrame objects if several sheets are read
+        :rtype: :class:`StyleFrame` or dict
         """
 
         def _get_scheme_colors_from_excel(wb: Workbook) -> List[str]:
@@ -195,62 +363,269 @@ class StyleFrame:
                         colors.append(accent.attrib['val'])
             return colors
 
-        def _get_style_object(sheet: Worksheet, theme_colors: List[str], row: int, column: int) -> Union[Cell, Styler]:
-            cell = sheet.cell(row=row, column=column)
+        def _get_style_object(cell: Union[Cell, ReadOnlyCell], theme_colors: List[str],
+                              converted_styles: Dict[StyleArray, Styler]) -> Union[Cell, ReadOnlyCell, Styler]:
             if use_openpyxl_styles:
                 return cell
+            style_array = cell.style_array if read_only else cell._style
+            # every distinct style of the workbook is converted once, and is shared by all the cells that use it
+            try:
+                styler_obj = converted_styles[style_array]
+            except KeyError:
+                styler_obj = converted_styles[copy(style_array)] = Styler.from_openpyxl_style(cell,
+                                                                                              theme_colors).interned()
+            if read_comments and cell.comment:
+                styler_obj = styler_obj.replace(comment_author=cell.comment.author,
+                                                comment_text=cell.comment.text).interned()
+            return styler_obj
+
+        def _get_sheet(wb: Workbook, sheet_key: Union[str, int]) -> Union[Worksheet, ReadOnlyWorksheet]:
+            if isinstance(sheet_key, str):
+                return wb[sheet_key]
+            elif isinstance(sheet_key, int):
+                return wb.worksheets[sheet_key]
+            else:
+                raise TypeError("'sheet_name' must be a string or int, got {} instead".format(type(sheet_key)))
+
+        def _get_excel_rows(sf: StyleFrame) -> Tuple[Optional[int], List[int]]:
+            """Returns the (1-based) excel rows of the headers (None if header=None) and of the data, after skiprows"""
+
+            skiprows = kwargs.get('skiprows')
+            if skiprows is None:
+                is_skipped = None
+            elif isinstance(skiprows, int):
+                is_skipped = partial(operator.gt, skiprows)
+            elif callable(skiprows):
+                is_skipped = skiprows
+            else:
+                is_skipped = set(skiprows).__contains__
+
+            num_of_rows_before_data = header_arg + 1 if header_arg is not None else 0
+            # pandas already found all these rows, so there are enough rows that are not skipped
+            rows = list(islice((row_index + 1 for row_index in count()
+                                if is_skipped is None or not is_skipped(row_index)),
+                               num_of_rows_before_data + len(sf.index)))
+            headers_row = rows[header_arg] if header_arg is not None else None
+            return headers_row, rows[num_of_rows_before_data:]
+
+        def _get_excel_columns(sf: StyleFrame, sheet: Union[Worksheet, ReadOnlyWorksheet],
+                               first_row: int) -> List[int]:
+            """Returns the (1-based) excel columns pandas read the StyleFrame's index (if index_col) and columns from"""
+
+            usecols = kwargs.get('usecols')
+            if usecols is None:
+                return list(range(1, len(sf.columns) + (excel_index_col is not None) + 1))
+            if isinstance(usecols, str):
+                columns = set()
+                for columns_range in usecols.replace(' ', '').split(','):
+                    first_column, _, last_column = columns_range.partition(':')
+                    columns.update(range(cell.column_index_from_string(first_column),
+                                         cell.column_index_from_string(last_column or first_column) + 1))
+                return sorted(columns)
+            usecols = usecols if callable(usecols) else list(usecols)
+            if not callable(usecols) and all(isinstance(col, int) for col in usecols):
+                return sorted(col + 1 for col in usecols)
+            # usecols are columns names (or a callable that accepts columns names)
+            first_row_values = next(sheet.iter_rows(min_row=first_row, max_row=first_row, values_only=True), ())
+            if header_arg is None:
+                names = range(len(first_row_values))
             else:
-                return Styler.from_openpyxl_style(cell, theme_colors,
-                                                  read_comments and cell.comment)
-
-        def _read_style():
-            wb = load_workbook(path)
-            if isinstance(sheet_name, str):
-                sheet = wb[sheet_name]
-            elif isinstance(sheet_name, int):
-                sheet = wb.worksheets[sheet_name]
+                names = ['Unnamed: {}'.format(col_index) if value is None else value
+                         for col_index, value in enumerate(first_row_values)]
+            is_used = usecols if callable(usecols) else set(usecols).__contains__
+            return [col_index + 1 for col_index, name in enumerate(names) if is_used(name)]
+
+        def _get_cells_to_read(sf: StyleFrame,
+                               sheet: Union[Worksheet, ReadOnlyWorksheet]) -> Tuple[int, List[int], Optional[int], List[int]]:
+            """
+            Returns the excel row of the columns' styles, the excel rows of the data (and of the index),
+            the excel column of the index (None if not read) and the excel columns of the data
+            """
+
+            headers_row, data_rows = _get_excel_rows(sf)
+            # without headers, the styles of the columns are read from the first row, like the data
+            columns_row = headers_row if headers_row is not None else (data_rows[0] if data_rows else 1)
+            excel_columns = _get_excel_columns(sf, sheet, columns_row)
+            if excel_index_col is not None:
+                index_column = excel_columns.pop(index_col)
             else:
-                raise TypeError("'sheet_name' must be a string or int, got {} instead".format(type(sheet_name)))
-            theme_colors = _get_scheme_colors_from_excel(wb)
+                index_column = None
+            return columns_row, data_rows, index_column, excel_columns
+
+        def _read_style(sf: StyleFrame, sheet: Worksheet, get_style_object: Callable):
+            columns_row, data_rows, index_column, data_columns = _get_cells_to_read(sf, sheet)
+            first_data_row_height_key = 1 if header_arg is None else 2
 
             # Set the headers row height
             if header_arg is not None:
-                headers_row_idx = header_arg + 1
-                sf._rows_height[headers_row_idx] = sheet.row_dimensions[headers_row_idx].height
+                sf._rows_height[1] = sheet.row_dimensions[columns_row].height
+
+            if index_column is not None:
+                for row_index, sf_index in zip(data_rows, sf.index):
+                    sf_index.style = get_style_object(sheet.cell(row=row_index, column=index_column))
+
+            for col_index, (col_name, column) in enumerate(zip(sf.columns, data_columns)):
+                sf.columns[col_index].style = get_style_object(sheet.cell(row=columns_row, column=column))
+                for row_position, row_index in enumerate(data_rows):
+                    sf.data_df.iat[row_position, col_index].style = get_style_object(sheet.cell(row=row_index,
+                                                                                                column=column))
+                    sf._rows_height[row_position + first_data_row_height_key] = \
+                        sheet.row_dimensions[row_index].height
+
+                sf._columns_width[col_name] = sheet.column_dimensions[get_column_letter(column)].width
 
-            get_style_object = partial(_get_style_object, sheet=sheet, theme_colors=theme_colors)
-            for col_index, col_name in enumerate(sf.columns):
-                col_index_in_excel = col_index + 1
-                if col_index_in_excel == excel_index_col:
-                    for row_index, sf_index in enumerate(sf.index, start=2):
-                        sf_index.style = get_style_object(row=row_index, column=col_index_in_excel)
-                    col_index_in_excel += 1  # Move next to excel indices column
+        def _read_style_streaming(sf: StyleFrame, sheet: ReadOnlyWorksheet, get_style_object: Callable):
+            columns_row, data_rows, index_column, data_columns = _get_cells_to_read(sf, sheet)
 
-                sf.columns[col_index].style = get_style_object(row=1, column=col_index_in_excel)
-                for row_index, sf_index in enumerate(sf.index, start=start_row_index):
-                    sf.at[sf_index, col_name].style = get_style_object(row=row_index, column=col_index_in_excel)
-                    sf._rows_height[row_index] = sheet.row_dimensions[row_index].height
+            # only the range of the cells that are read is loaded, and its rows are visited once and in order
+            min_row, max_row = min(columns_row, *data_rows), max(columns_row, *data_rows)
+            columns = data_columns if index_column is None else data_columns + [index_column]
+            min_col, max_col = min(columns, default=1), max(columns, default=1)
+            data_row_positions = {row_index: row_position for row_position, row_index in enumerate(data_rows)}
 
-                sf._columns_width[col_name] = sheet.column_dimensions[sf._get_column_as_letter(sheet, col_name)].width
+            def get_cell(row: tuple, row_index: int, column: int) -> ReadOnlyCell:
+                try:
+                    cell = row[column - min_col]
+                except IndexError:
+                    cell = EMPTY_CELL
+                # cells that are missing from the sheet have the default style, like in _read_style
+                if cell is EMPTY_CELL:
+                    cell = ReadOnlyCell(sheet, row_index, column, None)
+                return cell
+
+            # rows that are missing from the end of the sheet are visited as empty rows
+            rows = chain(sheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col),
+                         repeat(()))
+            for row_index, row in enumerate(islice(rows, max_row - min_row + 1), start=min_row):
+                if row_index == columns_row:
+                    for col_index, column in enumerate(data_columns):
+                        sf.columns[col_index].style = get_style_object(get_cell(row, row_index, column))
+                row_position = data_row_positions.get(row_index)
+                if row_position is None:
+                    continue
+                if index_column is not None:
+                    sf.index[row_position].style = get_style_object(get_cell(row, row_index, index_column))
+                for col_index, column in enumerate(data_columns):
+                    sf.data_df.iat[row_position, col_index].style = get_style_object(get_cell(row, row_index, column))
 
         header_arg = kwargs.get('header', 0)
         if read_style and isinstance(header_arg, Iterable):
             raise ValueError('Not supporting multiple index columns with read style.')
-        if header_arg is None:
-            start_row_index = 1
-        else:
-            start_row_index = header_arg + 2
         index_col = kwargs.get('index_col')
         excel_index_col = index_col + 1 if index_col is not None else None
         if read_style and isinstance(excel_index_col, Iterable):
             raise ValueError('Not supporting multiple index columns with read style.')
 
-        sf = cls(pd.read_excel(path, sheet_name, **kwargs))
+        if read_style and read_only and read_comments:
+            raise ValueError('Reading comments is not supported with read_only=True')
+
+        cache_file = None
+        if cache_dir is not None and not (read_style and use_openpyxl_styles):
+            cache_file = cls._get_read_cache_file(cache_dir, path,
+                                                  (sheet_name, read_style, read_comments, read_only, kwargs))
+        if cache_file is not None:
+            try:
+                with open(cache_file, 'rb') as f:
+                    return pickle.load(f)
+            except Exception:
+                # a missing cache file, or one that can not be loaded (for example, one written with other versions
+                # of the dependencies), is (re)written below
+                pass
+
+        if read_style and kwargs.get('engine', 'openpyxl') == 'openpyxl':
+            # the workbook is loaded and parsed once, and both the values and the styles are read from it.
+            # data_only=True since pandas reads the values of formulas and not the formulas themselves
+            wb = load_workbook(path, read_only=read_only, data_only=True)
+            kwargs.pop('engine', None)
+            # pandas does not close a workbook that is passed to it wrapped in an ExcelFile,
+            # so it can still be read from (in read-only mode) when the styles are read
+            excel_file = pd.ExcelFile(wb, engine='openpyxl')
+            data = pd.read_excel(excel_file, sheet_name, **kwargs)
+        else:
+            wb = load_workbook(path, read_only=read_only) if read_style else None
+            data = pd.read_excel(path, sheet_name, **kwargs)
+
+        # pandas returns a dict of dataframes if sheet_name is None or a list
+        if isinstance(data, dict):
+            sfs = {sheet_key: cls(df) for sheet_key, df in data.items()}
+        else:
+            sfs = {sheet_name: cls(data)}
+
         if read_style:
-            _read_style()
-            sf._has_custom_headers_style = True
+            # all the sheets share the workbook's theme colors and the styles converted from it
+            get_style_object = partial(_get_style_object, theme_colors=_get_scheme_colors_from_excel(wb),
+                                       converted_styles={})
+            read_sheet_style = _read_style_streaming if read_only else _read_style
+            try:
+                for sheet_key, sf in sfs.items():
+                    read_sheet_style(sf, _get_sheet(wb, sheet_key), get_style_object)
+                    sf._has_custom_headers_style = True
+            finally:
+                wb.close()
+
+        result = sfs if isinstance(data, dict) else sfs[sheet_name]
+
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # written to a temporary file first so a concurrent reader never loads a partially written file
+            fd, temp_path = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, cache_file)
+            except BaseException:
+                os.remove(temp_path)
+                raise
 
-        return sf
+        return result
+
+    @classmethod
+    def read_excel_many(cls, paths: Iterable, workers: Optional[int] = None,
+                        **kwargs) -> Dict[Any, Union['StyleFrame', Dict[Union[str, int], 'StyleFrame'], Exception]]:
+        """
+        .. versionadded:: 4.2
+
+        Reads several Excel files in parallel, each one in its own process.
+
+        .. note:: :meth:`read_excel_many` also accepts all arguments that :meth:`read_excel` accepts as kwargs,
+            which are used to read each of the files.
+
+        :param paths: The paths to the Excel files to read.
+        :type paths: Iterable
+        :param workers: The maximal number of processes to use. If ``None`` the number of processors is used.
+            If ``1`` the files are read one after another in the current process.
+        :type workers: None or int
+
+        :return: A dict with the StyleFrame object (or objects) read from each path, in the order of ``paths``.
+            A file that could not be read does not abort the others, and the exception that was raised when
+            reading it is returned instead.
+        :rtype: dict
+        """
+
+        if workers is not None and workers < 1:
+            raise ValueError('workers must be a positive integer or None')
+        if kwargs.get('read_style') and kwargs.get('use_openpyxl_styles'):
+            raise ValueError('Can not read files in parallel with use_openpyxl_styles=True')
+        paths = list(paths)
+
+        results = {}
+        if workers == 1:
+            for path in paths:
+                try:
+                    results[path] = cls.read_excel(path, **kwargs)
+                except Exception as ex:
+                    results[path] = ex
+            return results
+
+        # StyleFrame objects are pickled in their columnar form (see __getstate__) when they are sent back
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(path, executor.submit(cls.read_excel, path, **kwargs)) for path in paths]
+            for path, future in futures:
+                try:
+                    results[path] = future.result()
+                except Exception as ex:
+                    results[path] = ex
+        return results
 
     @classmethod
     def read_excel_as_template(cls, path: str, df: pd.DataFrame, use_df_boundaries: bool = False, **kwargs) -> 'StyleFrame':
@@ -261,6 +636,9 @@ class StyleFrame:
 
         .. note:: :meth:`read_excel_as_template` also accepts all arguments that :meth:`read_excel` accepts as kwargs except for ``read_style`` which must be ``True``.
 
+        .. note:: To fill the same template more than once, create a :class:`.StyleTemplate` and use its
+            :meth:`~.StyleTemplate.fill` method instead, so the template is read only once.
+
         :param str path: The path to the Excel file to read.
         :param df: The data to apply to the given template.
         :type df: :class:`pandas.DataFrame`
@@ -270,55 +648,173 @@ class StyleFrame:
         :rtype: :class:`StyleFrame`
         """
 
-        sf = cls.read_excel(path=path, read_style=True, **kwargs)
-
-        num_of_rows, num_of_cols = len(df.index), len(df.columns)
-        template_num_of_rows, template_num_of_cols = len(sf.index), len(sf.columns)
-
-        num_of_cols_to_copy_with_style = min(num_of_cols, template_num_of_cols)
-        num_of_rows_to_copy_with_style = min(num_of_rows, template_num_of_rows)
-        for col_index in range(num_of_cols_to_copy_with_style):
-            for row_index in range(num_of_rows_to_copy_with_style):
-                sf.iloc[row_index, col_index].value = df.iloc[row_index, col_index]
-
-        # Insert extra data in cases where the df is larger than the template.
-        for extra_col in df.columns[template_num_of_cols:]:
-            sf[extra_col] = df[extra_col][:template_num_of_rows]
-        for row_index in df.index[template_num_of_rows:]:
-            sf_index = Container(value=row_index)
-            sf.loc[sf_index] = list(map(Container, df.loc[row_index]))
-
-        sf.rename({sf.columns[col_index].value: df_col
-                   for col_index, df_col in enumerate(df.columns)},
-                  inplace=True)
-
-        if use_df_boundaries:
-            sf.data_df = sf.data_df.iloc[:num_of_rows, :num_of_cols]
-            rows_height = OrderedDict()
-            rows_height_range = range(num_of_rows)
-            for i, (k, v) in enumerate(sf._rows_height.items()):
-                if i in rows_height_range:
-                    rows_height[k] = v
-            sf._rows_height = rows_height
-
-            columns_width = OrderedDict()
-            columns_width_range = range(num_of_cols)
-            for i, (k, v) in enumerate(sf._columns_width.items()):
-                if i in columns_width_range:
-                    columns_width[k] = v
-            sf._columns_width = columns_width
-        return sf
+        from styleframe.style_template import StyleTemplate
+
+        return StyleTemplate.read_excel(path, **kwargs).fill(df, use_df_boundaries=use_df_boundaries)
+
+    @classmethod
+    def write_to_template(cls, template_path: Union[str, pathlib.Path], df: pd.DataFrame,
+                          output_path: Union[str, pathlib.Path], sheet_name: Union[str, int] = 0, startrow: int = 0,
+                          startcol: int = 0, header: bool = True, index: bool = False, na_rep: str = '') -> None:
+        """
+        .. versionadded:: 4.2
+
+        Writes the data of the given DataFrame into a copy of an excel template.
+
+        Unlike :meth:`read_excel_as_template`, the template's styles are not read. The values are written into the
+        template's cells, which keep their formatting, and the rest of the workbook (other sheets, conditional
+        formatting, print settings etc) is saved as openpyxl loaded it. The template file itself is not modified.
+
+        .. note:: The template is loaded and saved with openpyxl, so the parts of the workbook openpyxl does not
+            support, such as images, charts, shapes and form controls, are not saved to ``output_path``.
+
+        :param template_path: The path to the template file.
+        :type template_path: str or :class:`pathlib.Path`
+        :param df: The data to write.
+        :type df: :class:`pandas.DataFrame`
+        :param output_path: The path to save the filled template to.
+        :type output_path: str or :class:`pathlib.Path`
+        :param sheet_name: The sheet to write to. If an integer is provided then it be used as a zero-based sheet index.
+        :type sheet_name: str or int
+        :param int startrow: Upper left cell row to write the data to (zero-based).
+        :param int startcol: Upper left cell column to write the data to (zero-based).
+        :param bool header: If ``True`` the columns names are written in the first row.
+        :param bool index: If ``True`` the index is written in the first column.
+        :param str na_rep: Missing data representation.
+
+        :rtype: None
+        """
+
+        if not isinstance(sheet_name, (str, int)):
+            raise TypeError("'sheet_name' must be a string or int, got {} instead".format(type(sheet_name)))
+        wb = load_workbook(template_path)
+        sheet = wb[sheet_name] if isinstance(sheet_name, str) else wb.worksheets[sheet_name]
+
+        columns = [df.index.to_series()] if index else []
+        columns.extend(df.iloc[:, col_index] for col_index in range(df.shape[1]))
+        first_row = startrow + 1
+        if header:
+            headers_startcol = startcol + 1
+            if index:
+                # like to_excel, nothing is written in the header cell of an unnamed index, so it keeps its value
+                if df.index.name is not None:
+                    sheet.cell(row=first_row, column=headers_startcol).value = get_written_value(df.index.name, na_rep)
+                headers_startcol += 1
+            for col_index, value in enumerate(df.columns, start=headers_startcol):
+                sheet.cell(row=first_row, column=col_index).value = get_written_value(value, na_rep)
+            first_row += 1
+        # the template's cells are assigned only their values, so they keep their formatting.
+        # missing values are assigned as well, to clear the values the template has in their cells
+        for col_index, column in enumerate(columns, start=startcol + 1):
+            for row_index, value in enumerate(column.tolist(), start=first_row):
+                sheet.cell(row=row_index, column=col_index).value = get_written_value(value, na_rep)
+        wb.save(output_path)
+
+    @classmethod
+    def _from_style_matrix(cls, values: pd.DataFrame, style_ids: np.ndarray, style_table: StyleTable) -> 'StyleFrame':
+        """
+        Creates a StyleFrame object from its columnar representation, as returned by :meth:`_to_style_matrix`.
+        Cells that have the same style id share the same interned style (see :meth:`.Styler.intern`).
+
+        :param values: The cells' values.
+        :type values: :class:`pandas.DataFrame`
+        :param style_ids: Ids of the cells' styles in ``style_table``. Must have the same shape as ``values``.
+        :type style_ids: :class:`numpy.ndarray`
+        :param style_table: The table the style ids point into.
+        :type style_table: :class:`.StyleTable`
+
+        :return: StyleFrame object
+        :rtype: :class:`StyleFrame`
+
+        :meta private:
+        """
+
+        style_ids = np.asarray(style_ids)
+        if style_ids.shape != values.shape:
+            raise ValueError('style_ids shape {} does not match values shape {}'.format(style_ids.shape, values.shape))
+
+        # the styles are shared by the cells, so they are interned first and cells get their own copies of them
+        # only when they are accessed
+        shared_styles = np.empty(len(style_table), dtype=object)
+        shared_styles[:] = [style.interned() if isinstance(style, Styler) else style for style in style_table]
+        styles = shared_styles[np.asarray(style_ids, dtype=np.intp)]
+        data_df = pd.DataFrame({col_index: [Container(value, style)
+                                            for value, style in zip(values.iloc[:, col_index], styles[:, col_index])]
+                                for col_index in range(values.shape[1])},
+                               index=values.index)
+        data_df.columns = values.columns
+        return cls(data_df)
+
+    def _to_style_matrix(self, style_table: Optional[StyleTable] = None) -> Tuple[pd.DataFrame, np.ndarray, StyleTable]:
+        """
+        Returns the columnar representation of the StyleFrame: the cells' values in their native pandas dtypes and
+        a matrix of style ids pointing into a deduplicated :class:`.StyleTable`.
+
+        The StyleFrame itself stores a :class:`.Container` per cell, so the columnar representation is built from the
+        cells when this method is called.
+
+        :param style_table: A table to add the styles to. If not provided a new table will be created.
+        :type style_table: None or :class:`.StyleTable`
+
+        :return: The values, the style ids (an ``int32`` matrix with the same shape as the values) and the style table
+        :rtype: tuple[:class:`pandas.DataFrame`, :class:`numpy.ndarray`, :class:`.StyleTable`]
+
+        :meta private:
+        """
+
+        if style_table is None:
+            style_table = StyleTable()
+
+        cells = self.data_df.values
+        style_ids = np.empty(cells.shape, dtype=np.int32)
+        values = {}
+        for col_index in range(cells.shape[1]):
+            column_cells = [cell if isinstance(cell, Container) else Container(cell) for cell in cells[:, col_index]]
+            style_ids[:, col_index] = style_table.ids((cell._style for cell in column_cells), count=len(column_cells))
+            values[col_index] = pd.Series([cell.value for cell in column_cells], dtype=None if column_cells else object)
+
+        values_df = pd.DataFrame(values, index=range(cells.shape[0]), columns=range(cells.shape[1]))
+        values_df.columns = [col.value for col in self.data_df.columns]
+        values_df.index = pd.Index([index.value for index in self.data_df.index], name=self.data_df.index.name)
+        return values_df, style_ids, style_table
 
     # noinspection PyPep8Naming
     @classmethod
-    def ExcelWriter(cls, path, **kwargs):
+    def ExcelWriter(cls, path, engine: str = 'openpyxl', **kwargs):
         """
-        A shortcut for :class:`pandas.ExcelWriter`, and accepts any argument it accepts except for ``engine``
+        A shortcut for :class:`pandas.ExcelWriter`, and accepts any argument it accepts.
+
+        .. versionadded:: 4.2
+
+        :param str engine: ``'openpyxl'``, ``'styleframe'`` or ``'xlsxwriter'``. With the ``styleframe`` engine, the
+            cells that :meth:`to_excel` exports are serialized straight to the sheets' XML instead of being created as
+            openpyxl cells first, which is much faster for large sheets. The rest of the workbook is still written by
+            openpyxl.
+
+            The ``xlsxwriter`` engine requires xlsxwriter to be installed. Every distinct style is translated to an
+            xlsxwriter format once and the cells are written row by row, so the writer can be created with
+            xlsxwriter's ``constant_memory`` mode:
+            ``StyleFrame.ExcelWriter(path, engine='xlsxwriter', engine_kwargs={'options': {'constant_memory': True}})``
+
+            .. note:: With the ``styleframe`` engine a sheet's cells are serialized when :meth:`to_excel` is called.
+                Cells that are added to the sheet with openpyxl afterwards are not written, and rows' heights must be
+                set before :meth:`to_excel` is called. Only ``header``, ``index``, ``startcol``, ``startrow`` and
+                ``na_rep`` are supported as :meth:`pandas.DataFrame.to_excel` kwargs, and ``streaming`` is not
+                supported.
+
+            .. note:: With the ``xlsxwriter`` engine the sheets can only be written once, by :meth:`to_excel`, and
+                the same :meth:`pandas.DataFrame.to_excel` kwargs as with the ``styleframe`` engine are supported.
+                Only the color scale conditional formatting is supported, the styles of the openpyxl cells read
+                with ``use_openpyxl_styles=True`` are converted to :class:`.Styler` objects, and xlsxwriter does not
+                shrink text that is wrapped.
         """
 
-        if 'engine' in kwargs:
-            raise ValueError('`engine` argument for StyleFrame.ExcelWriter can not be set')
-        return pd.ExcelWriter(path, engine='openpyxl', **kwargs)
+        if engine == 'styleframe':
+            return NativeExcelWriter(path, **kwargs)
+        if engine not in ('openpyxl', 'xlsxwriter'):
+            raise ValueError("`engine` argument for StyleFrame.ExcelWriter must be 'openpyxl', 'styleframe' or "
+                             "'xlsxwriter'")
+        return pd.ExcelWriter(path, engine=engine, **kwargs)
 
     @property
     def row_indexes(self):
@@ -339,11 +835,14 @@ class StyleFrame:
                  sheet_name: str = 'Sheet1', allow_protection: bool = False, right_to_left: bool = False,
                  columns_to_hide: Union[None, str, list, tuple, set] = None, row_to_add_filters: Optional[int] = None,
                  columns_and_rows_to_freeze: Optional[str] = None, best_fit: Union[None, str, list, tuple, set] = None,
-                 **kwargs) -> pd.ExcelWriter:
+                 streaming: bool = False, style_cache: Optional[StyleCache] = None, **kwargs) -> pd.ExcelWriter:
         """Saves the dataframe to excel and applies the styles.
 
         .. note:: :meth:`to_excel` also accepts all arguments that :meth:`pandas.DataFrame.to_excel` accepts as kwargs.
 
+        .. note:: To write the same StyleFrame more than once, compile it with :meth:`compile_layout` and write the
+            :class:`.SheetLayout` instead, so the cells' styles are resolved only once.
+
         :param excel_writer: File path or existing ExcelWriter
         :type excel_writer: str or :class:`pandas.ExcelWriter` or :class:`pathlib.Path`
         :param str sheet_name: Name of sheet the StyleFrame will be exported to
@@ -374,13 +873,28 @@ class StyleFrame:
                       calling ``StyleFrame.to_excel`` by directly modifying ``StyleFrame.A_FACTOR`` and ``StyleFrame.P_FACTOR``
 
         :type best_fit: None or str or list or tuple or set
+
+        .. versionadded:: 4.2
+
+        :param bool streaming: If ``True``, the sheet is written using openpyxl's write-only mode: every row is emitted
+            once, already styled, so memory usage does not grow with the number of rows. ``excel_writer`` must be a
+            path or a writer created with ``StyleFrame.ExcelWriter(path, engine_kwargs={'write_only': True})``.
+
+            .. note:: Only ``header``, ``index``, ``startcol``, ``startrow`` and ``na_rep`` are supported as
+                      :meth:`pandas.DataFrame.to_excel` kwargs when ``streaming=True``.
+
+        :param style_cache: The cache of the styles registered with the workbook.
+            If ``None``, the workbook's own cache (see :meth:`.StyleCache.for_workbook`) is used.
+        :type style_cache: None or :class:`.StyleCache`
+
         :rtype: :class:`pandas.ExcelWriter`
 
         """
 
         if isinstance(excel_writer, pd.ExcelWriter):
-            if excel_writer.engine != 'openpyxl':
-                raise TypeError('styleframe supports only openpyxl, attempted to use {}'.format(excel_writer.engine))
+            if excel_writer.engine not in ('openpyxl', 'styleframe', 'xlsxwriter'):
+                raise TypeError('styleframe supports only openpyxl and xlsxwriter, attempted to use {}'
+                                .format(excel_writer.engine))
 
         # dealing with needed pandas.to_excel defaults
         header = kwargs.pop('header', True)
@@ -388,157 +902,546 @@ class StyleFrame:
         startcol = kwargs.pop('startcol', 0)
         startrow = kwargs.pop('startrow', 0)
         na_rep = kwargs.pop('na_rep', '')
+        engine = kwargs.pop('engine', 'openpyxl')
+        if isinstance(excel_writer, pd.ExcelWriter):
+            engine = excel_writer.engine
+        native = engine == 'styleframe'
+        xlsxwriter = engine == 'xlsxwriter'
 
-        def get_values(x):
-            if isinstance(x, Container):
-                return x.value
-            else:
-                try:
-                    if np.isnan(x):
-                        return na_rep
-                    else:
-                        return x
-                except TypeError:
-                    return x
+        if streaming and kwargs:
+            raise TypeError('to_excel does not support {} when streaming=True'.format(', '.join(sorted(kwargs))))
+        if native or xlsxwriter:
+            if streaming:
+                raise ValueError('streaming=True is not supported by the {} engine'.format(engine))
+            if kwargs:
+                raise TypeError('the {} engine does not support {}'.format(engine, ', '.join(sorted(kwargs))))
 
-        def within_sheet_boundaries(row: Union[int, str] = 1, column: str = 'A'):
-            return (1 <= int(row) <= sheet.max_row
-                        and
-                    1 <= cell.column_index_from_string(column) <= sheet.max_column)
+        derived_styles = {}
 
-        def get_range_of_cells(row_index=None, columns=None):
-            if columns is None:
-                start_letter = self._get_column_as_letter(sheet, self.data_df.columns[0], startcol)
-                end_letter = self._get_column_as_letter(sheet, self.data_df.columns[-1], startcol)
-            else:
-                start_letter = self._get_column_as_letter(sheet, columns[0], startcol)
-                end_letter = self._get_column_as_letter(sheet, columns[-1], startcol)
-            if row_index is None:  # returns cells range for the entire dataframe
-                start_index = startrow + 1
-                end_index = start_index + len(self)
-            else:
-                start_index = startrow + row_index + 1
-                end_index = start_index
-            return '{start_letter}{start_index}:{end_letter}{end_index}'.format(start_letter=start_letter,
-                                                                                start_index=start_index,
-                                                                                end_letter=end_letter,
-                                                                                end_index=end_index)
+        def set_cell_style(current_cell, style):
+            self._set_cell_style(current_cell, style, style_cache)
 
-        if len(self.data_df) > 0:
-            export_df = self.data_df.applymap(get_values)
+        def get_style_to_apply(style, date_time_kind):
+            return self._get_style_to_apply(derived_styles, style, date_time_kind)
 
+        if isinstance(excel_writer, (str, pathlib.Path)):
+            if streaming:
+                excel_writer = self.ExcelWriter(excel_writer, engine_kwargs={'write_only': True})
+            else:
+                excel_writer = self.ExcelWriter(excel_writer, engine=engine)
+
+        if native or xlsxwriter:
+            # the layout is written without modifying the StyleFrame
+            layout = self.compile_layout(header=header, index=index, startrow=startrow, startcol=startcol,
+                                         na_rep=na_rep, allow_protection=allow_protection, right_to_left=right_to_left,
+                                         columns_to_hide=columns_to_hide, row_to_add_filters=row_to_add_filters,
+                                         columns_and_rows_to_freeze=columns_and_rows_to_freeze, best_fit=best_fit)
+            return layout.write(excel_writer, sheet_name=sheet_name, style_cache=style_cache)
+
+        if style_cache is None:
+            style_cache = StyleCache.for_workbook(excel_writer.book)
+
+        if streaming:
+            if not excel_writer.book.write_only:
+                raise ValueError("streaming=True requires a write-only workbook, create the writer with "
+                                 "StyleFrame.ExcelWriter(path, engine_kwargs={'write_only': True})")
+            if sheet_name in excel_writer.book.sheetnames:
+                raise ValueError('sheet {} already exists and can not be appended to when streaming'.format(sheet_name))
+            sheet = excel_writer.book.create_sheet(sheet_name)
+            excel_writer.sheets[sheet_name] = sheet
+            max_row = startrow + len(self) + (1 if header else 0)
+            max_column = startcol + len(self.columns) + (1 if index else 0)
         else:
-            export_df = deepcopy(self.data_df)
+            if len(self.data_df) > 0:
+                export_df = self.data_df.applymap(lambda x: self._get_export_value(x, na_rep))
 
-        export_df.columns = [col.value for col in export_df.columns]
-        # noinspection PyTypeChecker
-        export_df.index = [row_index.value for row_index in export_df.index]
-        export_df.index.name = self.data_df.index.name
+            else:
+                export_df = deepcopy(self.data_df)
 
-        if isinstance(excel_writer, (str, pathlib.Path)):
-            excel_writer = self.ExcelWriter(excel_writer)
+            export_df.columns = [col.value for col in export_df.columns]
+            # noinspection PyTypeChecker
+            export_df.index = [row_index.value for row_index in export_df.index]
+            export_df.index.name = self.data_df.index.name
 
-        export_df.to_excel(excel_writer, sheet_name=sheet_name, engine='openpyxl', header=header,
-                           index=index, startcol=startcol, startrow=startrow, na_rep=na_rep, **kwargs)
+            export_df.to_excel(excel_writer, sheet_name=sheet_name, engine='openpyxl', header=header,
+                               index=index, startcol=startcol, startrow=startrow, na_rep=na_rep, **kwargs)
 
-        sheet = excel_writer.sheets[sheet_name]
+            sheet = excel_writer.sheets[sheet_name]
+            max_row, max_column = sheet.max_row, sheet.max_column
 
-        sheet.sheet_view.rightToLeft = right_to_left
-
-        self.data_df.fillna(Container('NaN'), inplace=True)
+            self.data_df.fillna(Container('NaN'), inplace=True)
 
+        index_startcol = startcol
         if index:
-            if self.data_df.index.name:
-                index_name_cell = sheet.cell(row=startrow + 1, column=startcol + 1)
-                index_name_cell.style = self._index_header_style.to_openpyxl_style()
-            for row_index, index in enumerate(self.data_df.index):
-                try:
-                    date_time_types_to_formats = {pd_timestamp: index.style.date_time_format,
-                                                  dt.datetime: index.style.date_time_format,
-                                                  dt.date: index.style.date_format,
-                                                  dt.time: index.style.time_format}
-                    index.style.number_format = date_time_types_to_formats.get(type(index.value),
-                                                                               index.style.number_format)
-                    style_to_apply = index.style.to_openpyxl_style()
-                except AttributeError:
-                    style_to_apply = index.style
-                current_cell = sheet.cell(row=startrow + row_index + 2, column=startcol + 1)
-                current_cell.style = style_to_apply
-                if isinstance(index.style, Styler):
-                    current_cell.comment = index.style.generate_comment()
-                else:
-                    if hasattr(index.style, 'comment'):
-                        index.style.comment.parent = None
-                        current_cell.comment = index.style.comment
-
             startcol += 1
 
         if header and not self._has_custom_headers_style:
             self.apply_headers_style(Styler.default_header_style())
 
+        if best_fit:
+            if not isinstance(best_fit, (list, set, tuple)):
+                best_fit = [best_fit]
+            self.set_column_width_dict(self._get_best_fit_columns_width(best_fit))
+
+        # the sheet's settings are applied before the cells since a streamed sheet
+        # can not be modified once its rows were written
+        self._apply_sheet_settings(sheet, self._columns_width, startrow=startrow, startcol=startcol, max_row=max_row,
+                                   max_column=max_column, allow_protection=allow_protection,
+                                   right_to_left=right_to_left, columns_to_hide=columns_to_hide,
+                                   row_to_add_filters=row_to_add_filters,
+                                   columns_and_rows_to_freeze=columns_and_rows_to_freeze)
+
+        if streaming:
+            for _ in range(startrow):
+                sheet.append([])
+            self._stream_rows(sheet, derived_styles, style_cache, header=header, index=index,
+                              startcol=index_startcol, na_rep=na_rep, best_fit=best_fit)
+            return excel_writer
+
+        if index:
+            if self.data_df.index.name:
+                index_name_cell = sheet.cell(row=startrow + 1, column=index_startcol + 1)
+                set_cell_style(index_name_cell, self._index_header_style)
+            index_date_time_kinds = self._get_date_time_kinds([index.value for index in self.data_df.index])
+            for row_index, (index, date_time_kind) in enumerate(zip(self.data_df.index, index_date_time_kinds)):
+                current_cell = sheet.cell(row=startrow + row_index + 2, column=index_startcol + 1)
+                set_cell_style(current_cell, get_style_to_apply(index._style, date_time_kind))
+                comment = self._get_comment(index._style)
+                if comment is not None:
+                    if not isinstance(index._style, Styler):
+                        comment.parent = None
+                    current_cell.comment = comment
+
         # Iterating over the dataframe's elements and applying their styles
         # openpyxl's rows and cols start from 1,1 while the dataframe is 0,0
+        headers_date_time_kinds = self._get_date_time_kinds([column.value for column in self.data_df.columns])
         for col_index, column in enumerate(self.data_df.columns):
-            try:
-                date_time_types_to_formats = {pd_timestamp: column.style.date_time_format,
-                                              dt.datetime: column.style.date_time_format,
-                                              dt.date: column.style.date_format,
-                                              dt.time: column.style.time_format}
-
-                column.style.number_format = date_time_types_to_formats.get(type(column.value),
-                                                                            column.style.number_format)
-                style_to_apply = column.style.to_openpyxl_style()
-            except AttributeError:
-                style_to_apply = Styler.from_openpyxl_style(column.style, [],
-                                                            openpyxl_comment=column.style.comment).to_openpyxl_style()
             column_header_cell = sheet.cell(row=startrow + 1, column=col_index + startcol + 1)
-            column_header_cell.style = style_to_apply
-            if isinstance(column.style, Styler):
-                column_header_cell.comment = column.style.generate_comment()
-            else:
-                if hasattr(column.style, 'comment') and column.style.comment is not None:
-                    column_header_cell.comment = column.style.comment
-            for row_index, index in enumerate(self.data_df.index):
+            set_cell_style(column_header_cell, get_style_to_apply(column._style, headers_date_time_kinds[col_index]))
+            comment = self._get_comment(column._style)
+            if comment is not None:
+                column_header_cell.comment = comment
+            containers = self.data_df.iloc[:, col_index]
+            date_time_kinds = self._get_date_time_kinds([container.value for container in containers])
+            for row_index, (container, date_time_kind) in enumerate(zip(containers, date_time_kinds)):
                 current_cell = sheet.cell(row=row_index + startrow + (2 if header else 1), column=col_index + startcol + 1)
-                data_df_style = self.data_df.at[index, column].style
-                try:
-                    if '=HYPERLINK' in str(current_cell.value):
-                        data_df_style.font_color = utils.colors.blue
-                        data_df_style.underline = utils.underline.single
-                    else:
-                        if best_fit and column.value in best_fit:
-                            data_df_style.wrap_text = False
-                            data_df_style.shrink_to_fit = False
-                    try:
-                        date_time_types_to_formats = {pd_timestamp: data_df_style.date_time_format,
-                                                      dt.datetime: data_df_style.date_time_format,
-                                                      dt.date: data_df_style.date_format,
-                                                      dt.time: data_df_style.time_format}
-
-                        data_df_style.number_format = date_time_types_to_formats.get(type(self.data_df.at[index,column].value),
-                                                                                     data_df_style.number_format)
-                        style_to_apply = data_df_style.to_openpyxl_style()
-                    except AttributeError:
-                        style_to_apply = Styler.from_openpyxl_style(data_df_style, [],
-                                                                    openpyxl_comment=data_df_style.comment).to_openpyxl_style()
-                    current_cell.style = style_to_apply
-                    if isinstance(data_df_style, Styler):
-                        current_cell.comment = data_df_style.generate_comment()
-                    else:
-                        if hasattr(data_df_style, 'comment') and data_df_style.comment is not None:
-                            current_cell.comment = data_df_style.comment
-                except AttributeError:  # if the element in the dataframe is not Container creating a default style
-                    current_cell.style = Styler().to_openpyxl_style()
+                style_to_apply, comment = self._get_cell_style_to_apply(derived_styles, container, current_cell.value,
+                                                                        date_time_kind, column, best_fit)
+                set_cell_style(current_cell, style_to_apply)
+                if comment is not None:
+                    current_cell.comment = comment
 
-        if best_fit:
-            if not isinstance(best_fit, (list, set, tuple)):
-                best_fit = [best_fit]
-            self.set_column_width_dict({column: (max(self.data_df[column].astype(str).str.len()) + self.A_FACTOR) * self.P_FACTOR
-                                        for column in best_fit})
+        return excel_writer
+
+    def compile_layout(self, header: bool = True, index: bool = False, startrow: int = 0, startcol: int = 0,
+                       na_rep: str = '', allow_protection: bool = False, right_to_left: bool = False,
+                       columns_to_hide: Union[None, str, list, tuple, set] = None,
+                       row_to_add_filters: Optional[int] = None, columns_and_rows_to_freeze: Optional[str] = None,
+                       best_fit: Union[None, str, list, tuple, set] = None) -> 'SheetLayout':
+        """
+        .. versionadded:: 4.2
+
+        Resolves the values, styles and comments of all the cells :meth:`to_excel` writes, and the sheet's settings,
+        into an immutable :class:`.SheetLayout`, without modifying the StyleFrame. The layout can be written any
+        number of times, to any writer, with :meth:`.SheetLayout.write`.
+
+        The arguments are the same as :meth:`to_excel`'s.
+
+        :rtype: :class:`.SheetLayout`
+        """
+
+        from styleframe.sheet_layout import SheetLayout
+
+        return SheetLayout(self, header=header, index=index, startrow=startrow, startcol=startcol, na_rep=na_rep,
+                           allow_protection=allow_protection, right_to_left=right_to_left,
+                           columns_to_hide=columns_to_hide, row_to_add_filters=row_to_add_filters,
+                           columns_and_rows_to_freeze=columns_and_rows_to_freeze, best_fit=best_fit)
+
+    @classmethod
+    def write_chunks(cls, excel_writer: Union[str, pd.ExcelWriter, pathlib.Path], chunks: Iterable,
+                     sheet_name: str = 'Sheet1', column_styles: Optional[Dict[str, Styler]] = None,
+                     header_style: Optional[Styler] = None, styler_obj: Optional[Styler] = None,
+                     style_chunk: Optional[Callable[['StyleFrame'], None]] = None,
+                     columns_width: Optional[Dict[str, Union[int, float]]] = None, use_default_formats: bool = True,
+                     overwrite_default_style: bool = True, **kwargs) -> pd.ExcelWriter:
+        """
+        .. versionadded:: 4.2
+
+        Writes an iterable of dataframes (for example, the result of ``pd.read_csv(path, chunksize=...)``) to a
+        single sheet, one chunk at a time, so the whole data never has to be held in memory.
+        Every chunk is styled by the same rules, using :meth:`apply_column_style` and :meth:`apply_style_by_indexes`,
+        and its rows are streamed to the sheet as with :meth:`to_excel`'s ``streaming=True``.
+
+        :param excel_writer: File path or existing ExcelWriter created with
+            ``StyleFrame.ExcelWriter(path, engine_kwargs={'write_only': True})``
+        :type excel_writer: str or :class:`pandas.ExcelWriter` or :class:`pathlib.Path`
+        :param chunks: The dataframes to write. All of them must have the same columns.
+        :type chunks: Iterable[:class:`pandas.DataFrame` or :class:`StyleFrame`]
+        :param str sheet_name: Name of sheet the chunks will be written to
+        :param column_styles: Mapping of column names to the style that will be applied to them in every chunk
+        :type column_styles: None or dict[str, :class:`.Styler`]
+        :param header_style: The style to apply to the headers
+        :type header_style: None or :class:`.Styler`
+        :param styler_obj: Default style of the chunks' cells
+        :type styler_obj: None or :class:`.Styler`
+        :param style_chunk: A callable that is called with every chunk's StyleFrame before it is written,
+            for example to call :meth:`apply_style_by_indexes` on it.
+        :type style_chunk: None or callable
+        :param columns_width: Mapping of column names to their width
+        :type columns_width: None or dict[str, int or float]
+        :param bool use_default_formats: Passed to :meth:`apply_column_style`
+        :param bool overwrite_default_style: Passed to :meth:`apply_column_style`
+
+        .. note:: All other kwargs are passed to :meth:`to_excel` when the first chunk is written. ``best_fit`` is not
+                  supported since the columns' widths must be set before the first row is written.
+
+        :rtype: :class:`pandas.ExcelWriter`
+        """
+
+        if 'best_fit' in kwargs:
+            raise TypeError('write_chunks does not support best_fit')
+
+        def to_style_frame(chunk):
+            if not isinstance(chunk, StyleFrame):
+                chunk = cls(chunk, styler_obj)
+            for column, column_style in (column_styles or {}).items():
+                chunk.apply_column_style(column, column_style, use_default_formats=use_default_formats,
+                                         overwrite_default_style=overwrite_default_style)
+            if style_chunk is not None:
+                style_chunk(chunk)
+            return chunk
+
+        chunks = iter(chunks)
+        try:
+            first_chunk = to_style_frame(next(chunks))
+        except StopIteration:
+            raise ValueError('chunks must contain at least one dataframe')
+        if header_style is not None:
+            first_chunk.apply_headers_style(header_style)
+        if columns_width:
+            first_chunk.set_column_width_dict(columns_width)
+
+        excel_writer = first_chunk.to_excel(excel_writer, sheet_name=sheet_name, streaming=True, **kwargs)
+        sheet = excel_writer.sheets[sheet_name]
+        columns = list(first_chunk.columns)
+        index = kwargs.get('index', False)
+        startcol = kwargs.get('startcol', 0)
+        na_rep = kwargs.get('na_rep', '')
+        style_cache = kwargs.get('style_cache') or StyleCache.for_workbook(excel_writer.book)
+        last_row = kwargs.get('startrow', 0) + len(first_chunk) + (1 if kwargs.get('header', True) else 0)
+
+        for chunk in chunks:
+            chunk = to_style_frame(chunk)
+            if list(chunk.columns) != columns:
+                raise ValueError('all chunks must have the same columns as the first chunk')
+            # a streamed row's height must be set before the row is written.
+            # the rows heights of a StyleFrame count its header as row 1
+            for row, height in chunk._rows_height.items():
+                if 2 <= row <= len(chunk) + 1:
+                    sheet.row_dimensions[last_row + row - 1].height = height
+            chunk._stream_rows(sheet, {}, style_cache, header=False, index=index, startcol=startcol, na_rep=na_rep,
+                               best_fit=None)
+            last_row += len(chunk)
+
+        return excel_writer
+
+    @classmethod
+    def write_workbook(cls, path: Union[str, pathlib.Path], sheets: Dict[str, 'StyleFrame'],
+                       workers: Optional[int] = None, **kwargs) -> None:
+        """
+        .. versionadded:: 4.2
+
+        Writes several StyleFrame objects to a single workbook, one sheet each, styling the sheets in parallel.
+
+        Every sheet is styled and rendered to XML in its own process. The parent process then adds the styles
+        each sheet uses to the workbook's stylesheet, points the sheet's cells to them and assembles the workbook.
+        A sheet that needs parts other than its XML (for example, cells with comments) is written by the parent
+        process, as :meth:`to_excel` would.
+
+        .. note:: :meth:`write_workbook` also accepts all arguments that :meth:`to_excel` accepts as kwargs
+            (except for ``sheet_name``, ``streaming`` and ``style_cache``), which are used to write each of the sheets.
+
+        .. note:: The cells of sheets that are rendered by other processes are styled exactly as they would be
+            by :meth:`to_excel`, but their styles are not added to the workbook's list of named cell styles.
+
+        :param path: The path to save the workbook to.
+        :type path: str or :class:`pathlib.Path`
+        :param sheets: Mapping of sheets names to the StyleFrame objects to write to them, in the order of the sheets.
+        :type sheets: dict[str, :class:`StyleFrame`]
+        :param workers: The maximal number of processes to use. If ``None`` the number of processors is used.
+            If ``1`` the sheets are written one after another in the current process.
+        :type workers: None or int
+
+        :rtype: None
+        """
+
+        if workers is not None and workers < 1:
+            raise ValueError('workers must be a positive integer or None')
+        unsupported_kwargs = {'sheet_name', 'streaming', 'style_cache'}.intersection(kwargs)
+        if unsupported_kwargs:
+            raise TypeError('write_workbook does not support {}'.format(', '.join(sorted(unsupported_kwargs))))
+        if not sheets:
+            raise ValueError('sheets must contain at least one StyleFrame')
+
+        rendered_sheets = {}
+        if workers != 1:
+            # StyleFrame objects are pickled in their columnar form (see __getstate__) when they are sent to the workers
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [(sheet_name, executor.submit(cls._render_sheet, sf, sheet_name, kwargs))
+                           for sheet_name, sf in sheets.items()]
+                rendered_sheets = {sheet_name: future.result() for sheet_name, future in futures}
+
+        # the writer is used only for its workbook, which is saved below along with the rendered sheets
+        excel_writer = cls.ExcelWriter(BytesIO())
+        workbook = excel_writer.book
+        sheets_xml = {}
+        for sheet_name, sf in sheets.items():
+            rendered_sheet = rendered_sheets.get(sheet_name)
+            if rendered_sheet is None:
+                sf.to_excel(excel_writer, sheet_name=sheet_name, **kwargs)
+            else:
+                sheet_xml, stylesheet = rendered_sheet
+                sheets_xml[workbook.create_sheet(sheet_name)] = cls._merge_rendered_sheet_styles(sheet_xml, stylesheet,
+                                                                                                 workbook)
+
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            WorkbookWriter(workbook, archive, rendered_sheets=sheets_xml).save()
+
+    @classmethod
+    def _render_sheet(cls, sf: 'StyleFrame', sheet_name: str, to_excel_kwargs: dict) -> Optional[Tuple[bytes, dict]]:
+        """Writes sf to a workbook of its own and returns the sheet's XML and the collections of the workbook's
+        stylesheet its style ids point into, or None if the sheet needs parts other than its XML.
+
+        :meta private:
+        """
+
+        excel_writer = sf.to_excel(cls.ExcelWriter(BytesIO()), sheet_name=sheet_name, **to_excel_kwargs)
+        workbook = excel_writer.book
+        sheet = excel_writer.sheets[sheet_name]
+        # the sheet is the selected sheet of its own workbook, but not necessarily of the written one
+        sheet.sheet_view.tabSelected = None
+        writer = WorksheetWriter(sheet, out=BytesIO())
+        writer.write()
+        if writer._rels or sheet._comments or sheet.legacy_drawing is not None or workbook._differential_styles:
+            return None
+        # the cells' style ids are registered with the workbook when the sheet is written
+        stylesheet = {collection: list(getattr(workbook, collection))
+                      for collection in chain((collection for collection, _ in _style_collections),
+                                              ('_number_formats', '_cell_styles'))}
+        return writer.read(), stylesheet
+
+    @classmethod
+    def _merge_rendered_sheet_styles(cls, sheet_xml: bytes, stylesheet: dict, workbook: Workbook) -> bytes:
+        """Adds the styles of a sheet rendered by :meth:`_render_sheet` to workbook and returns the sheet's XML
+        with its style ids replaced by the ids of the same styles in workbook.
+
+        :meta private:
+        """
+
+        source_stylesheet = SimpleNamespace(**stylesheet)
+        style_ids = [workbook._cell_styles.add(cls._copy_style_array(style_array, source_stylesheet, workbook))
+                     for style_array in source_stylesheet._cell_styles]
+        if style_ids == list(range(len(style_ids))):
+            return sheet_xml
+        return _style_id_attribute.sub(lambda match: b'%s%d"' % (match.group(1), style_ids[int(match.group(2))]),
+                                       sheet_xml)
+
+    @staticmethod
+    def _get_export_value(value, na_rep):
+        if isinstance(value, Container):
+            return value.value
+        else:
+            try:
+                if np.isnan(value):
+                    return na_rep
+                else:
+                    return value
+            except TypeError:
+                return value
+
+    @staticmethod
+    def _get_derived_style(derived_styles: dict, style: Styler, **changes) -> FrozenStyler:
+        # styles may be shared by many cells so they are never modified in place.
+        # the derived styles are frozen so looking them up in the styles caches does not hash them again
+        key = (id(style), tuple(sorted(changes.items())))
+        try:
+            return derived_styles[key]
+        except KeyError:
+            derived_style = derived_styles[key] = style.freeze().replace(**changes)
+            return derived_style
+
+    @classmethod
+    def _get_date_time_kinds(cls, values: list) -> list:
+        """Returns the kind of date/time ('date_time', 'date' or 'time', None for any other value) of each value
+        of a column. The kind is resolved once for the whole column from its inferred dtype, and only the values of
+        columns of mixed types are checked one by one.
+
+        :meta private:
+        """
+
+        inferred_dtype = pd.api.types.infer_dtype(values, skipna=False)
+        # datetimes are dates as well, so a column of dates and datetimes is inferred as 'date'
+        if inferred_dtype in ('mixed', 'mixed-integer') or (
+                inferred_dtype == 'date' and any(isinstance(value, dt.datetime) for value in values)):
+            return [cls._date_time_kinds_by_type.get(type(value)) for value in values]
+        return [cls._date_time_kinds_by_inferred_dtype.get(inferred_dtype)] * len(values)
+
+    @classmethod
+    def _get_style_to_apply(cls, derived_styles: dict, style, date_time_kind: Optional[str], **changes):
+        if isinstance(style, (Cell, ReadOnlyCell)):
+            # openpyxl styles (read with use_openpyxl_styles=True) are written as they are, see _copy_openpyxl_style
+            return style
+        try:
+            if date_time_kind is None:
+                changes['number_format'] = style.number_format
+            else:
+                changes['number_format'] = getattr(style, date_time_kind + '_format')
+            return cls._get_derived_style(derived_styles, style, **changes)
+        except AttributeError:
+            return Styler.from_openpyxl_style(style, [], openpyxl_comment=style.comment)
+
+    @staticmethod
+    def _copy_openpyxl_style(source_cell: Union[Cell, ReadOnlyCell], workbook: Workbook) -> StyleArray:
+        """Returns the style array of source_cell's style in workbook, adding the fonts, fills etc that it uses
+        to workbook's stylesheet if they are not already in it.
+
+        :meta private:
+        """
+
+        source_workbook = source_cell.parent.parent
+        source_style_array = source_cell.style_array if isinstance(source_cell, ReadOnlyCell) else source_cell._style
+        if source_style_array is None:
+            return StyleArray()
+        if source_workbook is workbook:
+            return copy(source_style_array)
+        return StyleFrame._copy_style_array(source_style_array, source_workbook, workbook)
+
+    @staticmethod
+    def _copy_style_array(source_style_array: StyleArray, source_stylesheet, workbook: Workbook) -> StyleArray:
+        """Returns the style array of source_style_array's style in workbook. source_stylesheet is the workbook
+        source_style_array belongs to, or any object that has the same style collections.
+
+        :meta private:
+        """
+
+        style_array = StyleArray()
+        for collection, key in _style_collections:
+            source_style = getattr(source_stylesheet, collection)[getattr(source_style_array, key)]
+            setattr(style_array, key, getattr(workbook, collection).add(copy(source_style)))
+        if source_style_array.numFmtId < BUILTIN_FORMATS_MAX_SIZE:
+            style_array.numFmtId = source_style_array.numFmtId
+        else:
+            number_format = source_stylesheet._number_formats[source_style_array.numFmtId - BUILTIN_FORMATS_MAX_SIZE]
+            style_array.numFmtId = workbook._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+        style_array.quotePrefix = source_style_array.quotePrefix
+        style_array.pivotButton = source_style_array.pivotButton
+        # the source's named style is not copied, so the cell is based on workbook's default named style
+        return style_array
+
+    @staticmethod
+    def _set_cell_style(current_cell, style: Union[Styler, Cell, ReadOnlyCell], style_cache: StyleCache) -> None:
+        current_cell._style = copy(StyleFrame._get_style_array(style, current_cell.parent.parent, style_cache))
+
+    @staticmethod
+    def _get_style_array(style: Union[Styler, Cell, ReadOnlyCell], workbook: Workbook,
+                         style_cache: StyleCache) -> StyleArray:
+        """Returns the style array of style in workbook, registering style with workbook if it was not yet.
+        The returned array is shared and must not be modified.
 
-        for column in self._columns_width:
-            column_letter = self._get_column_as_letter(sheet, column, startcol)
-            sheet.column_dimensions[column_letter].width = self._columns_width[column]
+        :meta private:
+        """
+
+        if isinstance(style, (Cell, ReadOnlyCell)):
+            # every distinct style of every source workbook is copied into the workbook once.
+            # the source workbook is part of the key since its style ids are meaningful only within it
+            source_style_array = style.style_array if isinstance(style, ReadOnlyCell) else style._style
+            key = (style.parent.parent, tuple(source_style_array or ()))
+            style_array = style_cache.get(key)
+            if style_array is None:
+                style_array = style_cache[key] = StyleFrame._copy_openpyxl_style(style, workbook)
+            return style_array
+
+        # assigning a NamedStyle to cell.style searches the workbook's named styles on every assignment.
+        # instead, every distinct style is registered with the workbook once and cells get a copy of its style array
+        style_array = style_cache.get(style)
+        if style_array is None:
+            named_style = style.to_openpyxl_style()
+            # named styles are shared by all workbooks, so binding one to a workbook and reading its ids is atomic
+            with _named_styles_lock:
+                named_styles = workbook._named_styles
+                if named_style.name in named_styles.names:
+                    # the named style may have been bound to another workbook since it was registered with this one
+                    named_style.bind(workbook)
+                    named_style._style.xfId = named_styles.names.index(named_style.name)
+                else:
+                    workbook.add_named_style(named_style)
+                style_array = copy(named_style.as_tuple())
+            style_cache[style] = style_array
+        return style_array
+
+    @staticmethod
+    def _get_comment(style):
+        if isinstance(style, Styler):
+            return style.generate_comment()
+        return getattr(style, 'comment', None)
+
+    @classmethod
+    def _get_cell_style_to_apply(cls, derived_styles: dict, container, value, date_time_kind: Optional[str], column,
+                                 best_fit):
+        try:
+            data_df_style = container._style
+        except AttributeError:  # if the element in the dataframe is not Container creating a default style
+            return Styler(), None
+        if '=HYPERLINK' in str(value):
+            changes = {'font_color': utils.colors.blue, 'underline': utils.underline.single}
+        elif best_fit and column.value in best_fit:
+            changes = {'wrap_text': False, 'shrink_to_fit': False}
+        else:
+            changes = {}
+        return (cls._get_style_to_apply(derived_styles, data_df_style, date_time_kind, **changes),
+                cls._get_comment(data_df_style))
+
+    def _get_best_fit_columns_width(self, best_fit: Iterable) -> Dict[Any, float]:
+        return {column: (max(self.data_df[column].astype(str).str.len()) + self.A_FACTOR) * self.P_FACTOR
+                for column in best_fit}
+
+    def _apply_sheet_settings(self, sheet, columns_width: dict, startrow: int, startcol: int, max_row: int,
+                              max_column: int, allow_protection: bool, right_to_left: bool, columns_to_hide,
+                              row_to_add_filters, columns_and_rows_to_freeze) -> None:
+        """Applies the sheet's settings (see :meth:`to_excel`) to an openpyxl sheet. ``startcol`` is the offset of
+        the first column of the StyleFrame, after the index.
+
+        :meta private:
+        """
+
+        def within_sheet_boundaries(row: Union[int, str] = 1, column: str = 'A'):
+            return (1 <= int(row) <= max_row
+                        and
+                    1 <= cell.column_index_from_string(column) <= max_column)
+
+        def get_range_of_cells(row_index=None, columns=None):
+            if columns is None:
+                start_letter = self._get_column_as_letter(sheet, self.data_df.columns[0], startcol, max_column)
+                end_letter = self._get_column_as_letter(sheet, self.data_df.columns[-1], startcol, max_column)
+            else:
+                start_letter = self._get_column_as_letter(sheet, columns[0], startcol, max_column)
+                end_letter = self._get_column_as_letter(sheet, columns[-1], startcol, max_column)
+            if row_index is None:  # returns cells range for the entire dataframe
+                start_index = startrow + 1
+                end_index = start_index + len(self)
+            else:
+                start_index = startrow + row_index + 1
+                end_index = start_index
+            return '{start_letter}{start_index}:{end_letter}{end_index}'.format(start_letter=start_letter,
+                                                                                start_index=start_index,
+                                                                                end_letter=end_letter,
+                                                                                end_index=end_index)
+
+        sheet.sheet_view.rightToLeft = right_to_left
+
+        for column in columns_width:
+            column_letter = self._get_column_as_letter(sheet, column, startcol, max_column)
+            sheet.column_dimensions[column_letter].width = columns_width[column]
 
         for row in self._rows_height:
             if within_sheet_boundaries(row=(row + startrow)):
@@ -562,7 +1465,7 @@ class StyleFrame:
                 raise IndexError("column: %s is out of columns range." % columns_and_rows_to_freeze[0])
             if not within_sheet_boundaries(row=columns_and_rows_to_freeze[1]):
                 raise IndexError("row: %s is out of rows range." % columns_and_rows_to_freeze[1])
-            sheet.freeze_panes = sheet[columns_and_rows_to_freeze]
+            sheet.freeze_panes = columns_and_rows_to_freeze
 
         if allow_protection:
             sheet.protection.autoFilter = False
@@ -574,17 +1477,66 @@ class StyleFrame:
                 columns_to_hide = [columns_to_hide]
 
             for column in columns_to_hide:
-                column_letter = self._get_column_as_letter(sheet, column, startcol)
+                column_letter = self._get_column_as_letter(sheet, column, startcol, max_column)
                 sheet.column_dimensions[column_letter].hidden = True
 
         for cond_formatting in self._cond_formatting:
+            # adding a rule to a sheet sets its priority, so the StyleFrame's rule is not added itself
             sheet.conditional_formatting.add(get_range_of_cells(columns=cond_formatting.columns),
-                                             cond_formatting.rule)
+                                             copy(cond_formatting.rule))
 
-        return excel_writer
+    def _stream_rows(self, sheet, derived_styles: dict, style_cache: StyleCache, header: bool, index: bool,
+                     startcol: int, na_rep, best_fit) -> None:
+        """Appends the StyleFrame's rows, already styled, to a write-only sheet.
+
+        :meta private:
+        """
+
+        def get_streamed_cell(value, style_to_apply, comment):
+            streamed_cell = WriteOnlyCell(sheet, value=get_written_value(value, na_rep))
+            self._set_cell_style(streamed_cell, style_to_apply, style_cache)
+            if comment is not None:
+                streamed_cell.comment = comment
+            return streamed_cell
+
+        if header:
+            row = [None] * startcol
+            if index:
+                row.append(get_streamed_cell(self.data_df.index.name, self._index_header_style, None)
+                           if self.data_df.index.name else None)
+            headers_date_time_kinds = self._get_date_time_kinds([column.value for column in self.data_df.columns])
+            for column, date_time_kind in zip(self.data_df.columns, headers_date_time_kinds):
+                row.append(get_streamed_cell(column.value,
+                                             self._get_style_to_apply(derived_styles, column._style, date_time_kind),
+                                             self._get_comment(column._style)))
+            sheet.append(row)
+
+        index_date_time_kinds = self._get_date_time_kinds([index_value.value for index_value in self.data_df.index])
+        if len(self.data_df.columns) > 0:
+            rows_date_time_kinds = zip(*(self._get_date_time_kinds([getattr(container, 'value', container)
+                                                                    for container in self.data_df.iloc[:, col_index]])
+                                         for col_index in range(len(self.data_df.columns))))
+        else:
+            rows_date_time_kinds = repeat(())
+
+        # each row is written once, already styled, and is not kept in memory afterwards
+        for index_value, index_date_time_kind, containers, row_date_time_kinds in zip(
+                self.data_df.index, index_date_time_kinds, self.data_df.values, rows_date_time_kinds):
+            row = [None] * startcol
+            if index:
+                row.append(get_streamed_cell(index_value.value,
+                                             self._get_style_to_apply(derived_styles, index_value._style,
+                                                                      index_date_time_kind),
+                                             self._get_comment(index_value._style)))
+            for column, container, date_time_kind in zip(self.data_df.columns, containers, row_date_time_kinds):
+                value = self._get_export_value(container, na_rep)
+                row.append(get_streamed_cell(value, *self._get_cell_style_to_apply(derived_styles, container, value,
+                                                                                   date_time_kind, column,
+                                                                                   best_fit)))
+            sheet.append(row)
 
     def apply_style_by_indexes(self,
-                               indexes_to_style: Union[list, tuple, int, Container],
+                               indexes_to_style: Union[list, tuple, int, Container, np.ndarray, pd.Series, pd.Index],
                                styler_obj: Styler,
                                cols_to_style: Optional[Union[str, Union[List[str], Tuple[str], Set[str]]]] = None,
                                height: Optional[Union[int, float]] = None,
@@ -601,7 +1553,13 @@ class StyleFrame:
 
                 sf[sf['some_col'] == 20]
 
-        :type indexes_to_style: list or tuple or int or Container
+            .. versionadded:: 4.2
+
+                May also be a boolean mask with an element for every row (for example ``sf['some_col'] == 20``),
+                or the positions of the rows to style. These are applied without looking up the indexes one by one.
+
+        :type indexes_to_style: list or tuple or int or Container or :class:`numpy.ndarray` or :class:`pandas.Series`
+            or :class:`pandas.Index`
         :param styler_obj: `Styler` object that contains the style that will be applied to indexes in `indexes_to_style`
         :type styler_obj: :class:`.Styler`
         :param cols_to_style: The column names to apply the provided style to. If ``None`` all columns will be styled.
@@ -630,38 +1588,59 @@ class StyleFrame:
         if not isinstance(styler_obj, Styler):
             raise TypeError('styler_obj must be {}, got {} instead.'.format(Styler.__name__, type(styler_obj).__name__))
 
-        if isinstance(indexes_to_style, (list, tuple, int)):
-            indexes_to_style = self.index[indexes_to_style]
-
-        elif isinstance(indexes_to_style, Container):
-            indexes_to_style = pd.Index([indexes_to_style])
+        rows_mask = self._get_rows_mask(indexes_to_style)
 
         if cols_to_style is not None and not isinstance(cols_to_style, (list, tuple, set)):
             cols_to_style = [cols_to_style]
         elif cols_to_style is None:
             cols_to_style = list(self.data_df.columns)
+        cols_positions = [self.columns.get_loc(col) for col in cols_to_style]
 
         if overwrite_default_style:
-            style_to_apply = deepcopy(styler_obj)
+            style_to_apply = styler_obj.interned()
         else:
-            style_to_apply = Styler.combine(self._default_style, styler_obj)
+            style_to_apply = Styler.combine(self._default_style, styler_obj).interned()
 
-        for index in indexes_to_style:
+        self._copy_containers_on_write()
+        for index in self.index[rows_mask]:
             index.style = style_to_apply
-            for col in cols_to_style:
-                self.iloc[self.index.get_loc(index), self.columns.get_loc(col)].style = style_to_apply
+        for container in self.data_df.values[rows_mask][:, cols_positions].ravel():
+            container.style = style_to_apply
 
         if height:
             # Add offset 2 since rows do not include the headers and they starts from 1 (not 0).
-            rows_indexes_for_height_change = [self.index.get_loc(idx) + 2 for idx in indexes_to_style]
+            rows_indexes_for_height_change = (np.flatnonzero(rows_mask) + 2).tolist()
             self.set_row_height(rows=rows_indexes_for_height_change, height=height)
 
         if complement_style:
-            self.apply_style_by_indexes(self.index.difference(indexes_to_style), complement_style, cols_to_style,
+            self.apply_style_by_indexes(~rows_mask, complement_style, cols_to_style,
                                         complement_height if complement_height else height)
 
         return self
 
+    def _get_rows_mask(self, indexes_to_style) -> np.ndarray:
+        """Converts any of the forms of indexes apply_style_by_indexes accepts to a boolean mask of the rows.
+
+        :meta private:
+        """
+
+        if isinstance(indexes_to_style, (Container, pd.Index)):
+            # indexes are looked up by their values since they may belong to another frame, for example a copy
+            return self.index.isin([indexes_to_style] if isinstance(indexes_to_style, Container) else indexes_to_style)
+
+        indexes_to_style = np.asarray(indexes_to_style)
+        if indexes_to_style.dtype == bool:
+            if indexes_to_style.shape != (len(self),):
+                raise ValueError('boolean mask must have a value for each of the {} rows, got shape {}'
+                                 .format(len(self), indexes_to_style.shape))
+            return indexes_to_style
+        if indexes_to_style.size and not np.issubdtype(indexes_to_style.dtype, np.integer):
+            raise TypeError('indexes_to_style must be indexes, a boolean mask or positions of rows, got {}'
+                            .format(indexes_to_style.dtype))
+        rows_mask = np.zeros(len(self), dtype=bool)
+        rows_mask[indexes_to_style.astype(np.intp)] = True
+        return rows_mask
+
     def apply_column_style(self,
                            cols_to_style: Union[str, List[str], Tuple[str], Set[str]],
                            styler_obj: Styler,
@@ -695,24 +1674,29 @@ class StyleFrame:
             raise KeyError("one of the columns in {} wasn't found".format(cols_to_style))
 
         if overwrite_default_style:
-            style_to_apply = styler_obj
+            style_to_apply = styler_obj.interned()
         else:
-            style_to_apply = Styler.combine(self._default_style, styler_obj)
-
+            style_to_apply = Styler.combine(self._default_style, styler_obj).interned()
+
+        self._copy_containers_on_write()
+        # the style of each kind of date/time is derived once. styler_obj is not modified since it may be shared
+        styles_by_date_time_kind = {None: style_to_apply}
+        if use_default_formats:
+            styles_by_date_time_kind.update({date_time_kind: style_to_apply.replace(number_format=number_format)
+                                             for date_time_kind, number_format
+                                             in self._default_number_formats_by_date_time_kind.items()})
         for col_name in cols_to_style:
+            col_index = self.columns.get_loc(col_name)
             if style_header:
-                self.columns[self.columns.get_loc(col_name)].style = style_to_apply
+                self.columns[col_index].style = style_to_apply
                 self._has_custom_headers_style = True
-            for index in self.index:
-                if use_default_formats:
-                    if isinstance(self.at[index, col_name].value, pd_timestamp):
-                        style_to_apply.number_format = utils.number_formats.date_time
-                    elif isinstance(self.at[index, col_name].value, dt.date):
-                        style_to_apply.number_format = utils.number_formats.date
-                    elif isinstance(self.at[index, col_name].value, dt.time):
-                        style_to_apply.number_format = utils.number_formats.time_24_hours
-
-                self.at[index, col_name].style = style_to_apply
+            containers = self.data_df.iloc[:, col_index]
+            if use_default_formats:
+                date_time_kinds = self._get_date_time_kinds([container.value for container in containers])
+            else:
+                date_time_kinds = repeat(None)
+            for container, date_time_kind in zip(containers, date_time_kinds):
+                container.style = styles_by_date_time_kind[date_time_kind]
 
         if width:
             self.set_column_width(columns=cols_to_style, width=width)
@@ -751,9 +1735,11 @@ class StyleFrame:
         if not all(col in self.columns for col in cols_to_style):
             raise KeyError("one of the columns in {} wasn't found".format(cols_to_style))
 
+        styler_obj = styler_obj.interned()
         if style_index_header:
             self._index_header_style = styler_obj
 
+        self._copy_containers_on_write()
         for column in cols_to_style:
             self.columns[self.columns.get_loc(column)].style = styler_obj
         self._has_custom_headers_style = True
@@ -861,7 +1847,7 @@ class StyleFrame:
 
         sf = self if inplace else StyleFrame(self)
 
-        new_columns = [col if col not in columns else Container(columns[col], col.style)
+        new_columns = [col if col not in columns else Container(columns[col], col._get_shared_style())
                        for col in sf.data_df.columns]
 
         sf._known_attrs['columns'] = sf.data_df.columns = new_columns
@@ -890,6 +1876,8 @@ class StyleFrame:
         split_indexes = (self.index[i::num_of_styles] for i in range(num_of_styles))
         for i, indexes in enumerate(split_indexes):
             self.apply_style_by_indexes(indexes, styles[i], **kwargs)
+        # kept so a compiled layout can repeat the alternation for more rows (see SheetLayout.render)
+        self._alternate_rows_period = num_of_styles
         return self
 
     def add_color_scale_conditional_formatting(self,
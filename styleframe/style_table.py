@@ -0,0 +1,81 @@
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+
+class StyleTable:
+    """
+    A deduplicated table of styles. Every distinct style is stored once and is referred to by an integer id, which
+    allows the styles of a whole frame to be represented as a matrix of ids pointing into the table
+    (see :meth:`.StyleFrame._to_style_matrix`).
+
+    :param styles: Styles to initialize the table with.
+    :type styles: Iterable
+    """
+
+    def __init__(self, styles: Iterable = ()):
+        self._styles: List[Any] = []
+        self._ids_by_style: Dict[Hashable, int] = {}
+        # cells usually share style objects, so they are looked up by identity before being hashed.
+        # the style itself is kept in the value so its id can not be reused by another object
+        self._ids_by_identity: Dict[int, Tuple[int, Any]] = {}
+        for style in styles:
+            self.add(style)
+
+    def __len__(self) -> int:
+        return len(self._styles)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._styles)
+
+    def __getitem__(self, style_id: int):
+        return self._styles[style_id]
+
+    def __contains__(self, style) -> bool:
+        return id(style) in self._ids_by_identity or style in self._ids_by_style
+
+    def add(self, style) -> int:
+        """
+        Adds a style to the table, unless an equal style is already in it.
+
+        :param style: The style to add
+        :return: The id of the style in the table
+        :rtype: int
+        """
+
+        try:
+            return self._ids_by_identity[id(style)][0]
+        except KeyError:
+            pass
+        try:
+            style_id = self._ids_by_style[style]
+        except KeyError:
+            style_id = self._ids_by_style[style] = len(self._styles)
+            self._styles.append(style)
+        self._ids_by_identity[id(style)] = (style_id, style)
+        return style_id
+
+    def ids(self, styles: Iterable, count: int = -1) -> np.ndarray:
+        """
+        Adds all the given styles to the table.
+
+        :param styles: The styles to add
+        :type styles: Iterable
+        :param int count: The number of styles, if known in advance
+        :return: The ids of the styles in the table
+        :rtype: :class:`numpy.ndarray` of ``int32``
+        """
+
+        return np.fromiter(map(self.add, styles), dtype=np.int32, count=count)
+
+    def take(self, style_ids: np.ndarray) -> np.ndarray:
+        """
+        :param style_ids: Ids of styles in the table
+        :type style_ids: :class:`numpy.ndarray`
+        :return: An object array with the same shape as ``style_ids`` holding the styles themselves
+        :rtype: :class:`numpy.ndarray`
+        """
+
+        styles = np.empty(len(self._styles), dtype=object)
+        styles[:] = self._styles
+        return styles[np.asarray(style_ids, dtype=np.intp)]
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from operator import attrgetter, methodcaller
+
+import numpy as np
+import pandas as pd
+
+from styleframe.container import Container
+from styleframe.style_frame import StyleFrame
+
+_get_values = np.frompyfunc(attrgetter('value'), 1, 1)
+# the template's styles are shared by all the StyleFrames that are filled from it, so they must be immutable
+_get_styles = np.frompyfunc(methodcaller('_get_shared_style'), 1, 1)
+_make_containers = np.frompyfunc(Container, 2, 1)
+
+
+class StyleTemplate:
+    """
+    .. versionadded:: 4.2
+
+    A template that is parsed once and can then be filled with the data of any number of DataFrames.
+    Filling a template is equivalent to :meth:`.StyleFrame.read_excel_as_template`, but the template's styles are
+    resolved when the template is created and not on every fill.
+
+    :param template: The styled StyleFrame to use as a template, usually read by :meth:`read_excel`.
+    :type template: :class:`.StyleFrame`
+    """
+
+    def __init__(self, template: StyleFrame):
+        cells = template.data_df.values
+        self._values = _get_values(cells) if cells.size else np.empty(cells.shape, dtype=object)
+        self._styles = _get_styles(cells) if cells.size else np.empty(cells.shape, dtype=object)
+        self._columns = [(col.value, col._get_shared_style()) for col in template.data_df.columns]
+        self._index = [(index.value, index._get_shared_style()) for index in template.data_df.index]
+        self._index_name = template.data_df.index.name
+        # the widths are kept by the columns' positions, since filling the template renames its columns.
+        # columns without a width (all of them when the template is read with read_only=True) are left out
+        self._columns_width = OrderedDict((col_index, template._columns_width[col_value])
+                                          for col_index, (col_value, _) in enumerate(self._columns)
+                                          if template._columns_width.get(col_value) is not None)
+        self._rows_height = OrderedDict(template._rows_height)
+        self._has_custom_headers_style = template._has_custom_headers_style
+        self._index_header_style = template._index_header_style
+
+    @classmethod
+    def read_excel(cls, path: str, **kwargs) -> 'StyleTemplate':
+        """
+        Creates a template from an excel file.
+
+        .. note:: :meth:`read_excel` also accepts all arguments that :meth:`.StyleFrame.read_excel` accepts as kwargs
+            except for ``read_style`` which must be ``True``.
+
+        :param str path: The path to the Excel file to read.
+        :return: StyleTemplate object
+        :rtype: :class:`StyleTemplate`
+        """
+
+        return cls(StyleFrame.read_excel(path=path, read_style=True, **kwargs))
+
+    @property
+    def shape(self) -> tuple:
+        return self._styles.shape
+
+    def fill(self, df: pd.DataFrame, use_df_boundaries: bool = False) -> StyleFrame:
+        """
+        Creates a StyleFrame object from the template with the data of the given DataFrame.
+
+        The cells of the template are filled with the DataFrame's values and keep the template's styles.
+        Columns and rows of the DataFrame that are outside of the template are added with the default style, and
+        columns and rows of the template that are outside of the DataFrame keep the template's values.
+
+        :param df: The data to fill the template with.
+        :type df: :class:`pandas.DataFrame`
+        :param bool use_df_boundaries: If ``True`` the template will be cut according to the boundaries of the
+            given DataFrame.
+
+        :return: StyleFrame object
+        :rtype: :class:`StyleFrame`
+        """
+
+        num_of_rows, num_of_cols = df.shape
+        template_num_of_rows, template_num_of_cols = self.shape
+        if use_df_boundaries:
+            total_num_of_rows, total_num_of_cols = num_of_rows, num_of_cols
+        else:
+            total_num_of_rows = max(num_of_rows, template_num_of_rows)
+            total_num_of_cols = max(num_of_cols, template_num_of_cols)
+        num_of_rows_from_df = min(num_of_rows, total_num_of_rows)
+        num_of_rows_from_template = min(template_num_of_rows, total_num_of_rows)
+
+        # cells that are outside of the template get the default style of their values, which depends only on the
+        # values' types
+        default_styles_by_type = {}
+
+        def get_default_style(value):
+            try:
+                return default_styles_by_type[type(value)]
+            except KeyError:
+                style = default_styles_by_type[type(value)] = Container(value)._style
+                return style
+
+        get_default_styles = np.frompyfunc(get_default_style, 1, 1)
+        data = {}
+        for col_index in range(total_num_of_cols):
+            values = np.full(total_num_of_rows, np.nan, dtype=object)
+            styles = np.empty(total_num_of_rows, dtype=object)
+            if col_index < template_num_of_cols:
+                values[:num_of_rows_from_template] = self._values[:num_of_rows_from_template, col_index]
+                styles[:num_of_rows_from_template] = self._styles[:num_of_rows_from_template, col_index]
+                first_row_with_default_style = num_of_rows_from_template
+            else:
+                first_row_with_default_style = 0
+            if col_index < num_of_cols:
+                values[:num_of_rows_from_df] = df.iloc[:num_of_rows_from_df, col_index].to_numpy(dtype=object)
+            styles[first_row_with_default_style:] = get_default_styles(values[first_row_with_default_style:])
+            data[col_index] = _make_containers(values, styles)
+
+        columns = [Container(df.columns[col_index] if col_index < num_of_cols else self._columns[col_index][0],
+                             self._columns[col_index][1] if col_index < template_num_of_cols else None)
+                   for col_index in range(total_num_of_cols)]
+        index = [Container(*self._index[row_index]) if row_index < template_num_of_rows
+                 else Container(df.index[row_index])
+                 for row_index in range(total_num_of_rows)]
+
+        data_df = pd.DataFrame(data, index=range(total_num_of_rows), columns=range(total_num_of_cols))
+        data_df.columns = columns
+        data_df.index = index
+        data_df.index.name = self._index_name
+        sf = StyleFrame(data_df)
+
+        sf._columns_width = OrderedDict((sf.data_df.columns[col_index].value, width)
+                                        for col_index, width in self._columns_width.items()
+                                        if col_index < total_num_of_cols)
+        # the headers row is followed by the rows of the data
+        sf._rows_height = OrderedDict((row_index, height) for row_index, height in self._rows_height.items()
+                                      if not use_df_boundaries or row_index <= total_num_of_rows + 1)
+        sf._has_custom_headers_style = self._has_custom_headers_style
+        sf._index_header_style = self._index_header_style
+        return sf
+
+    def __repr__(self) -> str:
+        return '{}(shape={})'.format(type(self).__name__, self.shape)
+
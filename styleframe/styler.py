@@ -1,13 +1,15 @@
 from openpyxl.cell import Cell
 
 from . import utils
+from .style_cache import StyleCache
 from colour import Color
 from openpyxl.formatting.rule import ColorScaleRule
 from openpyxl.styles import PatternFill, NamedStyle, Color as OpenPyColor, Border, Side, Font, Alignment, Protection
 from openpyxl.comments import Comment
 from pprint import pformat
 
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
+from weakref import WeakValueDictionary
 
 
 class Styler:
@@ -66,7 +68,21 @@ class Styler:
     :param bool italic:
     """
 
-    cache: Dict['Styler', NamedStyle] = {}
+    _fields = ('bg_color', 'bold', 'font', 'font_size', 'font_color', 'number_format', 'protection', 'underline',
+               'border_type', 'horizontal_alignment', 'vertical_alignment', 'wrap_text', 'shrink_to_fit',
+               'fill_pattern_type', 'indent', 'comment_author', 'comment_text', 'text_rotation', 'date_format',
+               'time_format', 'date_time_format', 'strikethrough', 'italic')
+
+    # __dict__ is kept so custom attributes can still be set on Styler objects
+    __slots__ = _fields + ('__weakref__', '__dict__')
+
+    # identical styles created with intern() share a single FrozenStyler, which lives as long as it is used
+    _interned: 'WeakValueDictionary[tuple, FrozenStyler]' = WeakValueDictionary()
+    _interned_by_kwargs: 'WeakValueDictionary[tuple, FrozenStyler]' = WeakValueDictionary()
+
+    # maps stylers to their openpyxl named styles. may be replaced with any other StyleCache, for example one
+    # with a different size limit
+    cache: StyleCache = StyleCache()
 
     def __init__(self,
                  bg_color: Optional[str] = None,
@@ -93,13 +109,6 @@ class Styler:
                  strikethrough: bool = False,
                  italic: bool = False):
 
-        def get_color_from_string(color_str: str, default_color: Optional[str] = None) -> str:
-            if color_str and color_str.startswith('#'):
-                color_str = color_str[1:]
-            if not utils.is_hex_color_string(hex_string=color_str):
-                color_str = utils.colors.get(color_str, default_color)
-            return color_str
-
         if border_type == utils.borders.default_grid:
             if bg_color is not None or fill_pattern_type != utils.fill_pattern_types.solid:
                 raise ValueError('`bg_color`or `fill_pattern_type` conflict with border_type={}'.format(utils.borders.default_grid))
@@ -117,8 +126,8 @@ class Styler:
         self.underline = underline
         self.horizontal_alignment = horizontal_alignment
         self.vertical_alignment = vertical_alignment
-        self.bg_color = get_color_from_string(bg_color, default_color=utils.colors.white)
-        self.font_color = get_color_from_string(font_color, default_color=utils.colors.black)
+        self.bg_color = self._get_color_from_string(bg_color, default_color=utils.colors.white)
+        self.font_color = self._get_color_from_string(font_color, default_color=utils.colors.black)
         self.shrink_to_fit = shrink_to_fit
         self.wrap_text = wrap_text
         self.indent = indent
@@ -131,22 +140,112 @@ class Styler:
         self.strikethrough = strikethrough
         self.italic = italic
 
+    @staticmethod
+    def _get_color_from_string(color_str: str, default_color: Optional[str] = None) -> str:
+        if color_str and color_str.startswith('#'):
+            color_str = color_str[1:]
+        if not utils.is_hex_color_string(hex_string=color_str):
+            color_str = utils.colors.get(color_str, default_color)
+        return color_str
+
+    def _key(self) -> tuple:
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def _as_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self._key()))
+
+    @classmethod
+    def _from_key(cls, key: tuple) -> 'Styler':
+        styler = cls.__new__(cls)
+        styler.__setstate__(key)
+        return styler
+
+    def __getstate__(self):
+        # custom attributes, if any were set, are pickled after the fields
+        return self._key() + (self.__dict__,) if self.__dict__ else self._key()
+
+    def __setstate__(self, state):
+        for field, value in zip(self._fields, state):
+            object.__setattr__(self, field, value)
+        if len(state) > len(self._fields):
+            self.__dict__.update(state[-1])
+
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+        return self is other or (isinstance(other, Styler) and self._key() == other._key())
 
     def __hash__(self):
-        return hash(tuple((k, v) for k, v in sorted(self.__dict__.items())))
+        return hash(self._key())
 
     def __add__(self, other):
-        default = Styler().__dict__
-        d = dict(self.__dict__)
-        for k, v in other.__dict__.items():
+        default = Styler()._as_dict()
+        d = self._as_dict()
+        for k, v in other._as_dict().items():
             if v != default[k]:
                 d[k] = v
         return Styler(**d)
 
     def __repr__(self):
-        return pformat(self.__dict__)
+        return pformat(self._as_dict())
+
+    def replace(self, **changes) -> 'Styler':
+        """
+        .. versionadded:: 4.2
+
+        :param changes: The attributes to change, with their new values
+        :return: A new style of the same type with the given attributes changed. ``self`` is not modified.
+        :rtype: :class:`Styler`
+        """
+
+        unknown_attributes = set(changes).difference(self._fields)
+        if unknown_attributes:
+            raise TypeError('replace() got unexpected attributes: {}'.format(', '.join(sorted(unknown_attributes))))
+        for color_attr, default_color in (('bg_color', utils.colors.white), ('font_color', utils.colors.black)):
+            if color_attr in changes:
+                changes[color_attr] = self._get_color_from_string(changes[color_attr], default_color=default_color)
+        return self._from_key(tuple(changes[field] if field in changes else getattr(self, field)
+                                    for field in self._fields))
+
+    def freeze(self) -> 'FrozenStyler':
+        """
+        .. versionadded:: 4.2
+
+        :return: An immutable copy of this style
+        :rtype: :class:`FrozenStyler`
+        """
+
+        return FrozenStyler._from_key(self._key())
+
+    @classmethod
+    def intern(cls, **kwargs) -> 'FrozenStyler':
+        """
+        .. versionadded:: 4.2
+
+        Accepts the same arguments as :class:`Styler`.
+
+        :return: The single shared :class:`FrozenStyler` with the given attributes. Calling :meth:`intern` again with
+            arguments that describe the same style returns the same object, as long as it is still in use.
+        :rtype: :class:`FrozenStyler`
+        """
+
+        kwargs_key = tuple(sorted(kwargs.items()))
+        styler = cls._interned_by_kwargs.get(kwargs_key)
+        if styler is None:
+            styler = cls._interned_by_kwargs.setdefault(kwargs_key, FrozenStyler(**kwargs).interned())
+        return styler
+
+    def interned(self) -> 'FrozenStyler':
+        """
+        .. versionadded:: 4.2
+
+        :return: The single shared :class:`FrozenStyler` that is equal to this style (see :meth:`intern`)
+        :rtype: :class:`FrozenStyler`
+        """
+
+        key = self._key()
+        styler = self._interned.get(key)
+        if styler is None:
+            styler = self._interned.setdefault(key, self.freeze())
+        return styler
 
     def generate_comment(self):
         if any((self.comment_author, self.comment_text)):
@@ -163,7 +262,8 @@ class Styler:
         except KeyError:
             side = Side(border_style=self.border_type, color=utils.colors.black)
             border = Border(left=side, right=side, top=side, bottom=side)
-            openpyxl_style = self.cache[self] = NamedStyle(
+            # the style is cached by an immutable copy, so modifying it afterwards does not invalidate the cache
+            openpyxl_style = self.cache[self.freeze()] = NamedStyle(
                 name=str(hash(self)),
                 font=Font(name=self.font, size=self.font_size, color=OpenPyColor(self.font_color),
                           bold=self.bold, underline=self.underline, strikethrough=self.strikethrough,
@@ -287,6 +387,47 @@ class Styler:
     create_style = to_openpyxl_style
 
 
+class FrozenStyler(Styler):
+    """
+    .. versionadded:: 4.2
+
+    An immutable :class:`Styler`. Its hash is calculated once, when it is created, so looking it up in dictionaries
+    and caches is cheap. Equal :class:`Styler` and :class:`FrozenStyler` objects have the same hash.
+
+    Accepts the same arguments as :class:`Styler`. Use :meth:`Styler.replace` to derive a modified style.
+    """
+
+    __slots__ = ('_hash',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        object.__setattr__(self, '_hash', hash(self._key()))
+
+    def __setattr__(self, name, value):
+        if hasattr(self, '_hash'):
+            raise AttributeError('{} is immutable, use replace() to derive a new style'.format(type(self).__name__))
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        object.__setattr__(self, '_hash', hash(self._key()))
+
+    def __hash__(self):
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def freeze(self) -> 'FrozenStyler':
+        return self
+
+
 class ColorScaleConditionalFormatRule:
     """Creates a color scale conditional format rule. Wraps openpyxl's ColorScaleRule.
     Mostly should not be used directly, but through StyleFrame.add_color_scale_conditional_formatting
@@ -1,4 +1,7 @@
 import unittest
+from copy import copy
+
+import pandas as pd
 
 from styleframe import Container
 
@@ -13,6 +16,22 @@ class ContainerTest(unittest.TestCase):
         self.cont_false = Container(False)
         self.cont_true = Container(True)
 
+    def test_default_style_is_shared(self):
+        self.assertIs(self.cont_0._style, self.cont_1._style)
+        self.assertIsNot(Container('a string')._style, Container(pd.Timestamp('2021-01-01'))._style)
+
+    def test_modifying_style_does_not_modify_shared_style(self):
+        self.cont_0.style.bold = True
+        self.cont_0.style.custom_attribute = 'value'
+        self.assertTrue(self.cont_0.style.bold)
+        self.assertEqual(self.cont_0.style.custom_attribute, 'value')
+        self.assertFalse(self.cont_1.style.bold)
+        self.assertFalse(Container(3).style.bold)
+        # copies of a container do not share its modified style
+        cont_0_copy = copy(self.cont_0)
+        cont_0_copy.style.bold = False
+        self.assertTrue(self.cont_0.style.bold)
+
     def test__gt__(self):
         self.assertGreater(self.cont_2, self.cont_1)
         self.assertGreater(self.cont_2, 1)
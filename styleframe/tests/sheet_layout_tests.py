@@ -0,0 +1,192 @@
+import datetime as dt
+import unittest
+from copy import copy
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from styleframe import SheetLayout, StyleFrame, Styler, utils
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+class SheetLayoutTest(unittest.TestCase):
+    @staticmethod
+    def get_sf(data=None):
+        if data is None:
+            data = {'a': [1, 2.5, np.nan], 'b': ['x', '=HYPERLINK("http://a.com", "a")', 'y'],
+                    'c': [dt.date(2020, 1, 1), pd.Timestamp('2020-01-02 03:04'), pd.NaT]}
+        sf = StyleFrame(data)
+        sf.apply_column_style('a', Styler(bg_color=utils.colors.yellow, comment_text='a', comment_author='me'))
+        sf.apply_style_by_indexes(sf.index[1], Styler(italic=True), height=25)
+        sf.set_column_width('c', 30)
+        sf.add_color_scale_conditional_formatting(start_type=utils.conditional_formatting_types.num,
+                                                  start_value=0, start_color=utils.colors.red,
+                                                  end_type=utils.conditional_formatting_types.num,
+                                                  end_value=10, end_color=utils.colors.green, columns_range=['a'])
+        sf.data_df.index.name = 'index name'
+        return sf
+
+    def setUp(self):
+        self.sf = self.get_sf()
+        self.to_excel_kwargs = dict(index=True, best_fit='b', row_to_add_filters=0, columns_and_rows_to_freeze='B2',
+                                    columns_to_hide='c', allow_protection=True)
+
+    def assert_sheets_equal(self, sheet, expected_sheet):
+        self.assertEqual(sheet.max_row, expected_sheet.max_row)
+        self.assertEqual(sheet.max_column, expected_sheet.max_column)
+        for row, expected_row in zip(sheet.iter_rows(), expected_sheet.iter_rows()):
+            for current_cell, expected_cell in zip(row, expected_row):
+                self.assertEqual(current_cell.value, expected_cell.value)
+                self.assertEqual(current_cell.number_format, expected_cell.number_format)
+                for attr in ('font', 'fill', 'border', 'alignment', 'protection'):
+                    self.assertEqual(copy(getattr(current_cell, attr)), copy(getattr(expected_cell, attr)))
+                self.assertEqual(current_cell.comment and current_cell.comment.text,
+                                 expected_cell.comment and expected_cell.comment.text)
+        for column_letter, column_dimension in expected_sheet.column_dimensions.items():
+            self.assertEqual(sheet.column_dimensions[column_letter].width, column_dimension.width)
+            self.assertEqual(sheet.column_dimensions[column_letter].hidden, column_dimension.hidden)
+        for row_index, row_dimension in expected_sheet.row_dimensions.items():
+            self.assertEqual(sheet.row_dimensions[row_index].height, row_dimension.height)
+        self.assertEqual(sheet.auto_filter.ref, expected_sheet.auto_filter.ref)
+        self.assertEqual(sheet.freeze_panes, expected_sheet.freeze_panes)
+        self.assertEqual(sheet.protection.sheet, expected_sheet.protection.sheet)
+        self.assertEqual([str(cf.sqref) for cf in sheet.conditional_formatting],
+                         [str(cf.sqref) for cf in expected_sheet.conditional_formatting])
+
+    def test_compile_layout_does_not_modify_style_frame(self):
+        cells = self.sf.data_df.values.copy()
+        columns_styles = [column.style for column in self.sf.columns]
+        columns_width = dict(self.sf._columns_width)
+        rule_priority = self.sf._cond_formatting[0].rule.priority
+        layout = self.sf.compile_layout(**self.to_excel_kwargs)
+
+        self.assertIsInstance(layout, SheetLayout)
+        self.assertEqual(layout.shape, (4, 4))
+        self.assertTrue(all(current is expected for current, expected in zip(self.sf.data_df.values.ravel(),
+                                                                              cells.ravel())))
+        self.assertEqual([column.style for column in self.sf.columns], columns_styles)
+        self.assertEqual(self.sf._columns_width, columns_width)
+        self.assertFalse(self.sf._has_custom_headers_style)
+        self.assertEqual(self.sf._cond_formatting[0].rule.priority, rule_priority)
+
+    def test_layout_is_immutable(self):
+        layout = self.sf.compile_layout()
+        with self.assertRaises(AttributeError):
+            layout._values = ()
+        with self.assertRaises(AttributeError):
+            del layout._values
+        with self.assertRaises(ValueError):
+            layout._style_ids[0, 0] = 1
+
+    def test_write(self):
+        expected_output = BytesIO()
+        self.get_sf().to_excel(StyleFrame.ExcelWriter(expected_output), **self.to_excel_kwargs).close()
+        expected_sheet = load_workbook(expected_output)['Sheet1']
+
+        layout = self.sf.compile_layout(**self.to_excel_kwargs)
+        writers_kwargs = {'openpyxl': {}, 'write-only': {'engine_kwargs': {'write_only': True}},
+                          'styleframe': {'engine': 'styleframe'}}
+        for writer_name, writer_kwargs in writers_kwargs.items():
+            with self.subTest(writer=writer_name):
+                output = BytesIO()
+                excel_writer = StyleFrame.ExcelWriter(output, **writer_kwargs)
+                # the same layout is written to several sheets
+                layout.write(excel_writer, sheet_name='Sheet1')
+                layout.write(excel_writer, sheet_name='Sheet2')
+                excel_writer.close()
+                workbook = load_workbook(output)
+                self.assert_sheets_equal(workbook['Sheet1'], expected_sheet)
+                self.assert_sheets_equal(workbook['Sheet2'], expected_sheet)
+
+    @unittest.skipIf(xlsxwriter is None, 'xlsxwriter is not installed')
+    def test_write_xlsxwriter(self):
+        layout = self.sf.compile_layout(**self.to_excel_kwargs)
+        output, expected_output = BytesIO(), BytesIO()
+        excel_writer = StyleFrame.ExcelWriter(output, engine='xlsxwriter')
+        layout.write(excel_writer, sheet_name='Sheet1')
+        layout.write(excel_writer, sheet_name='Sheet2')
+        excel_writer.close()
+        self.get_sf().to_excel(StyleFrame.ExcelWriter(expected_output, engine='xlsxwriter'),
+                               **self.to_excel_kwargs).close()
+        workbook, expected_workbook = load_workbook(output), load_workbook(expected_output)
+        for sheet_name in ('Sheet1', 'Sheet2'):
+            self.assert_sheets_equal(workbook[sheet_name], expected_workbook['Sheet1'])
+
+    def test_write_existing_sheet(self):
+        layout = self.sf.compile_layout()
+        excel_writer = StyleFrame.ExcelWriter(BytesIO())
+        layout.write(excel_writer)
+        with self.assertRaises(ValueError):
+            layout.write(excel_writer)
+
+    def test_render(self):
+        df = pd.DataFrame({'a': [3, np.nan, 4.5], 'b': ['z', '=HYPERLINK("http://b.com", "b")', 'w'],
+                           'c': [pd.Timestamp('2021-01-01'), dt.date(2021, 2, 2), pd.NaT]})
+        expected_output = BytesIO()
+        self.get_sf(df).to_excel(StyleFrame.ExcelWriter(expected_output), **dict(self.to_excel_kwargs,
+                                                                                  best_fit=None)).close()
+        expected_sheet = load_workbook(expected_output)['Sheet1']
+
+        layout = self.sf.compile_layout(**dict(self.to_excel_kwargs, best_fit=None))
+        for engine in ('openpyxl', 'styleframe'):
+            with self.subTest(engine=engine):
+                output = BytesIO()
+                excel_writer = StyleFrame.ExcelWriter(output, engine=engine)
+                layout.render(df, excel_writer, sheet_name='Sheet1')
+                layout.write(excel_writer, sheet_name='Sheet2')
+                excel_writer.close()
+                workbook = load_workbook(output)
+                self.assert_sheets_equal(workbook['Sheet1'], expected_sheet)
+                # rendering does not change the layout
+                self.assertEqual(workbook['Sheet2']['B2'].value, 1)
+
+    def test_render_more_rows(self):
+        sf = StyleFrame({'a': [1, 2]})
+        sf.style_alternate_rows([Styler(bg_color=utils.colors.yellow), Styler(bg_color=utils.colors.blue)])
+        sf.add_color_scale_conditional_formatting(start_type=utils.conditional_formatting_types.min,
+                                                  start_value=None, start_color=utils.colors.red,
+                                                  end_type=utils.conditional_formatting_types.max,
+                                                  end_value=None, end_color=utils.colors.green)
+        output = BytesIO()
+        sf.compile_layout().render(pd.DataFrame({'a': range(5)}), StyleFrame.ExcelWriter(output)).close()
+        sheet = load_workbook(output)['Sheet1']
+
+        self.assertEqual([sheet.cell(row=row_index, column=1).value for row_index in range(2, 7)], list(range(5)))
+        self.assertEqual([sheet.cell(row=row_index, column=1).fill.fgColor.rgb for row_index in range(2, 7)],
+                         [utils.colors.yellow, utils.colors.blue] * 2 + [utils.colors.yellow])
+        self.assertEqual([str(cf.sqref) for cf in sheet.conditional_formatting], ['A1:A6'])
+
+    def test_render_more_rows_odd_number_of_rows(self):
+        sf = StyleFrame({'a': [1, 2, 3]})
+        sf.style_alternate_rows([Styler(bg_color=utils.colors.yellow), Styler(bg_color=utils.colors.blue)])
+        output = BytesIO()
+        sf.compile_layout().render(pd.DataFrame({'a': range(6)}), StyleFrame.ExcelWriter(output)).close()
+        sheet = load_workbook(output)['Sheet1']
+
+        self.assertEqual([sheet.cell(row=row_index, column=1).fill.fgColor.rgb for row_index in range(2, 8)],
+                         [utils.colors.yellow, utils.colors.blue] * 3)
+
+    def test_render_more_rows_not_repeating(self):
+        sf = StyleFrame({'a': [1, 2, 3]})
+        sf.style_alternate_rows([Styler(bg_color=utils.colors.yellow), Styler(bg_color=utils.colors.blue)])
+        sf.apply_style_by_indexes(sf.index[2], Styler(bold=True))
+        layout = sf.compile_layout()
+        with self.assertRaises(ValueError):
+            layout.render(pd.DataFrame({'a': range(4)}), StyleFrame.ExcelWriter(BytesIO()))
+        # a DataFrame that is not longer than the layout takes the styles of the layout's rows as they are
+        output = BytesIO()
+        layout.render(pd.DataFrame({'a': range(3)}), StyleFrame.ExcelWriter(output)).close()
+        self.assertTrue(load_workbook(output)['Sheet1']['A4'].font.b)
+
+    def test_render_invalid_df(self):
+        layout = self.sf.compile_layout()
+        with self.assertRaises(ValueError):
+            layout.render(pd.DataFrame({'a': [1], 'b': [2]}), StyleFrame.ExcelWriter(BytesIO()))
+        with self.assertRaises(ValueError):
+            StyleFrame({'a': []}).compile_layout().render(pd.DataFrame({'a': [1]}), StyleFrame.ExcelWriter(BytesIO()))
@@ -0,0 +1,61 @@
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from styleframe import StyleFrame, Styler, utils
+from styleframe.style_cache import StyleCache
+
+
+class StyleCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.style_cache = StyleCache(maxsize=2)
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            StyleCache(maxsize=0)
+
+    def test_lru_eviction(self):
+        self.style_cache['a'] = 1
+        self.style_cache['b'] = 2
+        self.assertEqual(self.style_cache['a'], 1)
+        self.style_cache['c'] = 3
+        self.assertEqual(len(self.style_cache), 2)
+        self.assertIn('a', self.style_cache)
+        self.assertNotIn('b', self.style_cache)
+        with self.assertRaises(KeyError):
+            self.style_cache['b']
+
+    def test_info(self):
+        self.style_cache['a'] = 1
+        self.style_cache.get('a')
+        self.style_cache.get('b')
+        self.assertEqual(self.style_cache.info(), (1, 1, 2, 1))
+        self.style_cache.clear()
+        self.assertEqual(self.style_cache.info(), (0, 0, 2, 0))
+
+    def test_for_workbook(self):
+        ew = StyleFrame.ExcelWriter(BytesIO())
+        self.assertIs(StyleCache.for_workbook(ew.book), StyleCache.for_workbook(ew.book))
+        self.assertIsNot(StyleCache.for_workbook(ew.book), StyleCache.for_workbook(StyleFrame.ExcelWriter(BytesIO()).book))
+
+        sf = StyleFrame({'a': [1, 2, 3], 'b': [4, 5, 6]})
+        sf.apply_column_style('a', Styler(italic=True))
+        sf.to_excel(ew)
+        # the headers style, the default style and the style of column 'a'
+        self.assertEqual(len(StyleCache.for_workbook(ew.book)), 3)
+        self.assertEqual(StyleCache.for_workbook(ew.book).misses, 3)
+
+    def test_concurrent_to_excel(self):
+        styles = [Styler(bg_color=color) for color in (utils.colors.red, utils.colors.green, utils.colors.blue)]
+
+        def export(style):
+            sf = StyleFrame({'a': list(range(50))})
+            sf.apply_column_style('a', style)
+            return sf.to_excel(StyleFrame.ExcelWriter(BytesIO())).sheets['Sheet1']
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            sheets = list(executor.map(export, styles * 4))
+        for sheet, style in zip(sheets, styles * 4):
+            self.assertTrue(all(sheet.cell(row=row, column=1).fill.fgColor.rgb == style.bg_color
+                                for row in range(2, 52)))
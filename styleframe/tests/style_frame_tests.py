@@ -1,12 +1,29 @@
+import datetime as dt
 import unittest
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
 import os
-
+import pickle
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from unittest import mock
+
+from copy import copy
 from functools import partial
+from itertools import chain
+from openpyxl import load_workbook, Workbook
+from openpyxl.styles import Color as OpenPyColor, Font, PatternFill
 from styleframe import Container, StyleFrame, Styler, utils
 from styleframe.tests import TEST_FILENAME
 
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 
 class StyleFrameTest(unittest.TestCase):
     @classmethod
@@ -76,6 +93,165 @@ class StyleFrameTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             StyleFrame({}, styler_obj=1)
 
+    def test_pickle(self):
+        self.apply_style_by_indexes(self.sf.index[0])
+        self.apply_headers_style()
+        self.sf.set_column_width('a', 20)
+        self.sf.data_df.index.name = 'index name'
+        # the headers get their own equal mutable styles
+        for col in self.sf.columns:
+            col.style.italic = True
+        unpickled_sf = pickle.loads(pickle.dumps(self.sf))
+        # cells with equal styles share the same unpickled style
+        self.assertIs(unpickled_sf.loc[0, 'a']._style, unpickled_sf.loc[0, 'b']._style)
+        self.assertEqual(list(unpickled_sf.columns), list(self.sf.columns))
+        self.assertEqual(unpickled_sf.data_df.index.name, 'index name')
+        self.assertEqual(unpickled_sf._columns_width, self.sf._columns_width)
+        self.assertTrue(unpickled_sf._has_custom_headers_style)
+        self.assertEqual([col.style for col in unpickled_sf.columns], [col.style for col in self.sf.columns])
+        self.assertEqual([index.style for index in unpickled_sf.index], [index.style for index in self.sf.index])
+        for col in self.sf.columns:
+            self.assertEqual(list(unpickled_sf[col.value]), list(self.sf[col.value]))
+            self.assertEqual([container.style for container in unpickled_sf[col.value]],
+                             [container.style for container in self.sf[col.value]])
+        # the headers do not share a mutable style
+        unpickled_sf.columns[0].style.bold = False
+        self.assertTrue(unpickled_sf.columns[1].style.bold)
+
+    def test_init_styleframe_copy_on_write(self):
+        self.sf.set_column_width('a', 20)
+        sf_copy = StyleFrame(self.sf)
+        self.assertIs(sf_copy.data_df.at[0, 'a'], self.sf.data_df.at[0, 'a'])
+        self.assertIsNot(sf_copy.columns[0], self.sf.columns[0])
+        self.assertIsNot(sf_copy.index[0], self.sf.index[0])
+
+        sf_copy.apply_style_by_indexes(sf_copy[sf_copy['a'] == 'col_a_row_1'], styler_obj=self.styler_obj_1)
+        sf_copy.apply_headers_style(self.styler_obj_2)
+        sf_copy.set_column_width('a', 30)
+        self.assertEqual(sf_copy.at[0, 'a'].style, self.styler_obj_1)
+        self.assertEqual(sf_copy.columns[0].style, self.styler_obj_2)
+        self.assertEqual(self.sf.at[0, 'a'].style, self.default_styler_obj)
+        self.assertEqual(self.sf.index[0].style, self.default_styler_obj)
+        self.assertEqual(self.sf.columns[0].style, self.default_styler_obj)
+        self.assertEqual(self.sf._columns_width['a'], 20)
+        # the styles that were not modified are still shared
+        self.assertIs(sf_copy.at[1, 'b']._style, self.sf.at[1, 'b']._style)
+
+        # modifying the source does not modify the copy
+        sf_copy = StyleFrame(self.sf)
+        self.sf.apply_column_style('b', self.styler_obj_2)
+        self.assertEqual(sf_copy.at[1, 'b'].style, self.default_styler_obj)
+
+    def test_init_styleframe_copy_is_isolated(self):
+        self.sf.data_df.index.name = 'index name'
+        modifications = {'column style': lambda sf: setattr(sf['a'], 'style', self.styler_obj_1),
+                         'column attribute style': lambda sf: setattr(sf.a, 'style', self.styler_obj_1),
+                         'loc value': lambda sf: setattr(sf.loc[0, 'a'], 'value', 'new value'),
+                         'at style': lambda sf: setattr(sf.at[0, 'a'].style, 'bold', True),
+                         'iloc style': lambda sf: setattr(sf.iloc[0, 0], 'style', self.styler_obj_1),
+                         'sub frame value': lambda sf: setattr(sf[['a']].loc[0, 'a'], 'value', 'new value'),
+                         'column value': lambda sf: setattr(sf.columns[0], 'value', 'new column'),
+                         'column header style': lambda sf: setattr(sf.columns[0].style, 'bold', True),
+                         'index value': lambda sf: setattr(sf.index[0], 'value', 'new index')}
+        for modification_name, modify in modifications.items():
+            for modified in ('copy', 'source'):
+                with self.subTest(modification=modification_name, modified=modified):
+                    source = StyleFrame(self.sf)
+                    sf_copy = StyleFrame(source)
+                    modify(sf_copy if modified == 'copy' else source)
+                    unmodified = source if modified == 'copy' else sf_copy
+                    self.assertEqual([col.value for col in unmodified.columns], ['a', 'b'])
+                    self.assertEqual([index.value for index in unmodified.index], [0, 1, 2])
+                    self.assertEqual(unmodified.data_df.index.name, 'index name')
+                    self.assertEqual(unmodified.data_df.at[0, 'a'].value, 'col_a_row_1')
+                    self.assertTrue(all(container.style == self.default_styler_obj
+                                        for container in unmodified.data_df.values.ravel()))
+                    self.assertTrue(all(container.style == self.default_styler_obj
+                                        for container in chain(unmodified.columns, unmodified.index)))
+
+    def test_init_shares_styles(self):
+        self.sf = StyleFrame({'a': [1, 2, 3], 'b': [1, 2, 3]}, styler_obj=self.styler_obj_1)
+        self.assertEqual(len({id(cell._style) for _, row in self.sf.data_df.iterrows() for cell in row}), 1)
+        self.assertIsNot(self.sf.at[self.sf.index[0], 'a']._style, self.styler_obj_1)
+        self.assertIs(StyleFrame({'c': [1]}, styler_obj=self.styler_obj_1).at[0, 'c']._style,
+                      self.sf.at[self.sf.index[0], 'a']._style)
+
+        self.sf = StyleFrame({'a': [1, 2, 3], 'b': [pd.Timestamp('2021-01-01')] * 3})
+        self.assertEqual(len({id(cell._style) for cell in self.sf['a']}), 1)
+        self.assertEqual(self.sf['b'][0].style.number_format, utils.number_formats.default_date_time_format)
+
+    def test_modifying_cell_style_in_place(self):
+        self.sf.loc[0, 'a'].style.bold = True
+        self.assertTrue(self.sf.loc[0, 'a'].style.bold)
+        self.assertFalse(self.sf.loc[1, 'a'].style.bold)
+        self.assertFalse(self.sf.loc[0, 'b'].style.bold)
+        self.assertFalse(self.default_styler_obj.bold)
+
+        self.sf.to_excel(self.ew)
+        sheet = self.ew.sheets['Sheet1']
+        self.assertTrue(sheet.cell(row=2, column=1).font.b)
+        self.assertFalse(sheet.cell(row=3, column=1).font.b)
+
+    def test_to_style_matrix(self):
+        self.sf.apply_style_by_indexes(self.sf.index[1], styler_obj=self.styler_obj_1)
+        values, style_ids, style_table = self.sf._to_style_matrix()
+
+        assert_frame_equal(values, pd.DataFrame({'a': ['col_a_row_1', 'col_a_row_2', 'col_a_row_3'],
+                                                 'b': ['col_b_row_1', 'col_b_row_2', 'col_b_row_3']}),
+                           check_index_type=False)
+        self.assertEqual(style_ids.shape, (3, 2))
+        self.assertEqual(len(style_table), 2)
+        self.assertEqual(style_table[style_ids[0, 0]], self.default_styler_obj)
+        self.assertEqual(style_table[style_ids[1, 1]], self.styler_obj_1)
+
+    def test_from_style_matrix(self):
+        values, style_ids, style_table = StyleFrame({'a': [1, 2], 'b': [3.5, 4.5]},
+                                                    styler_obj=self.styler_obj_2)._to_style_matrix()
+        style_ids[1] = style_table.add(self.styler_obj_1)
+        sf = StyleFrame._from_style_matrix(values, style_ids, style_table)
+
+        self.assertListEqual([col.value for col in sf.columns], ['a', 'b'])
+        self.assertListEqual(list(sf['b']), [3.5, 4.5])
+        self.assertEqual(sf.at[sf.index[0], 'a'].style, self.styler_obj_2)
+        self.assertIs(sf.at[sf.index[1], 'a']._style, sf.at[sf.index[1], 'b']._style)
+        # the cells do not share a mutable style
+        sf.at[sf.index[1], 'a'].style.bold = False
+        self.assertTrue(sf.at[sf.index[1], 'b'].style.bold)
+        self.assertTrue(self.styler_obj_1.bold)
+
+        with self.assertRaises(ValueError):
+            StyleFrame._from_style_matrix(values, style_ids[:1], style_table)
+
+    def test_to_excel_does_not_modify_shared_styles(self):
+        self.sf = StyleFrame({'a': [pd.Timestamp('2021-01-01'), 1]}, styler_obj=self.styler_obj_2)
+        self.sf.to_excel(self.ew)
+        self.assertEqual(self.sf['a'][1].style.number_format, utils.number_formats.general)
+        self.assertEqual(self.ew.sheets['Sheet1'].cell(row=2, column=1).number_format,
+                         self.styler_obj_2.date_time_format)
+        self.assertEqual(self.ew.sheets['Sheet1'].cell(row=3, column=1).number_format, utils.number_formats.general)
+
+    def test_to_excel_number_formats_by_column_type(self):
+        self.sf = StyleFrame({'date_time': [pd.Timestamp('2021-01-01'), pd.Timestamp('2021-01-02')],
+                              'date': [dt.date(2021, 1, 1), dt.date(2021, 1, 2)],
+                              'time': [dt.time(10, 30), dt.time(11)],
+                              'mixed': [dt.time(10, 30), 'text'],
+                              'mixed_dates': pd.Series([dt.date(2021, 1, 1), dt.datetime(2021, 1, 2, 13, 30)],
+                                                       dtype=object)},
+                             styler_obj=self.styler_obj_2)
+        self.sf.apply_column_style('mixed', self.styler_obj_1, use_default_formats=True)
+        self.assertEqual(self.sf.at[0, 'mixed'].style.number_format, utils.number_formats.time_24_hours)
+        self.assertEqual(self.sf.at[1, 'mixed'].style.number_format, self.styler_obj_1.number_format)
+
+        for streaming in (False, True):
+            self.sf.to_excel(TEST_FILENAME, streaming=streaming).close()
+            sheet = load_workbook(TEST_FILENAME)['Sheet1']
+            self.assertListEqual([sheet.cell(row=2, column=col).number_format for col in range(1, 5)],
+                                 [self.styler_obj_2.date_time_format, self.styler_obj_2.date_format,
+                                  self.styler_obj_2.time_format, self.styler_obj_1.time_format])
+            self.assertEqual(sheet.cell(row=3, column=4).number_format, self.styler_obj_1.number_format)
+            self.assertListEqual([sheet.cell(row=row, column=5).number_format for row in (2, 3)],
+                                 [self.styler_obj_2.date_format, self.styler_obj_2.date_time_format])
+
     def test_len(self):
         self.assertEqual(len(self.sf), len(self.sf.data_df))
         self.assertEqual(len(self.sf), 3)
@@ -103,6 +279,102 @@ class StyleFrameTest(unittest.TestCase):
         with self.assertRaises(AttributeError):
             self.sf.non_exisiting_method()
 
+    def test_to_excel_streaming(self):
+        self.sf.apply_column_style(cols_to_style='a', styler_obj=self.styler_obj_1)
+        self.sf.set_row_height(rows=2, height=30)
+        self.sf.set_column_width(columns='b', width=40)
+        self.sf.to_excel(TEST_FILENAME, streaming=True, index=True, row_to_add_filters=0,
+                         columns_and_rows_to_freeze='B2').close()
+
+        sheet = load_workbook(TEST_FILENAME)['Sheet1']
+        self.assertEqual(sheet.max_row, len(self.sf) + 1)
+        self.assertEqual(sheet.max_column, len(self.sf.columns) + 1)
+        self.assertEqual(sheet.cell(row=2, column=2).value, 'col_a_row_1')
+        self.assertEqual(sheet.cell(row=3, column=1).value, 1)
+        self.assertEqual(sheet.cell(row=2, column=2).font.name, self.styler_obj_1.font)
+        self.assertEqual(sheet.cell(row=2, column=2).comment.text, self.styler_obj_1.comment_text)
+        self.assertTrue(sheet.cell(row=1, column=2).font.b)
+        self.assertEqual(sheet.row_dimensions[2].height, 30)
+        self.assertEqual(sheet.column_dimensions['C'].width, 40)
+        self.assertEqual(sheet.auto_filter.ref, 'B1:C1')
+        self.assertEqual(sheet.freeze_panes, 'B2')
+
+    def test_to_excel_streaming_invalid_args(self):
+        with self.assertRaises(ValueError):
+            self.sf.to_excel(self.ew, streaming=True)
+        with self.assertRaises(TypeError):
+            self.sf.to_excel(TEST_FILENAME, streaming=True, float_format='%.2f')
+
+    def test_to_excel_values_are_identical_across_write_paths(self):
+        df = pd.DataFrame({'a': [dt.time(12), np.nan, dt.timedelta(hours=6), np.int64(3), np.float32(1.5), np.inf,
+                                 None, np.bool_(True), pd.Timestamp('2020-01-01'), dt.date(2020, 1, 2), 'x']})
+        writers_kwargs = {'streaming': ({'engine_kwargs': {'write_only': True}}, {'streaming': True}),
+                          'styleframe': ({'engine': 'styleframe'}, {})}
+        if xlsxwriter is not None:
+            writers_kwargs['xlsxwriter'] = ({'engine': 'xlsxwriter'}, {})
+        with tempfile.TemporaryDirectory() as output_dir:
+            expected_path = os.path.join(output_dir, 'expected.xlsx')
+            StyleFrame(df).to_excel(expected_path, index=True).close()
+            expected_values = [[cell.value for cell in row] for row in load_workbook(expected_path).active.iter_rows()]
+            self.assertEqual(expected_values[1], [0, '12:00:00'])
+            self.assertEqual(expected_values[2], [1, None])
+            for writer_name, (writer_kwargs, to_excel_kwargs) in writers_kwargs.items():
+                with self.subTest(writer=writer_name):
+                    output_path = os.path.join(output_dir, '{}.xlsx'.format(writer_name))
+                    StyleFrame(df).to_excel(StyleFrame.ExcelWriter(output_path, **writer_kwargs), index=True,
+                                            **to_excel_kwargs).close()
+                    self.assertEqual([[cell.value for cell in row]
+                                      for row in load_workbook(output_path).active.iter_rows()], expected_values)
+            with self.subTest(writer='write_to_template'):
+                output_path = os.path.join(output_dir, 'template.xlsx')
+                StyleFrame.write_to_template(expected_path, df, output_path, index=True)
+                self.assertEqual([[cell.value for cell in row]
+                                  for row in load_workbook(output_path).active.iter_rows()], expected_values)
+
+    def test_to_excel_registers_styles_once_per_workbook(self):
+        self.apply_column_style(cols_to_style='a')
+        self.sf.to_excel(self.ew, sheet_name='first')
+        # registering the same style with another workbook, after styles that the first workbook does not have
+        other_sf = StyleFrame({'a': [1], 'b': [2], 'c': [3]})
+        other_sf.apply_column_style('a', Styler(font='Arial Black', bg_color=utils.colors.green))
+        other_sf.apply_column_style('b', Styler(font='Courier New', border_type=utils.borders.double))
+        other_sf.apply_column_style('c', self.styler_obj_1)
+        other_sf.to_excel(StyleFrame.ExcelWriter(BytesIO()))
+        self.sf.to_excel(self.ew, sheet_name='second')
+
+        self.assertEqual(self.ew.book.named_styles.count(str(hash(self.styler_obj_1))), 1)
+        for sheet_name in ('first', 'second'):
+            sheet = self.ew.sheets[sheet_name]
+            self.assertTrue(all(sheet.cell(row=row, column=1).font.name == self.styler_obj_1.font
+                                and sheet.cell(row=row, column=2).font.name != self.styler_obj_1.font
+                                for row in range(2, len(self.sf) + 2)))
+
+    def test_write_chunks(self):
+        chunks = (pd.DataFrame({'a': [i, i + 1], 'b': ['x', 'y']}) for i in range(0, 6, 2))
+        StyleFrame.write_chunks(TEST_FILENAME, chunks, column_styles={'a': self.styler_obj_1},
+                                header_style=self.styler_obj_2, columns_width={'b': 30},
+                                style_chunk=lambda sf: sf.apply_style_by_indexes(sf[sf['a'] == 3],
+                                                                                 styler_obj=self.styler_obj_2,
+                                                                                 cols_to_style='b', height=25)).close()
+
+        sheet = load_workbook(TEST_FILENAME)['Sheet1']
+        self.assertEqual(sheet.max_row, 7)
+        self.assertEqual([sheet.cell(row=row, column=1).value for row in range(2, 8)], list(range(6)))
+        self.assertEqual(sheet.cell(row=1, column=1).fill.fgColor.rgb, utils.colors.yellow)
+        self.assertTrue(all(sheet.cell(row=row, column=1).font.name == self.styler_obj_1.font for row in range(2, 8)))
+        self.assertEqual(sheet.cell(row=5, column=2).fill.fgColor.rgb, utils.colors.yellow)
+        self.assertNotEqual(sheet.cell(row=4, column=2).fill.fgColor.rgb, utils.colors.yellow)
+        self.assertEqual(sheet.row_dimensions[5].height, 25)
+        self.assertEqual(sheet.column_dimensions['B'].width, 30)
+
+    def test_write_chunks_invalid_args(self):
+        with self.assertRaises(ValueError):
+            StyleFrame.write_chunks(TEST_FILENAME, [])
+        with self.assertRaises(TypeError):
+            StyleFrame.write_chunks(TEST_FILENAME, [pd.DataFrame({'a': [1]})], best_fit='a')
+        with self.assertRaises(ValueError):
+            StyleFrame.write_chunks(TEST_FILENAME, [pd.DataFrame({'a': [1]}), pd.DataFrame({'b': [1]})])
+
     def test_apply_column_style(self):
         # testing some edge cases
         with self.assertRaises(TypeError):
@@ -200,6 +472,26 @@ class StyleFrameTest(unittest.TestCase):
         self.assertTrue(all(sheet.cell(row=2, column=col)._style == self.openpy_style_obj_1
                             for col in range(1, len(self.sf.columns))))
 
+    def test_apply_style_by_indexes_with_mask(self):
+        self.apply_style_by_indexes(self.sf['a'] != 'col_a_row_2', cols_to_style='b', complement_style=self.styler_obj_2,
+                                    complement_height=20)
+
+        self.assertListEqual([self.sf.at[index, 'b'].style for index in self.sf.index],
+                             [self.styler_obj_1, self.styler_obj_2, self.styler_obj_1])
+        self.assertTrue(all(self.sf.at[index, 'a'].style == self.default_styler_obj for index in self.sf.index))
+        self.assertDictEqual(dict(self.sf._rows_height), {2: 10, 3: 20, 4: 10})
+
+        with self.assertRaises(ValueError):
+            self.apply_style_by_indexes(np.array([True, False]))
+        with self.assertRaises(TypeError):
+            self.apply_style_by_indexes(np.array([0.5]))
+
+    def test_apply_style_by_indexes_with_positions(self):
+        self.apply_style_by_indexes(np.array([0, 2]), cols_to_style='a')
+
+        self.assertListEqual([self.sf.at[index, 'a'].style for index in self.sf.index],
+                             [self.styler_obj_1, self.default_styler_obj, self.styler_obj_1])
+
     def test_apply_style_by_indexes_all_cols_with_multiple_indexes(self):
         self.apply_style_by_indexes([1, 2])
 
@@ -338,6 +630,17 @@ class StyleFrameTest(unittest.TestCase):
                             for row_in_excel, row_in_self in zip(rows_in_excel, rows_in_self)
                             for excel_cell, self_cell in zip(row_in_excel[1:], row_in_self[1:])))
 
+    def test_read_excel_with_style_loads_workbook_once(self):
+        self.export_and_get_default_sheet(save=True)
+        with mock.patch('styleframe.style_frame.load_workbook', wraps=load_workbook) as load_workbook_mock:
+            sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True)
+        load_workbook_mock.assert_called_once()
+        self.assertTrue(all(list(self.sf[col]) == list(sf_from_excel[col]) for col in self.sf.columns))
+        self.assertTrue(all(excel_cell.style == self_cell.style
+                            for row_in_excel, row_in_self in zip(sf_from_excel.data_df.itertuples(),
+                                                                 self.sf.data_df.itertuples())
+                            for excel_cell, self_cell in zip(row_in_excel[1:], row_in_self[1:])))
+
     def test_read_excel_with_style_openpyxl_objects(self):
         self.export_and_get_default_sheet(save=True)
         sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True, use_openpyxl_styles=True)
@@ -368,6 +671,33 @@ class StyleFrameTest(unittest.TestCase):
 
         sf_from_excel.to_excel(TEST_FILENAME).save()
 
+    def test_to_excel_with_openpyxl_styles(self):
+        wb = Workbook()
+        sheet = wb.active
+        sheet.append(['a', 'b'])
+        sheet.append([0.5, 'text'])
+        sheet['A2'].number_format = '0.000%'
+        sheet['A2'].font = Font(color=OpenPyColor(theme=4, tint=0.4), bold=True)
+        sheet['B2'].fill = PatternFill(patternType='solid', fgColor=OpenPyColor(theme=5))
+        wb.save(TEST_FILENAME)
+
+        for read_only in (False, True):
+            with self.subTest(read_only=read_only):
+                sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True, use_openpyxl_styles=True,
+                                                      read_only=read_only)
+                output = BytesIO()
+                with mock.patch.object(Styler, 'from_openpyxl_style') as convert_mock:
+                    sf_from_excel.to_excel(StyleFrame.ExcelWriter(output)).close()
+                convert_mock.assert_not_called()
+
+                output_sheet = load_workbook(output).active
+                self.assertEqual(output_sheet['A2'].value, 0.5)
+                self.assertEqual(output_sheet['A2'].number_format, '0.000%')
+                # theme colors are kept as they are
+                self.assertEqual(copy(output_sheet['A2'].font), copy(sheet['A2'].font))
+                self.assertEqual(copy(output_sheet['B2'].fill), copy(sheet['B2'].fill))
+                self.assertEqual(output_sheet['B2'].fill.fgColor.theme, 5)
+
     def test_read_excel_with_style_styler_objects(self):
         self.export_and_get_default_sheet(save=True)
         sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True)
@@ -382,6 +712,126 @@ class StyleFrameTest(unittest.TestCase):
                         for row_in_excel, row_in_self in zip(rows_in_excel, rows_in_self)
                         for excel_cell, self_cell in zip(row_in_excel[1:], row_in_self[1:])))
 
+    def test_read_excel_with_style_converts_each_style_once(self):
+        self.apply_style_by_indexes(self.sf.index[0])
+        self.export_and_get_default_sheet(save=True)
+        with mock.patch.object(Styler, 'from_openpyxl_style', wraps=Styler.from_openpyxl_style) as convert_mock:
+            sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True, read_comments=True)
+        # the headers style, the style of the first row and the style of the rest of the rows
+        self.assertEqual(convert_mock.call_count, 3)
+        self.assertIs(sf_from_excel.loc[1, 'a']._style, sf_from_excel.loc[2, 'b']._style)
+        self.assertEqual(sf_from_excel.loc[0, 'a'].style, self.sf.loc[0, 'a'].style)
+        self.assertEqual(sf_from_excel.loc[1, 'a'].style, self.sf.loc[1, 'a'].style)
+
+    def test_read_excel_with_style_read_only(self):
+        self.apply_style_by_indexes(self.sf.index[0])
+        self.sf.apply_column_style('b', Styler(italic=True))
+        self.sf.to_excel(excel_writer=self.ew, index=True)
+        self.ew.save()
+        for kwargs in ({}, {'index_col': 0}, {'header': None}):
+            with self.subTest(**kwargs):
+                sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True, **kwargs)
+                sf_from_excel_read_only = StyleFrame.read_excel(TEST_FILENAME, read_style=True, read_only=True,
+                                                                **kwargs)
+                self.assertEqual([container.style for container in sf_from_excel.columns],
+                                 [container.style for container in sf_from_excel_read_only.columns])
+                self.assertEqual([container.style for container in sf_from_excel.index],
+                                 [container.style for container in sf_from_excel_read_only.index])
+                self.assertEqual([container.style for container in sf_from_excel.data_df.values.ravel()],
+                                 [container.style for container in sf_from_excel_read_only.data_df.values.ravel()])
+
+        sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True, read_only=True, index_col=0)
+        self.assertEqual(sf_from_excel.loc[0, 'a'].style.bg_color, self.styler_obj_1.bg_color)
+        self.assertTrue(sf_from_excel.loc[1, 'b'].style.italic)
+        self.assertFalse(sf_from_excel.loc[1, 'a'].style.italic)
+
+    def test_read_excel_read_only_with_comments(self):
+        self.export_and_get_default_sheet(save=True)
+        with self.assertRaises(ValueError):
+            StyleFrame.read_excel(TEST_FILENAME, read_style=True, read_only=True, read_comments=True)
+
+    def test_read_excel_multiple_sheets(self):
+        self.apply_style_by_indexes(self.sf.index[0])
+        self.sf.to_excel(excel_writer=self.ew, sheet_name='Sheet1')
+        other_sf = StyleFrame({'c': [1, 2]}, styler_obj=Styler(italic=True))
+        other_sf.to_excel(excel_writer=self.ew, sheet_name='Sheet2')
+        self.ew.save()
+
+        for read_only in (False, True):
+            with self.subTest(read_only=read_only):
+                with mock.patch('styleframe.style_frame.load_workbook', wraps=load_workbook) as load_workbook_mock:
+                    sfs = StyleFrame.read_excel(TEST_FILENAME, sheet_name=None, read_style=True, read_only=read_only)
+                load_workbook_mock.assert_called_once()
+                self.assertEqual(list(sfs), ['Sheet1', 'Sheet2'])
+                self.assertEqual(sfs['Sheet1'].loc[0, 'a'].style.bg_color, self.styler_obj_1.bg_color)
+                self.assertTrue(sfs['Sheet2'].loc[1, 'c'].style.italic)
+                # the headers of both sheets have the same style, which is converted once and shared
+                self.assertIs(sfs['Sheet1'].columns[0]._style, sfs['Sheet2'].columns[0]._style)
+
+        sfs = StyleFrame.read_excel(TEST_FILENAME, sheet_name=[1, 'Sheet1'], read_style=True)
+        self.assertEqual(list(sfs), [1, 'Sheet1'])
+        self.assertEqual(list(sfs[1].columns), ['c'])
+        self.assertTrue(sfs[1].loc[0, 'c'].style.italic)
+        self.assertTrue(all(list(self.sf[col]) == list(sfs['Sheet1'][col]) for col in self.sf.columns))
+
+    def test_read_excel_with_style_range(self):
+        self.sf = StyleFrame({col: [row_index * 10 + col_index for row_index in range(6)]
+                              for col_index, col in enumerate('abcd')})
+        for col_index, col in enumerate(self.sf.columns):
+            self.sf.apply_style_by_indexes(self.sf.index[col_index], Styler(bold=True), cols_to_style=col)
+        self.sf.apply_headers_style(Styler(italic=True))
+        self.export_and_get_default_sheet(save=True)
+
+        for read_only in (False, True):
+            with self.subTest(read_only=read_only):
+                sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True, read_only=read_only,
+                                                      usecols='B,D', skiprows=[1, 2], nrows=3)
+                self.assertEqual(list(sf_from_excel.columns), ['b', 'd'])
+                self.assertEqual(list(sf_from_excel['b']), [21, 31, 41])
+                self.assertTrue(all(col.style.italic for col in sf_from_excel.columns))
+                # only the cell whose row index is the same as its column index is bold
+                self.assertEqual([(container.value, container.style.bold)
+                                  for col in sf_from_excel.columns for container in sf_from_excel[col]],
+                                 [(21, False), (31, False), (41, False), (23, False), (33, True), (43, False)])
+
+    def test_read_excel_with_cache_dir(self):
+        self.apply_style_by_indexes(self.sf.index[0])
+        self.export_and_get_default_sheet(save=True)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            with mock.patch('styleframe.style_frame.load_workbook') as load_workbook_mock:
+                cached_sf = StyleFrame.read_excel(TEST_FILENAME, read_style=True, cache_dir=cache_dir)
+            load_workbook_mock.assert_not_called()
+            self.assertEqual([container.style for container in cached_sf.data_df.values.ravel()],
+                             [container.style for container in sf_from_excel.data_df.values.ravel()])
+            self.assertEqual(cached_sf._rows_height, sf_from_excel._rows_height)
+
+            # other arguments are cached separately
+            sfs = StyleFrame.read_excel(TEST_FILENAME, sheet_name=None, read_style=True, cache_dir=cache_dir)
+            self.assertEqual(list(sfs), ['Sheet1'])
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_read_excel_many(self):
+        self.apply_style_by_indexes(self.sf.index[0])
+        self.export_and_get_default_sheet(save=True)
+        missing_file = os.path.join(os.path.dirname(TEST_FILENAME), 'missing.xlsx')
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                results = StyleFrame.read_excel_many([TEST_FILENAME, missing_file], workers=workers, read_style=True)
+                self.assertEqual(list(results), [TEST_FILENAME, missing_file])
+                self.assertIsInstance(results[missing_file], FileNotFoundError)
+                sf_from_excel = results[TEST_FILENAME]
+                self.assertTrue(all(list(self.sf[col]) == list(sf_from_excel[col]) for col in self.sf.columns))
+                self.assertEqual(sf_from_excel.loc[0, 'a'].style.bg_color, self.styler_obj_1.bg_color)
+                self.assertEqual(sf_from_excel.loc[1, 'a'].style, self.sf.loc[1, 'a'].style)
+
+    def test_read_excel_many_invalid_args(self):
+        with self.assertRaises(ValueError):
+            StyleFrame.read_excel_many([TEST_FILENAME], workers=0)
+        with self.assertRaises(ValueError):
+            StyleFrame.read_excel_many([TEST_FILENAME], read_style=True, use_openpyxl_styles=True)
+
     def test_read_excel_with_style_comments_openpyxl_objects(self):
         self.export_and_get_default_sheet(save=True)
         sf_from_excel = StyleFrame.read_excel(TEST_FILENAME, read_style=True, read_comments=True,
@@ -590,6 +1040,215 @@ class StyleFrameTest(unittest.TestCase):
                          )
         self.assertEqual(sf_from_template['A'][0].value, 1)
 
+    def test_write_to_template(self):
+        template_sf = StyleFrame({'a': ['col_a_row_1', 'col_a_row_2'], 'b': ['col_b_row_1', 'col_b_row_2']},
+                                 styler_obj=self.styler_obj_1)
+        template_sf.add_color_scale_conditional_formatting(start_type=utils.conditional_formatting_types.percentile,
+                                                           start_value=0, start_color=utils.colors.red,
+                                                           end_type=utils.conditional_formatting_types.percentile,
+                                                           end_value=100, end_color=utils.colors.green)
+        template_sf.to_excel(self.ew, sheet_name='Template', best_fit='a')
+        StyleFrame({'c': [1]}).to_excel(self.ew, sheet_name='Other')
+        self.ew.save()
+        template_mtime = os.path.getmtime(TEST_FILENAME)
+
+        df = pd.DataFrame({'A': [1, np.nan, 3], 'B': [dt.date(2020, 1, 1), None, 'x']})
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, 'output.xlsx')
+            StyleFrame.write_to_template(TEST_FILENAME, df, output_path, sheet_name='Template')
+            self.assertEqual(os.path.getmtime(TEST_FILENAME), template_mtime)
+
+            template_wb = load_workbook(TEST_FILENAME)
+            output_wb = load_workbook(output_path)
+        self.assertEqual(output_wb.sheetnames, ['Template', 'Other'])
+        template_sheet, sheet = template_wb['Template'], output_wb['Template']
+        self.assertEqual([[cell.value for cell in row] for row in sheet.iter_rows(max_row=4)],
+                         [['A', 'B'], [1, dt.datetime(2020, 1, 1)], [None, None], [3, 'x']])
+        # the template's cells keep their formatting
+        self.assertEqual(sheet['A2'].font.name, template_sheet['A2'].font.name)
+        self.assertEqual(sheet['B3'].fill.fgColor.rgb, template_sheet['B3'].fill.fgColor.rgb)
+        self.assertEqual(sheet['B3'].comment.text, template_sheet['B3'].comment.text)
+        self.assertEqual(sheet.column_dimensions['A'].width, template_sheet.column_dimensions['A'].width)
+        self.assertEqual(len(self.get_cf_rules(sheet)), len(self.get_cf_rules(template_sheet)))
+
+        # the header cell of an unnamed index keeps the template's value
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, 'output.xlsx')
+            StyleFrame.write_to_template(TEST_FILENAME, df, output_path, sheet_name='Template', index=True)
+            sheet = load_workbook(output_path)['Template']
+        self.assertEqual([[cell.value for cell in row] for row in sheet.iter_rows(max_row=2)],
+                         [['a', 'A', 'B'], [0, 1, dt.datetime(2020, 1, 1)]])
+
+    def test_write_workbook(self):
+        def get_sheets():
+            numbers_sf = StyleFrame({'a': [1.5, 2.5], 'b': [dt.date(2020, 1, 1), dt.date(2020, 1, 2)]})
+            numbers_sf.apply_column_style('a', Styler(bg_color=utils.colors.yellow, number_format='0.000'))
+            numbers_sf.apply_style_by_indexes(numbers_sf.index[1], Styler(bold=True, font_color=utils.colors.red))
+            numbers_sf.set_column_width('b', 30)
+            # styler_obj_1 has a comment, so this sheet is written by the parent process
+            comments_sf = StyleFrame({'c': ['x', 'y']}, styler_obj=self.styler_obj_1)
+            return {'Numbers': numbers_sf, 'Comments': comments_sf}
+
+        for sheet_name, sf in get_sheets().items():
+            sf.to_excel(self.ew, sheet_name=sheet_name, columns_and_rows_to_freeze='A2')
+        self.ew.save()
+        expected_wb = load_workbook(TEST_FILENAME)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            for workers in (1, 2):
+                with self.subTest(workers=workers):
+                    output_path = os.path.join(output_dir, 'output_{}.xlsx'.format(workers))
+                    StyleFrame.write_workbook(output_path, get_sheets(), workers=workers,
+                                              columns_and_rows_to_freeze='A2')
+                    wb = load_workbook(output_path)
+                    self.assertEqual(wb.sheetnames, expected_wb.sheetnames)
+                    self.assertEqual([sheet.sheet_view.tabSelected for sheet in wb.worksheets],
+                                     [sheet.sheet_view.tabSelected for sheet in expected_wb.worksheets])
+                    for sheet, expected_sheet in zip(wb.worksheets, expected_wb.worksheets):
+                        self.assertEqual(sheet.freeze_panes, expected_sheet.freeze_panes)
+                        self.assertEqual(sheet.column_dimensions['B'].width,
+                                         expected_sheet.column_dimensions['B'].width)
+                        for row, expected_row in zip(sheet.iter_rows(), expected_sheet.iter_rows()):
+                            for current_cell, expected_cell in zip(row, expected_row):
+                                self.assertEqual(current_cell.value, expected_cell.value)
+                                self.assertEqual(current_cell.number_format, expected_cell.number_format)
+                                for attr in ('font', 'fill', 'border', 'alignment', 'protection'):
+                                    self.assertEqual(copy(getattr(current_cell, attr)),
+                                                     copy(getattr(expected_cell, attr)))
+                    self.assertEqual(wb['Comments']['A2'].comment.text, expected_wb['Comments']['A2'].comment.text)
+
+    def test_write_workbook_invalid_args(self):
+        with self.assertRaises(ValueError):
+            StyleFrame.write_workbook(TEST_FILENAME, {'Sheet1': self.sf}, workers=0)
+        with self.assertRaises(ValueError):
+            StyleFrame.write_workbook(TEST_FILENAME, {})
+        with self.assertRaises(TypeError):
+            StyleFrame.write_workbook(TEST_FILENAME, {'Sheet1': self.sf}, streaming=True)
+
+    def test_to_excel_styleframe_engine(self):
+        def get_sf():
+            sf = StyleFrame({'a': [1, 2.5, np.nan, 1e20], 'b': ['a & <b>', ' c ', '', '=SUM(A1)'],
+                             'c': [dt.date(2020, 1, 1), pd.Timestamp('2020-01-02 03:04'), pd.NaT, None],
+                             'd': [True, np.int64(3), dt.timedelta(1), '=HYPERLINK("http://a.com", "a")']})
+            sf.apply_column_style('a', Styler(bg_color=utils.colors.yellow, number_format='0.00'))
+            sf.apply_style_by_indexes(sf.index[1], self.styler_obj_2, height=25)
+            sf.apply_headers_style(Styler(font_color=utils.colors.red))
+            sf.data_df.index.name = 'index name'
+            return sf
+
+        def export(engine, **kwargs):
+            output = BytesIO()
+            excel_writer = StyleFrame.ExcelWriter(output, engine=engine)
+            get_sf().to_excel(excel_writer, sheet_name='Sheet1', best_fit='b', row_to_add_filters=0,
+                              columns_and_rows_to_freeze='B2', **kwargs)
+            get_sf().to_excel(excel_writer, sheet_name='Sheet2', startrow=2, startcol=1, na_rep='NA')
+            excel_writer.close()
+            return output
+
+        for kwargs in ({}, {'index': True}, {'header': False}):
+            with self.subTest(**kwargs):
+                expected_output, output = export('openpyxl', **kwargs), export('styleframe', **kwargs)
+                with zipfile.ZipFile(expected_output) as expected_archive, zipfile.ZipFile(output) as archive:
+                    self.assertEqual(sorted(archive.namelist()), sorted(expected_archive.namelist()))
+                    # the worksheets (and their comments) are the same as the ones openpyxl writes
+                    for name in expected_archive.namelist():
+                        if name.startswith(('xl/worksheets/', 'xl/comments')):
+                            self.assertEqual(ET.canonicalize(archive.read(name).decode()),
+                                             ET.canonicalize(expected_archive.read(name).decode()))
+                expected_sheet, sheet = load_workbook(expected_output)['Sheet1'], load_workbook(output)['Sheet1']
+                for row, expected_row in zip(sheet.iter_rows(), expected_sheet.iter_rows()):
+                    for current_cell, expected_cell in zip(row, expected_row):
+                        self.assertEqual(current_cell.number_format, expected_cell.number_format)
+                        for attr in ('font', 'fill', 'border', 'alignment', 'protection'):
+                            self.assertEqual(copy(getattr(current_cell, attr)), copy(getattr(expected_cell, attr)))
+
+    def test_to_excel_styleframe_engine_invalid_args(self):
+        with self.assertRaises(ValueError):
+            StyleFrame.ExcelWriter(BytesIO(), engine='xlwt')
+        with self.assertRaises(ValueError):
+            self.sf.to_excel(BytesIO(), engine='styleframe', streaming=True)
+        with self.assertRaises(TypeError):
+            self.sf.to_excel(StyleFrame.ExcelWriter(BytesIO(), engine='styleframe'), float_format='%.2f')
+
+    @unittest.skipIf(xlsxwriter is None, 'xlsxwriter is not installed')
+    def test_to_excel_xlsxwriter_engine(self):
+        def get_sf():
+            sf = StyleFrame({'a': [1, 2.5, np.nan, 1e20], 'b': ['a & <b>', 'http://a.com', 'c', '=SUM(A1)'],
+                             'c': [dt.date(2020, 1, 1), pd.Timestamp('2020-01-02 03:04'), pd.NaT, None],
+                             'd': [True, np.int64(3), dt.timedelta(1), '=HYPERLINK("http://a.com", "a")']})
+            sf.apply_column_style('a', Styler(bg_color=utils.colors.yellow, number_format='0.00', comment_text='a',
+                                              comment_author='Author'))
+            sf.apply_style_by_indexes(sf.index[1], Styler(fill_pattern_type=utils.fill_pattern_types.dark_up,
+                                                          bg_color=utils.colors.red, text_rotation=120,
+                                                          underline=utils.underline.double, italic=True),
+                                      height=25)
+            sf.apply_headers_style(Styler(font_color=utils.colors.red, border_type=utils.borders.dashed))
+            sf.add_color_scale_conditional_formatting(start_type=utils.conditional_formatting_types.num,
+                                                      start_value=0, start_color=utils.colors.red,
+                                                      end_type=utils.conditional_formatting_types.max,
+                                                      end_value=100, end_color=utils.colors.green,
+                                                      columns_range=['a'])
+            sf.data_df.index.name = 'index name'
+            return sf
+
+        def export(excel_writer, **kwargs):
+            get_sf().to_excel(excel_writer, sheet_name='Sheet1', best_fit='b', row_to_add_filters=0,
+                              columns_and_rows_to_freeze='B2', columns_to_hide='d', allow_protection=True, **kwargs)
+            get_sf().to_excel(excel_writer, sheet_name='Sheet2', startrow=2, startcol=1, na_rep='NA')
+            excel_writer.close()
+
+        def get_styler(current_cell):
+            # xlsxwriter writes opaque colors, omits the attributes that are off and does not shrink wrapped text
+            style = Styler.from_openpyxl_style(current_cell, [])
+            styler = {attr: getattr(style, attr)[-6:] if attr.endswith('color') else getattr(style, attr) or None
+                      for attr in ('bg_color', 'bold', 'font', 'font_size', 'font_color', 'number_format',
+                                   'protection', 'underline', 'border_type', 'horizontal_alignment',
+                                   'vertical_alignment', 'wrap_text', 'fill_pattern_type', 'indent', 'text_rotation',
+                                   'strikethrough', 'italic')}
+            styler['shrink_to_fit'] = None if style.wrap_text else style.shrink_to_fit or None
+            return styler
+
+        for kwargs in ({}, {'index': True}, {'header': False}):
+            for options in ({}, {'constant_memory': True}):
+                with self.subTest(options=options, **kwargs):
+                    expected_output, output = BytesIO(), BytesIO()
+                    export(StyleFrame.ExcelWriter(expected_output), **kwargs)
+                    export(StyleFrame.ExcelWriter(output, engine='xlsxwriter', engine_kwargs={'options': options}),
+                           **kwargs)
+                    expected_workbook, workbook = load_workbook(expected_output), load_workbook(output)
+                    self.assertEqual(workbook.sheetnames, expected_workbook.sheetnames)
+                    for sheet_name in expected_workbook.sheetnames:
+                        expected_sheet, sheet = expected_workbook[sheet_name], workbook[sheet_name]
+                        for row, expected_row in zip(sheet.iter_rows(), expected_sheet.iter_rows()):
+                            for current_cell, expected_cell in zip(row, expected_row):
+                                self.assertEqual(current_cell.value, expected_cell.value)
+                                self.assertEqual(get_styler(current_cell), get_styler(expected_cell))
+                                self.assertEqual(bool(current_cell.comment), bool(expected_cell.comment))
+                        for column_letter, column_dimension in expected_sheet.column_dimensions.items():
+                            # xlsxwriter adds the font's padding to the widths
+                            self.assertAlmostEqual(sheet.column_dimensions[column_letter].width,
+                                                   column_dimension.width, delta=1)
+                            self.assertEqual(sheet.column_dimensions[column_letter].hidden, column_dimension.hidden)
+                        for row_index, row_dimension in expected_sheet.row_dimensions.items():
+                            self.assertEqual(sheet.row_dimensions[row_index].height, row_dimension.height)
+                        self.assertEqual(sheet.auto_filter.ref, expected_sheet.auto_filter.ref)
+                        self.assertEqual(sheet.freeze_panes, expected_sheet.freeze_panes)
+                        self.assertEqual(sheet.protection.sheet, expected_sheet.protection.sheet)
+                        self.assertEqual([str(cf.sqref) for cf in sheet.conditional_formatting],
+                                         [str(cf.sqref) for cf in expected_sheet.conditional_formatting])
+
+    @unittest.skipIf(xlsxwriter is None, 'xlsxwriter is not installed')
+    def test_to_excel_xlsxwriter_engine_invalid_args(self):
+        excel_writer = StyleFrame.ExcelWriter(BytesIO(), engine='xlsxwriter')
+        with self.assertRaises(ValueError):
+            self.sf.to_excel(excel_writer, streaming=True)
+        with self.assertRaises(TypeError):
+            self.sf.to_excel(excel_writer, float_format='%.2f')
+        self.sf.to_excel(excel_writer)
+        with self.assertRaises(ValueError):
+            self.sf.to_excel(excel_writer)
+        excel_writer.close()
+
     def test_row_indexes(self):
         self.assertEqual(self.sf.row_indexes, (1, 2, 3, 4))
 
@@ -0,0 +1,34 @@
+import unittest
+
+import numpy as np
+
+from styleframe import Styler, utils
+from styleframe.style_table import StyleTable
+
+
+class StyleTableTest(unittest.TestCase):
+    def setUp(self):
+        self.style_table = StyleTable()
+
+    def test_add(self):
+        self.assertEqual(self.style_table.add(Styler(bold=True)), 0)
+        self.assertEqual(self.style_table.add(Styler(bg_color=utils.colors.yellow)), 1)
+        self.assertEqual(self.style_table.add(Styler(bold=True)), 0)
+        self.assertEqual(len(self.style_table), 2)
+        self.assertIn(Styler(bold=True), self.style_table)
+        self.assertNotIn(Styler(italic=True), self.style_table)
+
+    def test_ids(self):
+        bold = Styler(bold=True)
+        style_ids = self.style_table.ids([bold, Styler(), bold, Styler()])
+        self.assertEqual(style_ids.dtype, np.int32)
+        self.assertListEqual(style_ids.tolist(), [0, 1, 0, 1])
+        self.assertListEqual(list(self.style_table), [bold, Styler()])
+
+    def test_take(self):
+        bold = Styler(bold=True)
+        self.style_table.ids([bold, Styler()])
+        styles = self.style_table.take(np.array([[1, 0], [0, 0]], dtype=np.int32))
+        self.assertEqual(styles.shape, (2, 2))
+        self.assertIs(styles[0, 1], bold)
+        self.assertEqual(styles[0, 0], Styler())
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from styleframe import StyleFrame, Styler, StyleTemplate, utils
+from styleframe.tests import TEST_FILENAME
+
+
+class StyleTemplateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.header_style = Styler(bold=True, bg_color=utils.colors.grey)
+        cls.first_row_style = Styler(bg_color=utils.colors.yellow)
+        cls.cells_style = Styler(italic=True)
+        template_sf = StyleFrame({'a': ['a1', 'a2', 'a3'], 'b': ['b1', 'b2', 'b3']}, styler_obj=cls.cells_style)
+        template_sf.apply_style_by_indexes(template_sf.index[0], cls.first_row_style)
+        template_sf.apply_headers_style(cls.header_style)
+        template_sf.set_column_width('a', 20)
+        template_sf.to_excel(TEST_FILENAME).save()
+        cls.template = StyleTemplate.read_excel(TEST_FILENAME)
+
+    def test_shape(self):
+        self.assertEqual(self.template.shape, (3, 2))
+
+    def test_fill_equal_boundaries(self):
+        df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+        sf = self.template.fill(df)
+        self.assertEqual([col.value for col in sf.columns], ['A', 'B'])
+        self.assertEqual(list(sf['A']), [1, 2, 3])
+        self.assertTrue(all(col.style.bold for col in sf.columns))
+        self.assertEqual(sf.loc[0, 'B'].style.bg_color, utils.colors.yellow)
+        self.assertTrue(sf.loc[1, 'B'].style.italic)
+        self.assertEqual(sf._columns_width['A'], 20)
+
+    def test_fill_larger_df(self):
+        df = pd.DataFrame({'A': [1, 2, 3, 4], 'B': [5, 6, 7, 8], 'C': [9, 10, 11, 12]})
+        sf = self.template.fill(df)
+        self.assertEqual(sf.data_df.shape, (4, 3))
+        self.assertEqual(list(sf['C']), [9, 10, 11, 12])
+        self.assertEqual(list(sf.iloc[3]), [4, 8, 12])
+        # cells outside of the template have the default style
+        self.assertEqual(sf.loc[3, 'A'].style, Styler.intern(number_format=utils.number_formats.general))
+        self.assertEqual(sf.loc[0, 'C'].style, Styler.intern(number_format=utils.number_formats.general))
+        self.assertFalse(sf.columns[2].style.bold)
+        self.assertTrue(sf.loc[2, 'A'].style.italic)
+
+    def test_fill_smaller_df(self):
+        df = pd.DataFrame({'A': [1]})
+        sf = self.template.fill(df)
+        self.assertEqual([col.value for col in sf.columns], ['A', 'b'])
+        self.assertEqual(list(sf['A']), [1, 'a2', 'a3'])
+        self.assertEqual(list(sf['b']), ['b1', 'b2', 'b3'])
+
+        sf = self.template.fill(df, use_df_boundaries=True)
+        self.assertEqual(sf.data_df.shape, (1, 1))
+        self.assertEqual(sf.loc[0, 'A'].style.bg_color, utils.colors.yellow)
+
+    def test_fill_does_not_read_template(self):
+        df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+        with mock.patch('styleframe.style_frame.load_workbook', wraps=load_workbook) as load_workbook_mock:
+            sfs = [self.template.fill(df) for _ in range(3)]
+        load_workbook_mock.assert_not_called()
+        # filled StyleFrames do not share containers with each other
+        sfs[0].loc[0, 'A'].value = 10
+        self.assertEqual(sfs[1].loc[0, 'A'].value, 1)
+
+    def test_fill_same_as_read_excel_as_template(self):
+        df = pd.DataFrame({'A': [1, 2, 3, 4], 'B': [5, 6, 7, 8]})
+        sf = self.template.fill(df)
+        sf_from_template = StyleFrame.read_excel_as_template(TEST_FILENAME, df)
+        self.assertEqual([container.style for container in sf.data_df.values.ravel()],
+                         [container.style for container in sf_from_template.data_df.values.ravel()])
+        self.assertEqual(sf._columns_width, sf_from_template._columns_width)
+
+    def test_fill_read_only_template(self):
+        template = StyleTemplate.read_excel(TEST_FILENAME, read_only=True)
+        sf = template.fill(pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}))
+        # the columns widths are not read in read-only mode
+        self.assertEqual(sf._columns_width, {})
+        self.assertEqual(sf.loc[0, 'B'].style.bg_color, utils.colors.yellow)
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_path = os.path.join(output_dir, 'output.xlsx')
+            sf.to_excel(output_path).close()
+            self.assertEqual(load_workbook(output_path).active['A2'].value, 1)
@@ -1,6 +1,10 @@
+import gc
+import pickle
 import unittest
 
-from styleframe import Styler, utils
+from copy import copy, deepcopy
+
+from styleframe import FrozenStyler, Styler, utils
 
 
 class StylerTests(unittest.TestCase):
@@ -44,3 +48,50 @@ class StylerTests(unittest.TestCase):
             Styler(border_type=utils.borders.default_grid, bg_color=utils.colors.yellow,
                    fill_pattern_type=utils.fill_pattern_types.light_grid)
 
+    def test_replace(self):
+        yellow_bold = self.yellow_1.replace(bold=True, font_color='blue')
+        self.assertEqual(yellow_bold, Styler(bg_color='yellow', bold=True, font_color='blue'))
+        self.assertFalse(self.yellow_1.bold)
+        with self.assertRaises(TypeError):
+            self.yellow_1.replace(non_existing_attribute=True)
+
+    def test_frozen_styler(self):
+        frozen_yellow = self.yellow_1.freeze()
+        self.assertIsInstance(frozen_yellow, FrozenStyler)
+        self.assertEqual(frozen_yellow, self.yellow_1)
+        self.assertEqual(self.yellow_1, frozen_yellow)
+        self.assertEqual(hash(frozen_yellow), hash(self.yellow_1))
+        self.assertEqual(FrozenStyler(bg_color='yellow'), frozen_yellow)
+        with self.assertRaises(AttributeError):
+            frozen_yellow.bold = True
+        self.assertIsInstance(frozen_yellow.replace(bold=True), FrozenStyler)
+        self.assertIs(frozen_yellow.freeze(), frozen_yellow)
+        self.assertIs(copy(frozen_yellow), frozen_yellow)
+        self.assertIs(deepcopy(frozen_yellow), frozen_yellow)
+
+    def test_pickle(self):
+        for styler_obj in (self.yellow_bold_underline, self.yellow_bold_underline.freeze()):
+            unpickled = pickle.loads(pickle.dumps(styler_obj))
+            self.assertIs(type(unpickled), type(styler_obj))
+            self.assertEqual(unpickled, styler_obj)
+            self.assertEqual(hash(unpickled), hash(styler_obj))
+
+    def test_custom_attributes(self):
+        yellow = Styler(bg_color='yellow')
+        yellow.custom_attribute = 'value'
+        self.assertEqual(pickle.loads(pickle.dumps(yellow)).custom_attribute, 'value')
+        self.assertEqual(yellow, self.yellow_1)
+
+    def test_intern(self):
+        interned_yellow = Styler.intern(bg_color='yellow')
+        self.assertIsInstance(interned_yellow, FrozenStyler)
+        self.assertEqual(interned_yellow, self.yellow_1)
+        self.assertIs(Styler.intern(bg_color='yellow'), interned_yellow)
+        self.assertIs(Styler.intern(bg_color=utils.colors.yellow), interned_yellow)
+        self.assertIs(self.yellow_1.interned(), interned_yellow)
+        self.assertIsNot(Styler.intern(bg_color='blue'), interned_yellow)
+
+    def test_intern_does_not_keep_unused_styles(self):
+        key = Styler.intern(font_size=99)._key()
+        gc.collect()
+        self.assertNotIn(key, Styler._interned)
@@ -3,12 +3,17 @@ import unittest
 from styleframe.command_line.tests.commandline_tests import CommandlineInterfaceTest
 from styleframe.tests.container_tests import ContainerTest
 from styleframe.tests.series_tests import SeriesTest
+from styleframe.tests.sheet_layout_tests import SheetLayoutTest
+from styleframe.tests.style_cache_tests import StyleCacheTest
 from styleframe.tests.style_frame_tests import StyleFrameTest
+from styleframe.tests.style_table_tests import StyleTableTest
+from styleframe.tests.style_template_tests import StyleTemplateTest
 from styleframe.tests.styler_tests import StylerTests
 
 
 def run():
-    test_classes = [ContainerTest, StyleFrameTest, CommandlineInterfaceTest, SeriesTest, StylerTests]
+    test_classes = [ContainerTest, StyleFrameTest, CommandlineInterfaceTest, SeriesTest, StylerTests,
+                    StyleCacheTest, StyleTableTest, StyleTemplateTest, SheetLayoutTest]
     for test_class in test_classes:
         suite = unittest.TestLoader().loadTestsFromTestCase(test_class)
         unittest.TextTestRunner().run(suite)
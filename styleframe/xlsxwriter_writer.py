@@ -0,0 +1,197 @@
+"""
+Writing StyleFrame objects with xlsxwriter (see :meth:`.StyleFrame.ExcelWriter`).
+
+Every distinct style is translated to an xlsxwriter ``Format`` once, and the cells are written row by row, so the
+sheets can be written with xlsxwriter's ``constant_memory`` mode. The sheets' settings are applied to an openpyxl
+worksheet that is not saved, exactly as they are for the openpyxl engine, and are then translated to xlsxwriter.
+"""
+
+import datetime as dt
+from typing import Dict, List, Optional, Union
+from weakref import WeakKeyDictionary
+
+from openpyxl.cell.cell import Cell
+from openpyxl.cell.read_only import ReadOnlyCell
+from openpyxl.utils import column_index_from_string
+from openpyxl.worksheet.worksheet import Worksheet
+
+from styleframe.styler import Styler
+
+_underlines = {'single': 1, 'double': 2, 'singleAccounting': 33, 'doubleAccounting': 34}
+
+_borders = {'thin': 1, 'medium': 2, 'dashed': 3, 'dotted': 4, 'thick': 5, 'double': 6, 'hair': 7, 'mediumDashed': 8,
+            'dashDot': 9, 'mediumDashDot': 10, 'dashDotDot': 11, 'mediumDashDotDot': 12, 'slantDashDot': 13}
+
+_fill_patterns = {'solid': 1, 'mediumGray': 2, 'darkGray': 3, 'lightGray': 4, 'darkHorizontal': 5, 'darkVertical': 6,
+                  'darkDown': 7, 'darkUp': 8, 'darkGrid': 9, 'darkTrellis': 10, 'lightHorizontal': 11,
+                  'lightVertical': 12, 'lightDown': 13, 'lightUp': 14, 'lightGrid': 15, 'lightTrellis': 16,
+                  'gray125': 17, 'gray0625': 18}
+
+_horizontal_alignments = {'left': 'left', 'center': 'center', 'right': 'right', 'fill': 'fill', 'justify': 'justify',
+                          'centerContinuous': 'center_across', 'distributed': 'distributed'}
+
+_vertical_alignments = {'top': 'top', 'center': 'vcenter', 'bottom': 'bottom', 'justify': 'vjustify',
+                        'distributed': 'vdistributed'}
+
+_workbooks_formats = WeakKeyDictionary()
+
+
+def _get_color(color: str) -> str:
+    # StyleFrame's colors are ARGB (or RGB) hex strings, xlsxwriter expects #RRGGBB
+    return '#' + color[-6:]
+
+
+def get_format_properties(style: Styler) -> dict:
+    """Translates a :class:`.Styler` to the properties of the equivalent xlsxwriter ``Format``, the same way
+    :meth:`.Styler.to_openpyxl_style` translates it to an openpyxl style.
+
+    :meta private:
+    """
+
+    properties = {'font_name': style.font, 'font_size': style.font_size, 'bold': style.bold, 'italic': style.italic,
+                  'font_strikeout': style.strikethrough, 'num_format': style.number_format,
+                  'locked': bool(style.protection), 'text_wrap': bool(style.wrap_text),
+                  'shrink': bool(style.shrink_to_fit), 'indent': int(style.indent or 0)}
+    if style.font_color:
+        properties['font_color'] = _get_color(style.font_color)
+    if style.underline:
+        properties['underline'] = _underlines[style.underline]
+    if style.border_type:
+        properties['border'] = _borders[style.border_type]
+        properties['border_color'] = '#000000'
+    if style.fill_pattern_type:
+        properties['pattern'] = _fill_patterns[style.fill_pattern_type]
+        if style.bg_color:
+            # a solid fill's color is its background color, any other pattern's color is its foreground color
+            properties['bg_color' if style.fill_pattern_type == 'solid' else 'fg_color'] = _get_color(style.bg_color)
+    if style.horizontal_alignment in _horizontal_alignments:
+        properties['align'] = _horizontal_alignments[style.horizontal_alignment]
+    if style.vertical_alignment in _vertical_alignments:
+        properties['valign'] = _vertical_alignments[style.vertical_alignment]
+    if style.text_rotation:
+        # openpyxl's rotations of 91-180 degrees are the downward rotations of 1-90 degrees
+        rotation = int(style.text_rotation)
+        properties['rotation'] = 90 - rotation if 90 < rotation <= 180 else rotation
+    return properties
+
+
+class XlsxWriterSheetData:
+    """The cells of a sheet StyleFrame exports to with xlsxwriter.
+
+    :param worksheet: The sheet the cells are written to
+    :type worksheet: :class:`xlsxwriter.worksheet.Worksheet`
+    :param workbook: The workbook of the sheet
+    :type workbook: :class:`xlsxwriter.workbook.Workbook`
+
+    :meta private:
+    """
+
+    def __init__(self, worksheet, workbook):
+        self.worksheet = worksheet
+        self.workbook = workbook
+        # the formats are shared by all the sheets of the workbook, so every distinct style is added to it once
+        try:
+            self.formats = _workbooks_formats[workbook]
+        except KeyError:
+            self.formats = _workbooks_formats[workbook] = {}
+
+    def get_cell_format(self, style: Union[None, Styler, Cell, ReadOnlyCell]):
+        """
+        :return: The xlsxwriter ``Format`` of style, or ``None`` if style is ``None``
+        """
+
+        if style is None:
+            return None
+        if not isinstance(style, Styler):
+            # openpyxl styles (read with use_openpyxl_styles=True) are translated through a Styler
+            style = Styler.from_openpyxl_style(style, [])
+        try:
+            return self.formats[style]
+        except KeyError:
+            cell_format = self.formats[style.freeze()] = self.workbook.add_format(get_format_properties(style))
+            return cell_format
+
+    def write_row(self, row_index: int, first_column: int, values: list, cell_formats: list,
+                  comments: Optional[list] = None) -> None:
+        """Writes the cells of a row. Rows must be written in ascending order when the workbook uses xlsxwriter's
+        ``constant_memory`` mode.
+
+        :param int row_index: The (1-based) index of the row
+        :param int first_column: The (1-based) index of the column of the first value
+        :param list values: The values of the cells (as returned by :func:`.get_written_value`)
+        :param list cell_formats: The xlsxwriter formats of the cells, as returned by :meth:`get_cell_format`
+        :param comments: The cells' openpyxl comments, or ``None`` if none of the cells has a comment
+        :type comments: None or list
+        """
+
+        worksheet = self.worksheet
+        row = row_index - 1
+        for column, value, cell_format in zip(range(first_column - 1, first_column - 1 + len(values)), values,
+                                              cell_formats):
+            value_type = type(value)
+            if value is None or (value_type is str and not value):
+                # empty strings (the default na_rep that missing values are written as) are left blank, like openpyxl
+                # leaves them, instead of being written as empty shared strings
+                if cell_format is not None:
+                    worksheet.write_blank(row, column, None, cell_format)
+            elif value_type is str:
+                # strings are written as they are (xlsxwriter's write() would turn urls into hyperlinks), except for
+                # formulas, just like openpyxl writes them
+                if value.startswith('=') and len(value) > 1:
+                    worksheet.write_formula(row, column, value, cell_format)
+                else:
+                    worksheet.write_string(row, column, value, cell_format)
+            elif value_type is bool:
+                worksheet.write_boolean(row, column, value, cell_format)
+            elif isinstance(value, (int, float)):
+                worksheet.write_number(row, column, value, cell_format)
+            elif isinstance(value, (dt.datetime, dt.date, dt.time)):
+                worksheet.write_datetime(row, column, value, cell_format)
+            else:
+                worksheet.write(row, column, value, cell_format)
+        if comments is not None:
+            for column, comment in zip(range(first_column - 1, first_column - 1 + len(comments)), comments):
+                if comment is not None:
+                    options = {'author': comment.author} if comment.author else {}
+                    worksheet.write_comment(row, column, comment.text, options)
+
+    def apply_sheet_settings(self, sheet: Worksheet) -> None:
+        """Applies the settings of an openpyxl sheet (the columns widths and hidden columns, the rows heights, the
+        auto filter, the frozen panes, the direction, the protection and the color scale conditional formatting) to
+        the xlsxwriter sheet. Must be called before the rows are written.
+
+        :param sheet: The openpyxl sheet the settings were applied to
+        :type sheet: :class:`openpyxl.worksheet.worksheet.Worksheet`
+        """
+
+        worksheet = self.worksheet
+        for column_letter, column_dimension in sheet.column_dimensions.items():
+            column = column_index_from_string(column_letter) - 1
+            worksheet.set_column(column, column, column_dimension.width, None,
+                                 {'hidden': True} if column_dimension.hidden else None)
+        for row_index, row_dimension in sorted(sheet.row_dimensions.items()):
+            if row_dimension.ht is not None:
+                worksheet.set_row(row_index - 1, row_dimension.ht)
+        if sheet.auto_filter.ref:
+            worksheet.autofilter(sheet.auto_filter.ref)
+        if sheet.freeze_panes:
+            worksheet.freeze_panes(sheet.freeze_panes)
+        if sheet.sheet_view.rightToLeft:
+            worksheet.right_to_left()
+        if sheet.protection.sheet:
+            worksheet.protect('', {'autofilter': not sheet.protection.autoFilter})
+        for conditional_formatting in sheet.conditional_formatting:
+            for rule in conditional_formatting.rules:
+                worksheet.conditional_format(str(conditional_formatting.sqref), self._get_color_scale(rule))
+
+    @staticmethod
+    def _get_color_scale(rule) -> Dict[str, Union[str, float]]:
+        cfvos: List = rule.colorScale.cfvo
+        colors: List = rule.colorScale.color
+        options = {'type': '{}_color_scale'.format(len(cfvos))}
+        for prefix, cfvo, color in zip(('min', 'mid', 'max') if len(cfvos) == 3 else ('min', 'max'), cfvos, colors):
+            options[prefix + '_type'] = cfvo.type
+            if cfvo.val is not None:
+                options[prefix + '_value'] = cfvo.val
+            options[prefix + '_color'] = _get_color(color.rgb)
+        return options